@@ -1,22 +1,34 @@
-from flask import Flask, jsonify, request, send_from_directory, g, has_request_context, redirect, url_for, session as flask_session, make_response # Added redirect, url_for, session as flask_session
+from flask import Flask, jsonify, request, send_from_directory, g, has_request_context, redirect, url_for, session as flask_session, make_response, Response, stream_with_context # Added redirect, url_for, session as flask_session
 from flask_cors import CORS # Import CORS
+from flask.json.provider import DefaultJSONProvider
+import orjson # Fast JSON encode/decode for Flask responses and Groq payloads
 from dotenv import load_dotenv
 import os
 import signal
+import atexit
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import gzip # Compressing JSON responses
 import pdfplumber
 import docx # CORRECTED IMPORT
 from werkzeug.utils import secure_filename
-from functools import wraps # For decorator
+from functools import wraps, lru_cache, partial # For decorator / memoized static prompts / deferred prompt builds
 from supabase import create_client, Client # Supabase client
 from datetime import datetime, timedelta, timezone # Added timezone
 import re # For date validation
+import string # Pre-compiled prompt templates
+import bisect # Day-bucket lookups
+from collections import ChainMap, OrderedDict, deque, namedtuple
 from postgrest.exceptions import APIError # IMPORTED APIError
 from email.mime.text import MIMEText # Added for Gmail sending
 import base64 # Added for Gmail sending
 import secrets # Added for secrets
 import sys # <--- ADD THIS IMPORT
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener # Off-thread log writes
 from werkzeug.middleware.proxy_fix import ProxyFix # <--- ADD THIS IMPORT
 
 # Google OAuth specific imports
@@ -32,15 +44,74 @@ from twilio.rest import Client as TwilioClient
 from twilio.twiml.voice_response import VoiceResponse, Say, Play, Record, Gather, Stream, Connect
 from elevenlabs.client import ElevenLabs # type: ignore # Use this for the main client
 import shutil # For saving audio file temporarily
+import tempfile # Private scratch files for call recordings
 import uuid   # For generating unique filenames
-import urllib.request # For downloading the recording
+import random # Retry backoff jitter
 import time # Added import for time.sleep()
 from urllib.parse import urlparse # Add this import
+import hashlib # For hashing bearer tokens into cache keys
+import jwt # PyJWT, for local Supabase access-token verification
+from types import SimpleNamespace
+import threading
+import asyncio # Background event loop for concurrent Groq I/O
+import concurrent.futures
+import httpx
+from cachetools import TTLCache # In-process TTL caches
+import redis # Shared transcript store across gunicorn workers (used when REDIS_URL is set)
 
 # Load environment variables from .env file
 load_dotenv()
 
+# --- Request-path logger ---
+# Request threads only put records on a queue; a listener thread does the stdout write, so a slow pipe under
+# gunicorn never blocks a handler. Messages use %-style args, so DEBUG lines cost nothing unless LOG_LEVEL enables them.
+LOGGER = logging.getLogger("influencerflow")
+LOGGER.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+LOGGER.propagate = False
+_LOG_LISTENER = None
+_LOG_LISTENER_PID = None
+
+def start_log_listener():
+    """Starts this process's log listener. Threads don't survive a fork, so gunicorn's post_fork calls this again
+    and each worker gets a fresh queue and listener."""
+    global _LOG_LISTENER, _LOG_LISTENER_PID
+    if _LOG_LISTENER_PID == os.getpid():
+        return
+    log_queue = queue.SimpleQueue()
+    stdout_handler = logging.StreamHandler(sys.stdout)
+    stdout_handler.setFormatter(logging.Formatter("%(message)s"))
+    for handler in list(LOGGER.handlers):
+        LOGGER.removeHandler(handler)
+    LOGGER.addHandler(QueueHandler(log_queue))
+    _LOG_LISTENER = QueueListener(log_queue, stdout_handler)
+    _LOG_LISTENER.start()
+    _LOG_LISTENER_PID = os.getpid()
+
+def stop_log_listener():
+    if _LOG_LISTENER is not None and _LOG_LISTENER_PID == os.getpid():
+        _LOG_LISTENER.stop() # Flushes queued records before exit
+
+start_log_listener()
+atexit.register(stop_log_listener)
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson. Types orjson doesn't handle natively (and datetimes, so they keep
+    Flask's HTTP-date format) are routed through DefaultJSONProvider.default."""
+    dump_options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.dump_options).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # jsonify() path: hand orjson's bytes straight to the response instead of decoding to str and re-encoding
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, default=self.default, option=self.dump_options), mimetype=self.mimetype)
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # 1. Set SECRET_KEY immediately and log it
 retrieved_secret_key = os.getenv("FLASK_APP_SECRET_KEY", "fallback-dev-secret-key-please-change")
@@ -96,6 +167,36 @@ def log_set_cookie_info(response): # Renamed function
             app.logger.error(f"--- @after_request for {request.path}: Error logging Set-Cookie headers: {e} ---")
     return response
 
+# --- Gzip for JSON responses ---
+# AI payloads (campaigns, batch scoring/outreach) run from a few KB to 50KB+ and compress ~5x.
+# Streamed responses (SSE, file downloads) are left alone so they still flush incrementally.
+GZIP_MIN_RESPONSE_BYTES = 500
+GZIP_COMPRESS_LEVEL = 5 # Most of level 9's ratio at a fraction of the CPU
+GZIP_MIMETYPES = ('application/json', 'text/plain', 'text/html')
+
+@app.after_request
+def gzip_json_response(response):
+    if (response.direct_passthrough or response.is_streamed
+            or response.mimetype not in GZIP_MIMETYPES
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '').lower()):
+        return response
+    body = response.get_data()
+    if len(body) < GZIP_MIN_RESPONSE_BYTES:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.after_request
+def add_llm_cache_header(response):
+    # Endpoints backed by the LLM response cache record HIT/MISS in g so cache effectiveness shows up in access logs
+    cache_status = g.get('llm_cache_status')
+    if cache_status:
+        response.headers['X-Cache'] = cache_status
+    return response
+
 # NEW DETAILED LOGGING FOR SECRET KEY
 if not app.secret_key:
     app.logger.error("🔴 CRITICAL: Flask app.secret_key is NOT SET (None or empty after os.getenv). Session management will FAIL.")
@@ -107,13 +208,43 @@ else:
 # Configure CORS
 # For development, allow your frontend's localhost. 
 # For production, add your specific Vercel frontend URL(s).
-CORS(app, resources={r"/api/*": {"origins": [
+CORS_ALLOWED_ORIGINS = (
     "http://localhost:5173", # For local frontend development
     os.getenv("VITE_FRONTEND_URL", "https://influencerflowai.vercel.app") # Use an env var for Vercel URL, updated to actual Vercel URL
     # You can add more specific preview URLs if needed, e.g., "https://*.vercel.app"
-],
+)
+CORS_PREFLIGHT_MAX_AGE_SECONDS = 86400 # Browsers cache preflight results for a day, skipping repeat OPTIONS round-trips
+
+CORS(app, resources={r"/api/*": {"origins": list(CORS_ALLOWED_ORIGINS),
 "supports_credentials": True
-}})
+}}, max_age=CORS_PREFLIGHT_MAX_AGE_SECONDS, expose_headers=["X-Cache"])
+
+# --- CORS preflight short-circuit ---
+@app.before_request
+def short_circuit_preflight():
+    # Answer API preflights here, before auth and view dispatch; Flask-CORS's after_request hook adds the Access-Control-* headers.
+    # Other paths (/temp_audio, unknown URLs) go through normal routing so 404/405 still apply.
+    if request.method == 'OPTIONS' and request.path.startswith('/api/'):
+        return '', 204
+
+# --- Per-request timestamp ---
+@app.before_request
+def stamp_request_time():
+    g.now = datetime.now(timezone.utc) # One clock read per request so every date in a response agrees
+
+def request_now():
+    """Returns the timestamp captured for the current request, or a fresh one outside a request context."""
+    if has_request_context() and 'now' in g:
+        return g.now
+    return datetime.now(timezone.utc)
+
+def request_now_iso():
+    """request_now() as an ISO-8601 string, formatted once per request however many fields stamp it."""
+    if has_request_context() and 'now' in g:
+        if 'now_iso' not in g:
+            g.now_iso = g.now.isoformat()
+        return g.now_iso
+    return datetime.now(timezone.utc).isoformat()
 
 # Google OAuth Configuration
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
@@ -143,6 +274,269 @@ supabase_url = os.getenv("VITE_SUPABASE_URL")
 supabase_key = os.getenv("VITE_SUPABASE_ANON_KEY") 
 supabase_service_key = os.getenv("VITE_SUPABASE_SERVICE_KEY") # New
 groq_api_key = os.getenv("VITE_GROQ_API_KEY")
+supabase_jwt_secret = os.getenv("SUPABASE_JWT_SECRET") # Project JWT secret; enables local token verification
+
+# Shared keep-alive session for Groq so each LLM call reuses a pooled TCP/TLS connection
+# instead of paying a fresh handshake to api.groq.com.
+GROQ_CHAT_COMPLETIONS_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_MODELS_URL = "https://api.groq.com/openai/v1/models"
+GROQ_LARGE_MODEL = "llama-3.3-70b-versatile" # Successor to llama3-70b-8192 with reliable JSON mode
+GROQ_FAST_MODEL = "llama-3.1-8b-instant" # Several times faster; enough for short templated JSON replies
+
+def groq_model_for(task, default_model):
+    """Model routed to one endpoint. GROQ_MODEL_OVERRIDE_<TASK> (e.g. GROQ_MODEL_OVERRIDE_CREATOR_SCORE) rolls a routing
+    change back without a code change."""
+    return os.getenv(f"GROQ_MODEL_OVERRIDE_{task.upper()}", default_model)
+GROQ_REQUEST_TIMEOUT = (3.05, 30) # (connect, read) seconds
+GROQ_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+GROQ_MAX_RETRIES = 2
+GROQ_RETRY_BACKOFF_SECONDS = 0.2 # Base of the exponential backoff; each wait also gets up to this much random jitter
+GROQ_AUTH_HEADERS = { # Only the key varies by deployment, so the headers are built once
+    "Authorization": f"Bearer {groq_api_key}",
+    "Content-Type": "application/json"
+}
+GROQ_SESSION = requests.Session() # Blocking session, kept for streamed completions read chunk-by-chunk on the request thread
+GROQ_SESSION.headers.update(GROQ_AUTH_HEADERS)
+GROQ_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(
+        total=GROQ_MAX_RETRIES,
+        backoff_factor=GROQ_RETRY_BACKOFF_SECONDS,
+        backoff_jitter=GROQ_RETRY_BACKOFF_SECONDS, # Spread out retries from requests that failed together
+        status_forcelist=list(GROQ_RETRY_STATUS_CODES),
+        allowed_methods=["POST"],
+        raise_on_status=False # Hand the last response back so raise_for_status() reports it as before
+    )
+))
+
+# --- Async Groq client on a background event loop ---
+# Non-streaming Groq calls run on one asyncio loop per worker process, over a single HTTP/2 httpx.AsyncClient.
+# Request threads only block on a future, so a threaded worker can keep many LLM calls in flight at once.
+GROQ_FUTURE_TIMEOUT_SECONDS = 35 # Upper bound on waiting for the loop, including retries
+GROQ_BATCH_MAX_WAIT_SECONDS = 90 # Upper bound on one batch fan-out; calls still running then fall back individually
+GROQ_TRANSPORT_ERRORS = (requests.exceptions.RequestException, httpx.HTTPError, concurrent.futures.TimeoutError)
+_GROQ_ASYNC_LOOP = None
+_GROQ_ASYNC_CLIENT = None
+_GROQ_RATE_GATE = None
+_GROQ_ASYNC_LOOP_PID = None
+_GROQ_ASYNC_LOOP_LOCK = threading.Lock()
+
+# --- Adaptive Groq rate-limit gate ---
+# Every call on the background loop passes through one gate per worker. The concurrency limit is AIMD:
+# +1 after each successful call, halved on a 429. When Groq reports an exhausted request/token window
+# (x-ratelimit-remaining-* == 0) or sends retry-after, new calls hold off until the window resets
+# instead of burning retries and landing on the algorithmic fallback.
+GROQ_MAX_CONCURRENT_CALLS = 32
+GROQ_RATE_LIMIT_MAX_WAIT_SECONDS = 10 # Keeps a held-off call well inside GROQ_FUTURE_TIMEOUT_SECONDS
+_GROQ_RESET_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_GROQ_RESET_UNIT_SECONDS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+def _parse_groq_reset_seconds(value):
+    """Parses Groq's reset / retry-after headers ("7.66s", "2m59.56s", "120ms" or plain seconds)."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _GROQ_RESET_DURATION_PATTERN.findall(value)
+    return sum(float(amount) * _GROQ_RESET_UNIT_SECONDS[unit] for amount, unit in parts) if parts else None
+
+class GroqRateGate:
+    """AIMD concurrency limiter for Groq calls. Only touched from the background loop, so no locking is needed."""
+    def __init__(self, max_limit):
+        self.max_limit = max_limit
+        self.limit = max_limit
+        self.in_flight = 0
+        self.resume_at = 0.0 # time.monotonic() before which no new call is started
+        self._condition = None # Created on first use so it binds to the loop that awaits it
+
+    async def acquire(self):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        hold_off = self.resume_at - time.monotonic()
+        if hold_off > 0:
+            await asyncio.sleep(hold_off)
+
+    async def release(self, response):
+        async with self._condition:
+            self.in_flight -= 1
+            if response is not None:
+                self._adapt(response)
+            self._condition.notify_all()
+
+    def _adapt(self, response):
+        if response.status_code == 429:
+            self.limit = max(1, self.limit // 2)
+            wait_seconds = _parse_groq_reset_seconds(response.headers.get("retry-after")) or 1.0
+            self._hold_off(wait_seconds)
+            LOGGER.warning("🚦 Groq rate limited: concurrency limit now %s, holding off %.1fs", self.limit, min(wait_seconds, GROQ_RATE_LIMIT_MAX_WAIT_SECONDS))
+            return
+        if response.status_code < 400:
+            self.limit = min(self.max_limit, self.limit + 1)
+        for window in ("requests", "tokens"):
+            if response.headers.get(f"x-ratelimit-remaining-{window}") == "0":
+                reset_seconds = _parse_groq_reset_seconds(response.headers.get(f"x-ratelimit-reset-{window}"))
+                if reset_seconds:
+                    self._hold_off(reset_seconds)
+
+    def _hold_off(self, seconds):
+        self.resume_at = max(self.resume_at, time.monotonic() + min(seconds, GROQ_RATE_LIMIT_MAX_WAIT_SECONDS))
+
+def get_groq_async_loop_and_client():
+    """Returns this process's Groq event loop and client, starting them on first use.
+    Started lazily and keyed by PID so a loop thread created before a gunicorn fork is never reused in the child."""
+    global _GROQ_ASYNC_LOOP, _GROQ_ASYNC_CLIENT, _GROQ_ASYNC_LOOP_PID, _GROQ_RATE_GATE
+    with _GROQ_ASYNC_LOOP_LOCK:
+        if _GROQ_ASYNC_LOOP is None or _GROQ_ASYNC_LOOP_PID != os.getpid():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="groq-async-loop", daemon=True).start()
+            _GROQ_ASYNC_CLIENT = httpx.AsyncClient(
+                http2=True,
+                headers=GROQ_AUTH_HEADERS, # Sent on every call, so call sites only pass the payload
+                limits=httpx.Limits(max_connections=128, max_keepalive_connections=64),
+                timeout=httpx.Timeout(GROQ_REQUEST_TIMEOUT[1], connect=GROQ_REQUEST_TIMEOUT[0])
+            )
+            _GROQ_RATE_GATE = GroqRateGate(GROQ_MAX_CONCURRENT_CALLS)
+            _GROQ_ASYNC_LOOP = loop
+            _GROQ_ASYNC_LOOP_PID = os.getpid()
+            LOGGER.info("⚡ Started Groq async loop for worker PID %s", _GROQ_ASYNC_LOOP_PID)
+        return _GROQ_ASYNC_LOOP, _GROQ_ASYNC_CLIENT
+
+async def _prime_groq_connection(client):
+    try:
+        await client.get(GROQ_MODELS_URL) # Cheap authenticated call; leaves a warm HTTP/2 connection in the pool
+        LOGGER.info("⚡ Groq connection primed for worker PID %s", os.getpid())
+    except httpx.HTTPError as e:
+        LOGGER.warning("⚠️ Could not prime Groq connection (first call will connect instead): %s", e)
+
+def warm_up_groq_async_client():
+    """Starts this worker's Groq loop/client and opens the first connection in the background.
+    Called from gunicorn's post_fork hook so the first LLM request doesn't pay for loop startup or the TLS handshake."""
+    loop, client = get_groq_async_loop_and_client()
+    if groq_api_key:
+        asyncio.run_coroutine_threadsafe(_prime_groq_connection(client), loop) # Fire-and-forget; never blocks the worker
+
+GROQ_SHUTDOWN_TIMEOUT_SECONDS = 2
+
+def close_groq_clients():
+    """Closes the pooled Groq connections at interpreter exit so workers send a clean TLS close instead of dropping sockets."""
+    GROQ_SESSION.close()
+    with _GROQ_ASYNC_LOOP_LOCK:
+        loop, client = _GROQ_ASYNC_LOOP, _GROQ_ASYNC_CLIENT
+        if loop is None or _GROQ_ASYNC_LOOP_PID != os.getpid() or not loop.is_running():
+            return
+    try:
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout=GROQ_SHUTDOWN_TIMEOUT_SECONDS)
+    except Exception as e:
+        LOGGER.warning("⚠️ Could not close Groq async client cleanly: %s", e)
+    loop.call_soon_threadsafe(loop.stop)
+
+atexit.register(close_groq_clients)
+
+# Connection-level failures that happen before Groq has spent time on the completion; a read timeout is not retried
+# because a second 30s wait would outlast GROQ_FUTURE_TIMEOUT_SECONDS anyway.
+GROQ_RETRY_TRANSPORT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+async def _post_groq_chat_async(client, payload):
+    # Same retry policy as GROQ_SESSION: back off (with jitter) on rate limits / 5xx / dropped connections,
+    # then hand back the last response. Retry-After on a 429 is honored by the rate gate's next acquire().
+    # payload is either a dict or a body already encoded with encode_groq_payload().
+    request_body = {"content": payload} if isinstance(payload, bytes) else {"json": payload}
+    for attempt in range(GROQ_MAX_RETRIES + 1):
+        await _GROQ_RATE_GATE.acquire()
+        response = None
+        try:
+            response = await client.post(GROQ_CHAT_COMPLETIONS_URL, **request_body)
+        except GROQ_RETRY_TRANSPORT_ERRORS as e:
+            if attempt == GROQ_MAX_RETRIES:
+                raise
+            LOGGER.warning("⚠️ Groq connection failed (attempt %s/%s), retrying: %s", attempt + 1, GROQ_MAX_RETRIES + 1, e)
+        finally:
+            await _GROQ_RATE_GATE.release(response) # A 429 here makes the next acquire() wait out the window
+        if response is not None and (response.status_code not in GROQ_RETRY_STATUS_CODES or attempt == GROQ_MAX_RETRIES):
+            return response
+        await asyncio.sleep(GROQ_RETRY_BACKOFF_SECONDS * (2 ** attempt) + random.uniform(0, GROQ_RETRY_BACKOFF_SECONDS))
+
+# --- Single-flight for identical Groq calls ---
+# Bursts often carry the exact same payload (same creator re-scored, same canned query) within milliseconds.
+# While one call for a payload is in flight, identical calls await that same task instead of posting again.
+# Only touched from the background loop thread, so the dict needs no lock.
+_GROQ_INFLIGHT_CALLS = {}
+
+def _groq_payload_fingerprint(payload):
+    payload_bytes = payload if isinstance(payload, bytes) else orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload_bytes).hexdigest()
+
+async def _post_groq_chat_single_flight(client, payload):
+    fingerprint = _groq_payload_fingerprint(payload)
+    task = _GROQ_INFLIGHT_CALLS.get(fingerprint)
+    if task is None:
+        task = asyncio.get_running_loop().create_task(_post_groq_chat_async(client, payload))
+        _GROQ_INFLIGHT_CALLS[fingerprint] = task
+        task.add_done_callback(lambda _: _GROQ_INFLIGHT_CALLS.pop(fingerprint, None))
+    else:
+        LOGGER.info("🔁 Joined an identical in-flight Groq call")
+    # Shielded so one caller timing out doesn't cancel the call the others are waiting on
+    return await asyncio.shield(task)
+
+def build_groq_payload_prefix(**static_fields):
+    """Serializes the constant part of a Groq payload (model, temperature, max_tokens, ...) once, at import.
+    Returns the JSON object bytes without the closing brace so per-request messages can be appended."""
+    return orjson.dumps(static_fields)[:-1]
+
+def encode_groq_payload(payload_prefix, messages, stream=False):
+    """Completes a pre-serialized payload prefix with this request's messages (and the stream flag if requested)."""
+    stream_field = b',"stream":true' if stream else b''
+    return payload_prefix + stream_field + b',"messages":' + orjson.dumps(messages) + b'}'
+
+def call_groq_chat(payload):
+    """Posts a chat completion through the background loop and blocks only this thread until it returns.
+    The httpx.Response supports raise_for_status()/json() like the requests.Response it replaces."""
+    loop, client = get_groq_async_loop_and_client()
+    future = asyncio.run_coroutine_threadsafe(_post_groq_chat_single_flight(client, payload), loop)
+    try:
+        return future.result(timeout=GROQ_FUTURE_TIMEOUT_SECONDS)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+async def _fan_out_groq_chats(client, payloads, max_concurrency, max_wait_seconds):
+    semaphore = asyncio.Semaphore(max_concurrency) # Created on the loop thread, per batch
+    async def post_one(payload):
+        async with semaphore:
+            return await _post_groq_chat_single_flight(client, payload)
+    tasks = [asyncio.ensure_future(post_one(payload)) for payload in payloads]
+    _, unfinished = await asyncio.wait(tasks, timeout=max_wait_seconds)
+    for task in unfinished:
+        task.cancel() # Finished calls keep their results; only the stragglers are given up on
+    return [concurrent.futures.TimeoutError(f"Batch wait limit of {max_wait_seconds}s reached") if task in unfinished else (task.exception() or task.result())
+            for task in tasks]
+
+def call_groq_chat_batch(payloads, max_concurrency=16):
+    """Runs several chat completions concurrently on the background loop, at most max_concurrency in flight.
+    Returns one item per payload, in order: an httpx.Response, or the exception that request raised.
+    The whole batch waits at most ~GROQ_BATCH_MAX_WAIT_SECONDS; calls still running then come back as TimeoutError."""
+    if not payloads:
+        return []
+    loop, client = get_groq_async_loop_and_client()
+    waves = -(-len(payloads) // max_concurrency) # ceil division
+    max_wait_seconds = min(GROQ_FUTURE_TIMEOUT_SECONDS * waves, GROQ_BATCH_MAX_WAIT_SECONDS)
+    future = asyncio.run_coroutine_threadsafe(_fan_out_groq_chats(client, payloads, max_concurrency, max_wait_seconds), loop)
+    try:
+        return future.result(timeout=max_wait_seconds + 5) # Slack for the loop to hand back the finished results
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+# The PostgREST session on supabase_client is shared by every thread in the process. Handlers that
+# temporarily swap in a user's JWT hold this lock from the swap until the original headers are restored,
+# so one request's Authorization header can never be applied to another thread's query.
+SUPABASE_POSTGREST_AUTH_LOCK = threading.Lock()
 
 # Twilio Credentials
 twilio_account_sid = os.getenv("TWILIO_ACCOUNT_SID")
@@ -153,12 +547,41 @@ twilio_phone_number = os.getenv("TWILIO_PHONE_NUMBER") # Your Twilio phone numbe
 elevenlabs_api_key = os.getenv("ELEVENLABS_API_KEY")
 elevenlabs_voice_id = os.getenv("ELEVENLABS_VOICE_ID", "Rachel") # Default if not set
 
+# --- Supabase HTTP connection pooling ---
+# supabase-py talks to PostgREST and GoTrue over httpx clients whose pools use httpx defaults (100 connections each).
+# Cap them per worker so a burst across all gunicorn workers stays well inside Supabase's connection ceiling,
+# and keep idle connections alive so repeated token checks / queries skip the TCP+TLS handshake.
+SUPABASE_HTTP_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("SUPABASE_HTTP_MAX_CONNECTIONS", 10)),
+    max_keepalive_connections=int(os.getenv("SUPABASE_HTTP_MAX_KEEPALIVE", 5)),
+    keepalive_expiry=30
+)
+
+def configure_supabase_http_pool(client, label):
+    """Swaps the transports of a Supabase client's PostgREST and GoTrue httpx sessions for pooled ones.
+    The SDK exposes no option for pool limits, so the underlying httpx.Client transports are replaced in place.
+    Safe to call before any request is made (module import), so no open connection is dropped."""
+    sessions = {
+        "postgrest": getattr(client.postgrest, "session", None),
+        "auth": getattr(client.auth, "_http_client", None)
+    }
+    for name, session in sessions.items():
+        if not isinstance(session, httpx.Client):
+            LOGGER.warning("⚠️ Supabase (%s): %s session not an httpx.Client, leaving its default pool.", label, name)
+            continue
+        try:
+            session._transport.close()
+            session._transport = httpx.HTTPTransport(limits=SUPABASE_HTTP_LIMITS)
+        except Exception as e:
+            LOGGER.warning("⚠️ Supabase (%s): Could not configure %s connection pool: %s", label, name, e)
+
 # Initialize Supabase Clients
 supabase_client: Client | None = None # For user-context operations (e.g., token validation)
 supabase_admin_client: Client | None = None # For privileged backend operations (e.g., storage writes)
 
 if supabase_url and supabase_key:
     supabase_client = create_client(supabase_url, supabase_key)
+    configure_supabase_http_pool(supabase_client, "anon")
     print("✅ Supabase Client (anon key) Initialized.")
 else:
     print("🔴 CRITICAL: Supabase URL or Anon Key not found. User token validation will fail.")
@@ -166,6 +589,7 @@ else:
 if supabase_url and supabase_service_key:
     try:
         supabase_admin_client = create_client(supabase_url, supabase_service_key)
+        configure_supabase_http_pool(supabase_admin_client, "admin")
         print("✅ Supabase Admin Client (service role key) Initialized Successfully.")
     except Exception as e:
         print(f"❌ Error initializing Supabase Admin Client: {e}. Storage uploads might fail.")
@@ -184,6 +608,28 @@ else:
         print(f"❌ Error initializing Twilio Client: {e}")
         twilio_client = None
 
+# Keep-alive session for downloading call recordings from Twilio's media URLs
+TWILIO_MEDIA_SESSION = requests.Session()
+TWILIO_MEDIA_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=[404, 429, 500, 502, 503, 504], allowed_methods=["GET"], raise_on_status=False) # 404 while Twilio is still finalizing the media
+))
+TWILIO_MEDIA_TIMEOUT = (3.05, 60) # (connect, read) seconds
+TWILIO_MEDIA_CHUNK_BYTES = 64 * 1024
+if twilio_account_sid and twilio_auth_token:
+    TWILIO_MEDIA_SESSION.auth = (twilio_account_sid, twilio_auth_token) # Media URLs need the account's Basic auth
+
+def download_twilio_media(url, dest_path):
+    """Streams a Twilio media URL to dest_path in TWILIO_MEDIA_CHUNK_BYTES chunks and returns the number of bytes written,
+    so a multi-MB recording never sits in memory whole."""
+    with TWILIO_MEDIA_SESSION.get(url, stream=True, timeout=TWILIO_MEDIA_TIMEOUT) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        with open(dest_path, 'wb') as f:
+            shutil.copyfileobj(response.raw, f, length=TWILIO_MEDIA_CHUNK_BYTES)
+            return f.tell()
+
 # Initialize ElevenLabs Client
 if not elevenlabs_api_key:
     print("🔴 WARNING: ElevenLabs API key not configured. AI TTS will use Twilio's basic TTS.")
@@ -198,13 +644,63 @@ else:
 
 # Ensure a temporary directory for audio files exists
 TEMP_AUDIO_DIR = os.path.join(app.root_path, 'temp_audio')
-if not os.path.exists(TEMP_AUDIO_DIR):
-    os.makedirs(TEMP_AUDIO_DIR)
+os.makedirs(TEMP_AUDIO_DIR, mode=0o700, exist_ok=True) # One mkdir; safe if another worker created it first
 
 # Simple in-memory store for recent transcripts (NOT for production - use a DB for persistence)
-# Key: outreach_id, Value: list of recent transcript texts
-recent_transcripts_store = {}
+# Key: outreach_id, Value: deque of recent transcript texts. Kept in LRU order so a long-running worker's
+# memory stays capped: each deque trims itself and the least recently touched outreach is evicted first.
+recent_transcripts_store = OrderedDict()
 MAX_TRANSCRIPTS_PER_OUTREACH = 3 # Store last 3 transcripts for context
+MAX_OUTREACH_KEYS = 10_000
+_RECENT_TRANSCRIPTS_LOCK = threading.Lock()
+
+# With REDIS_URL set, transcripts live in Redis instead so every gunicorn worker sees the same call history
+# (the Twilio callback and the negotiation request rarely land on the same worker). The dict above is the fallback.
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_TRANSCRIPT_TTL_SECONDS = 3600
+redis_client = None
+if REDIS_URL:
+    try:
+        redis_client = redis.Redis(connection_pool=redis.ConnectionPool.from_url(REDIS_URL, max_connections=32, decode_responses=True))
+        LOGGER.info("✅ Redis transcript store configured.")
+    except Exception as e:
+        LOGGER.warning("❌ Error configuring Redis transcript store: %s. Falling back to per-worker memory.", e)
+        redis_client = None
+
+def _transcript_redis_key(outreach_id):
+    return f"tx:{outreach_id}"
+
+def push_transcript(outreach_id, text):
+    if redis_client is not None:
+        key = _transcript_redis_key(outreach_id)
+        try:
+            pipe = redis_client.pipeline()
+            pipe.rpush(key, text)
+            pipe.ltrim(key, -MAX_TRANSCRIPTS_PER_OUTREACH, -1) # Native bounded list, oldest first
+            pipe.expire(key, REDIS_TRANSCRIPT_TTL_SECONDS)
+            pipe.execute()
+            return
+        except redis.RedisError as e:
+            LOGGER.warning("⚠️ Redis transcript push failed for %s: %s. Keeping it in worker memory.", outreach_id, e)
+    with _RECENT_TRANSCRIPTS_LOCK:
+        transcripts = recent_transcripts_store.get(outreach_id)
+        if transcripts is None:
+            transcripts = recent_transcripts_store[outreach_id] = deque(maxlen=MAX_TRANSCRIPTS_PER_OUTREACH)
+        else:
+            recent_transcripts_store.move_to_end(outreach_id)
+        transcripts.append(text)
+        while len(recent_transcripts_store) > MAX_OUTREACH_KEYS:
+            recent_transcripts_store.popitem(last=False)
+
+def get_recent_transcripts(outreach_id):
+    if redis_client is not None:
+        try:
+            return tuple(redis_client.lrange(_transcript_redis_key(outreach_id), 0, -1))
+        except redis.RedisError as e:
+            LOGGER.warning("⚠️ Redis transcript read failed for %s: %s. Using worker memory.", outreach_id, e)
+    # Snapshot as a tuple so callers can join / hash it while the callback thread keeps appending
+    with _RECENT_TRANSCRIPTS_LOCK:
+        return tuple(recent_transcripts_store.get(outreach_id, ()))
 
 # Simple in-memory store for call artifacts (NOT for production - use a DB for persistence)
 # Key: call_sid, Value: { recording_url: str, transcript: str, duration: str, outreach_id: str }
@@ -241,14 +737,14 @@ NICHE_MAP = {
 def get_google_user_credentials(user_id: str) -> GoogleCredentials | None:
     # WORKAROUND: Using supabase_admin_client for reading due to RLS issues with regular client.
     if not supabase_admin_client:
-        print(f"User {user_id}: Supabase ADMIN client not initialized. Cannot perform diagnostic read.", flush=True)
+        LOGGER.info("User %s: Supabase ADMIN client not initialized. Cannot perform diagnostic read.", user_id)
         return None
 
     required_scopes_list = GOOGLE_OAUTH_SCOPES
     if isinstance(GOOGLE_OAUTH_SCOPES, str):
         required_scopes_list = [s.strip() for s in GOOGLE_OAUTH_SCOPES.split(',')]
 
-    print(f"User {user_id}: Attempting to fetch Google OAuth tokens from Supabase USING ADMIN CLIENT (RLS WORKAROUND).", flush=True)
+    LOGGER.info("User %s: Attempting to fetch Google OAuth tokens from Supabase USING ADMIN CLIENT (RLS WORKAROUND).", user_id)
     
     try:
         # Fetch all rows using supabase_admin_client
@@ -268,10 +764,10 @@ def get_google_user_credentials(user_id: str) -> GoogleCredentials | None:
                     break
             
             if not user_token_data:
-                print(f"User {user_id}: (ADMIN READ) No token data found for the *current* user_id ('{user_id}') after checking all fetched records.", flush=True)
+                LOGGER.info("User %s: (ADMIN READ) No token data found for the *current* user_id ('%s') after checking all fetched records.", user_id, user_id)
                 return None
         else:
-            print(f"User {user_id}: (ADMIN READ) No data returned from user_google_oauth_tokens by ADMIN client.", flush=True)
+            LOGGER.info("User %s: (ADMIN READ) No data returned from user_google_oauth_tokens by ADMIN client.", user_id)
             return None
         
         access_token = user_token_data.get('access_token')
@@ -282,7 +778,7 @@ def get_google_user_credentials(user_id: str) -> GoogleCredentials | None:
         client_secret_from_db = user_token_data.get('client_secret', GOOGLE_CLIENT_SECRET)
 
         if not access_token:
-            print(f"User {user_id}: (ADMIN READ) Access token missing in the identified user_token_data.", flush=True)
+            LOGGER.info("User %s: (ADMIN READ) Access token missing in the identified user_token_data.", user_id)
             return None
 
         expiry_datetime_utc = None
@@ -296,7 +792,7 @@ def get_google_user_credentials(user_id: str) -> GoogleCredentials | None:
                     aware_expiry_dt = datetime.fromisoformat(expiry_str)
                 expiry_datetime_utc = aware_expiry_dt.astimezone(timezone.utc).replace(tzinfo=None)
             except Exception as e_parse:
-                print(f"User {user_id}: (ADMIN READ) ERROR parsing expiry_timestamp_utc '{raw_expiry_timestamp}': {type(e_parse).__name__} - {e_parse}", flush=True)
+                LOGGER.warning("User %s: (ADMIN READ) ERROR parsing expiry_timestamp_utc '%s': %s - %s", user_id, raw_expiry_timestamp, type(e_parse).__name__, e_parse)
                 expiry_datetime_utc = None
 
         stored_scopes_raw = user_token_data.get('scopes')
@@ -305,7 +801,7 @@ def get_google_user_credentials(user_id: str) -> GoogleCredentials | None:
             parsed_scopes_for_creds = stored_scopes_raw
         elif isinstance(stored_scopes_raw, str):
             try:
-                parsed_scopes_for_creds = json.loads(stored_scopes_raw)
+                parsed_scopes_for_creds = orjson.loads(stored_scopes_raw)
                 if not isinstance(parsed_scopes_for_creds, list): 
                     parsed_scopes_for_creds = []
             except json.JSONDecodeError:
@@ -325,49 +821,126 @@ def get_google_user_credentials(user_id: str) -> GoogleCredentials | None:
         return credentials
 
     except APIError as e_api: 
-        print(f"User {user_id}: (ADMIN READ) Supabase APIError: {e_api}", flush=True)
-        print(f"User {user_id}: (ADMIN READ) APIError details: code={getattr(e_api, 'code', 'N/A')}, message={getattr(e_api, 'message', 'N/A')}", flush=True)
+        LOGGER.error("User %s: (ADMIN READ) Supabase APIError: %s", user_id, e_api)
+        LOGGER.error("User %s: (ADMIN READ) APIError details: code=%s, message=%s", user_id, getattr(e_api, 'code', 'N/A'), getattr(e_api, 'message', 'N/A'))
         return None
     except Exception as e:
-        print(f"User {user_id}: (ADMIN READ) General Exception: {type(e).__name__} - {e}", flush=True)
-        import traceback
-        print(traceback.format_exc(), flush=True)
+        LOGGER.exception("User %s: (ADMIN READ) General Exception: %s - %s", user_id, type(e).__name__, e)
         return None
 
 # --- Google OAuth Helper Functions --- END ---
 
+# --- Validated Token Cache ---
+# Avoids a Supabase GoTrue round-trip on every request. Keyed by the SHA-256 of the bearer
+# token (raw JWTs are never used as keys); each entry lives at most TOKEN_CACHE_TTL_SECONDS
+# and never beyond the token's own `exp` claim, so a token is still re-validated once a minute.
+TOKEN_CACHE_TTL_SECONDS = 60
+_TOKEN_CACHE = TTLCache(maxsize=4096, ttl=TOKEN_CACHE_TTL_SECONDS)
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+def _read_jwt_exp_claim(token: str) -> float | None:
+    """Reads the `exp` claim from a JWT payload without verifying the signature (callers only use it after Supabase validated the token)."""
+    try:
+        payload_segment = token.split('.')[1]
+        payload_segment += '=' * (-len(payload_segment) % 4)
+        exp_claim = orjson.loads(base64.urlsafe_b64decode(payload_segment)).get('exp')
+        return float(exp_claim) if exp_claim is not None else None
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return None
+
+def _get_cached_token_user(token_cache_key: str):
+    with _TOKEN_CACHE_LOCK:
+        cached_entry = _TOKEN_CACHE.get(token_cache_key)
+        if cached_entry is None:
+            return None
+        cached_user, valid_until = cached_entry
+        if time.time() >= valid_until: # JWT expired before the TTL did
+            _TOKEN_CACHE.pop(token_cache_key, None)
+            return None
+        return cached_user
+
+def _cache_token_user(token_cache_key: str, token: str, user) -> None:
+    valid_until = time.time() + TOKEN_CACHE_TTL_SECONDS
+    exp_claim = _read_jwt_exp_claim(token)
+    if exp_claim is not None:
+        valid_until = min(valid_until, exp_claim)
+    if valid_until <= time.time():
+        return
+    with _TOKEN_CACHE_LOCK:
+        _TOKEN_CACHE[token_cache_key] = (user, valid_until)
+
+def _verify_supabase_jwt_locally(token: str):
+    """
+    Verifies a Supabase access token against the project's JWT secret (HS256) without calling GoTrue.
+    Returns a user object exposing the same `id` attribute handlers read from supabase_client.auth.get_user().
+    Raises jwt.InvalidTokenError (incl. ExpiredSignatureError) for bad tokens.
+    """
+    claims = jwt.decode(
+        token,
+        supabase_jwt_secret,
+        algorithms=["HS256"],
+        audience="authenticated",
+        options={"require": ["exp", "sub"]}
+    )
+    return SimpleNamespace(
+        id=claims['sub'],
+        email=claims.get('email'),
+        role=claims.get('role'),
+        app_metadata=claims.get('app_metadata', {}),
+        user_metadata=claims.get('user_metadata', {})
+    )
+
 # --- JWT Authentication Decorator ---
 def token_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        print(f"🕵️ ENTERING @token_required for endpoint: {request.endpoint}, method: {request.method}") # DEBUG
-        if request.method == 'OPTIONS':
-            print("🕵️ @token_required: OPTIONS request, passing through.") # DEBUG
-            # Allow OPTIONS requests to pass through. Flask-CORS will handle them.
-            return f(*args, **kwargs)
-
-        token = None
-        if "Authorization" in request.headers:
-            auth_header = request.headers["Authorization"]
-            print(f"🕵️ @token_required: Authorization header found: {auth_header[:30]}...") # DEBUG
-            try:
-                token = auth_header.split(" ")[1] # Bearer <token>
-            except IndexError:
-                print("🕵️ @token_required: Malformed Authorization header.") # DEBUG
-                return jsonify({"success": False, "error": "Malformed Authorization header"}), 401
-        else:
-            print("🕵️ @token_required: Authorization header MISSING.") # DEBUG
-
+        LOGGER.debug("🕵️ ENTERING @token_required for endpoint: %s, method: %s", request.endpoint, request.method) # DEBUG
+        auth_header = request.headers.get("Authorization", "")
+        if not auth_header:
+            LOGGER.debug("🕵️ @token_required: Authorization header MISSING.") # DEBUG
+            return jsonify({"success": False, "error": "Authorization token is missing"}), 401
+        if not auth_header.startswith("Bearer "):
+            LOGGER.debug("🕵️ @token_required: Malformed Authorization header.") # DEBUG
+            return jsonify({"success": False, "error": "Malformed Authorization header"}), 401
+        token = auth_header[7:].strip() # Bearer <token>
 
         if not token:
-            print("🕵️ @token_required: Token is missing after checks.") # DEBUG
+            LOGGER.debug("🕵️ @token_required: Token is missing after checks.") # DEBUG
             return jsonify({"success": False, "error": "Authorization token is missing"}), 401
 
+        token_cache_key = hashlib.sha256(token.encode()).hexdigest()
+        cached_user = _get_cached_token_user(token_cache_key)
+        if cached_user is not None:
+            request.current_user = cached_user
+            g.current_user = cached_user
+            g.user_id = cached_user.id
+            request.raw_jwt = token
+            return f(*args, **kwargs)
+
+        if supabase_jwt_secret:
+            # Local HS256 verification: no network round-trip to Supabase Auth
+            try:
+                verified_user = _verify_supabase_jwt_locally(token)
+            except jwt.ExpiredSignatureError:
+                LOGGER.debug("❌ @token_required: Token expired (local verification).") # DEBUG
+                return jsonify({"success": False, "error": "Invalid or expired token: token has expired"}), 401
+            except jwt.InvalidTokenError as e:
+                LOGGER.debug("❌ @token_required: Token validation error (local verification): %s - %s", type(e).__name__, str(e)) # DEBUG
+                return jsonify({"success": False, "error": f"Invalid or expired token: {str(e)}"}), 401
+            LOGGER.debug("🔑 @token_required: Token verified locally for user: %s", verified_user.id) # DEBUG
+            request.current_user = verified_user
+            g.current_user = verified_user
+            g.user_id = verified_user.id
+            request.raw_jwt = token
+            _cache_token_user(token_cache_key, token, verified_user)
+            return f(*args, **kwargs)
+
+        # No JWT secret configured: fall back to asking Supabase Auth to validate the token
         if not supabase_client:
-            print("🕵️ @token_required: Supabase client not initialized.") # DEBUG
+            LOGGER.debug("🕵️ @token_required: Supabase client not initialized.") # DEBUG
             return jsonify({"success": False, "error": "Supabase client not initialized on backend for token validation."}), 500
 
-        print(f"🕵️ @token_required: Attempting to validate token: {token[:20]}...") # DEBUG
+        LOGGER.debug("🕵️ @token_required: Attempting to validate token: %s...", token[:20]) # DEBUG
         try:
             user_response = supabase_client.auth.get_user(token)
             # Ensure user_response and user_response.user are not None before accessing properties
@@ -375,17 +948,18 @@ def token_required(f):
             if user_response and hasattr(user_response, 'user') and user_response.user and hasattr(user_response.user, 'id'):
                 user_id_for_log = user_response.user.id
             
-            print(f"🔑 @token_required: Token validated for user: {user_id_for_log}") # DEBUG
+            LOGGER.debug("🔑 @token_required: Token validated for user: %s", user_id_for_log) # DEBUG
             request.current_user = user_response.user if user_response else None # Ensure request.current_user can be None
             g.current_user = user_response.user if user_response else None # ADDED: Set on g as well for compatibility
             request.raw_jwt = token # Store raw token on request
+            if request.current_user is not None:
+                g.user_id = request.current_user.id
+                _cache_token_user(token_cache_key, token, request.current_user)
         except Exception as e:
-            print(f"❌ @token_required: Token validation error: {type(e).__name__} - {str(e)}") # DEBUG
-            import traceback
-            traceback.print_exc() # Print full traceback for this error
+            LOGGER.exception("❌ @token_required: Token validation error: %s - %s", type(e).__name__, str(e))
             return jsonify({"success": False, "error": f"Invalid or expired token: {str(e)}"}), 401
         
-        print(f"🕵️ @token_required: Proceeding to execute wrapped function: {f.__name__}") # DEBUG
+        LOGGER.debug("🕵️ @token_required: Proceeding to execute wrapped function: %s", f.__name__) # DEBUG
         return f(*args, **kwargs)
     return decorated_function
 
@@ -416,20 +990,15 @@ def build_document_extraction_prompt(text_content: str) -> str:
 Extract the information and structure it as a VALID JSON object.
 The JSON object MUST strictly follow this structure. For any fields where information is not found or cannot be reasonably inferred from the text, use `null` for string fields or an empty list `[]` for list fields.
 Do NOT add any fields that are not in this predefined structure.
-Ensure your entire output is ONLY the JSON object and nothing else. No introductory text, no explanations, no markdown formatting around the JSON.
 
 JSON Structure to populate:
-```json
 {json.dumps(json_structure_example, indent=2)}
-```
 
 Now, analyze the following text content and extract the campaign requirements:
 
 --- DOCUMENT TEXT ---
 {text_content}
 --- END OF DOCUMENT TEXT ---
-
-Your output must be a single, valid JSON object.
 """
     return prompt
 
@@ -437,60 +1006,50 @@ def extract_campaign_details_with_llm(text_content: str): # Synchronous function
     """
     Uses Groq LLM to extract structured campaign requirements from text.
     Returns a dictionary with keys "success" (boolean) and either "data" (dict) or "error" (str).
-    Uses requests.post directly, consistent with other Groq calls in this file.
+    Uses call_groq_chat (shared async client), consistent with other Groq calls in this file.
     """
     global groq_api_key # Use the global groq_api_key loaded from .env
     if not groq_api_key:
-        print("❌ Groq API key not available for campaign detail extraction.")
+        LOGGER.error("❌ Groq API key not available for campaign detail extraction.")
         return {"success": False, "error": "Groq API key not configured on backend."}
 
     system_prompt = "You are an AI assistant specialized in extracting structured information from text according to a specified JSON format. Output only the JSON object."
     user_prompt = build_document_extraction_prompt(text_content)
     
-    print("🧠 Calling Groq LLM (via requests.post) for campaign detail extraction...")
+    LOGGER.info("🧠 Calling Groq LLM (via call_groq_chat) for campaign detail extraction...")
     
-    headers = {
-        "Authorization": f"Bearer {groq_api_key}",
-        "Content-Type": "application/json"
-    }
     payload = {
-        "model": "llama3-70b-8192", # Or your preferred Groq model
+        "model": GROQ_LARGE_MODEL, # Or your preferred Groq model
         "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ],
         "temperature": 0.1, # Low temperature for more deterministic extraction
-        "max_tokens": 2048 # Ensure enough tokens for potentially large JSON
+        "max_tokens": 2048, # Ensure enough tokens for potentially large JSON
+        "response_format": {"type": "json_object"}
     }
     
     response_content = None # Initialize to ensure it's defined for the except block
     try:
-        response = requests.post("https://api.groq.com/openai/v1/chat/completions", headers=headers, json=payload)
+        response = call_groq_chat(payload)
         response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
         
-        ai_response_data = response.json()
+        ai_response_data = orjson.loads(response.content)
         
         if not ai_response_data.get('choices') or not ai_response_data['choices'][0].get('message') or \
            not ai_response_data['choices'][0]['message'].get('content'):
-            print(f"❌ Groq API response missing expected content structure. Response: {ai_response_data}")
+            LOGGER.error("❌ Groq API response missing expected content structure. Response: %s", ai_response_data)
             return {"success": False, "error": "LLM response structure invalid."}
             
         response_content = ai_response_data['choices'][0]['message']['content']
         
-        print(f"💬 LLM Raw Response (first 300 chars): {response_content[:300]}")
+        LOGGER.info("💬 LLM Raw Response (first 300 chars): %s", response_content[:300])
         
-        json_response_cleaned = response_content.strip()
-        if json_response_cleaned.startswith("```json"):
-            json_response_cleaned = json_response_cleaned[7:]
-        if json_response_cleaned.endswith("```"):
-            json_response_cleaned = json_response_cleaned[:-3]
-        json_response_cleaned = json_response_cleaned.strip()
-        
-        extracted_data = json.loads(json_response_cleaned)
-        print("✅ Successfully parsed LLM JSON response for campaign details.")
+        extracted_data = extract_first_json(response_content)
+        LOGGER.info("✅ Successfully parsed LLM JSON response for campaign details.")
         return {"success": True, "data": extracted_data}
 
-    except requests.exceptions.HTTPError as http_err:
+    except (requests.exceptions.HTTPError, httpx.HTTPStatusError) as http_err:
         error_details = f"HTTP error occurred: {http_err}."
         try:
             # Try to get more details from the response body if it's JSON
@@ -498,94 +1057,361 @@ def extract_campaign_details_with_llm(text_content: str): # Synchronous function
             error_details += f" Details: {error_body.get('error', {}).get('message', 'No specific error message in JSON.')}"
         except ValueError: # If response body is not JSON
             error_details += f" Response text: {http_err.response.text[:200]}" # Log first 200 chars
-        print(f"❌ Groq API call failed: {error_details}")
+        LOGGER.error("❌ Groq API call failed: %s", error_details)
         return {"success": False, "error": f"LLM API call failed. {error_details}"}
-    except requests.exceptions.RequestException as req_err:
-        print(f"❌ Groq API request failed: {req_err}")
+    except GROQ_TRANSPORT_ERRORS as req_err:
+        LOGGER.error("❌ Groq API request failed: %s", req_err)
         return {"success": False, "error": f"LLM API request failed: {str(req_err)}"}
-    except json.JSONDecodeError as e:
+    except ValueError as e: # json.JSONDecodeError, or no JSON object in the reply at all
         error_message = f"Error decoding LLM JSON response: {str(e)}. Response snippet: {response_content[:300] if response_content else 'None'}"
-        print(f"❌ {error_message}")
+        LOGGER.error("❌ %s", error_message)
         return {"success": False, "error": "Failed to parse LLM response as JSON.", "raw_response_snippet": response_content[:300] if response_content else 'None'}
     except Exception as e:
-        print(f"❌ Error during Groq API call or processing for campaign extraction: {e}")
-        import traceback
-        traceback.print_exc()
+        LOGGER.exception("❌ Error during Groq API call or processing for campaign extraction: %s", e)
         return {"success": False, "error": f"LLM API call or processing failed: {str(e)}"}
 
 # --- Campaign Requirement Extraction Helpers --- END ---
-# --- Helper: Build Stage-Aware Negotiation Prompt (Python version) ---
-def build_stage_aware_negotiation_prompt(outreach_data):
-    # Basic details (ensure keys match what frontend sends)
-    creator_name = outreach_data.get('creatorName', 'N/A')
-    creator_platform = outreach_data.get('creatorPlatform', 'N/A')
-    current_status = outreach_data.get('status', 'N/A')
-    confidence_score = outreach_data.get('confidence', 0)
-    brand_name = outreach_data.get('brandName', 'N/A')
-    campaign_context_summary = outreach_data.get('campaignContext', 'N/A')[:150] # Summary
-    current_offer_raw = outreach_data.get('currentOffer')
-    current_offer_str = f"₹{current_offer_raw}" if current_offer_raw else 'Not set'
-    
-    # Get email conversation history summary from the payload (as before)
-    email_conversation_summary = outreach_data.get('conversationHistorySummary', "No previous email conversation.")
-    
-    # Get recent call transcripts from our in-memory store
-    call_transcripts = recent_transcripts_store.get(outreach_data.get('id', 'unknown_outreach'), [])
-    call_transcript_summary = "\n".join(call_transcripts) if call_transcripts else "No recent call transcripts available."
-
-    has_email_history = bool(email_conversation_summary and email_conversation_summary != "No previous email conversation.")
-    has_call_history = bool(call_transcript_summary and call_transcript_summary != "No recent call transcripts available.")
-
-    combined_history_section = ""
-    if has_email_history and has_call_history:
-        combined_history_section = f"""CONVERSATION HISTORY (Emails & Calls):
-Email Summary:
-{email_conversation_summary}
-
-Recent Call Transcript Snippets:
-{call_transcript_summary}
-
-IMPORTANT: Based on ALL conversation history above..."""
-    elif has_email_history:
-        combined_history_section = f"""EMAIL CONVERSATION HISTORY:
-{email_conversation_summary}
-
-IMPORTANT: Based on the email conversation history above..."""
-    elif has_call_history:
-        combined_history_section = f"""RECENT CALL TRANSCRIPT SNIPPETS:
-{call_transcript_summary}
-
-IMPORTANT: Based on the call transcript history above..."""
-    else:
-        combined_history_section = "INITIAL OUTREACH CONTEXT: This is the beginning of the negotiation conversation."
-
-    # Simplified stage-specific guidance (we can expand this)
-    stage_guidance = ""
-    if current_status == 'interested':
-        stage_guidance = "INTERESTED STAGE: Focus on building excitement and presenting value."
-    elif current_status == 'negotiating':
-        stage_guidance = "NEGOTIATING STAGE: Address concerns and find win-win solutions."
-    else:
-        stage_guidance = "GENERAL STAGE: Maintain professional and positive tone."
-
-    prompt = f"""You are an expert negotiation agent for influencer marketing deals. Provide strategic negotiation guidance based on the current stage, context, and conversation history.
-
-OUTREACH CONTEXT:
-- Creator: {creator_name} (@{creator_platform})
-- Current Status: {current_status}
-- Confidence Score: {confidence_score}%
-- Brand: {brand_name}
-- Campaign: {campaign_context_summary}...
-- Current Offer: {current_offer_str}
-
-{combined_history_section}
-
-STAGE-SPECIFIC GUIDANCE:
-{stage_guidance}
+# --- Groq Prompt-Cache Logging ---
+def log_groq_cached_tokens(label, ai_response_data):
+    """Logs how many prompt tokens Groq served from its prefix cache, to verify static system prompts are hitting it."""
+    usage = ai_response_data.get('usage') or ai_response_data.get('x_groq', {}).get('usage') or {}
+    cached_tokens = (usage.get('prompt_tokens_details') or {}).get('cached_tokens')
+    LOGGER.info("📦 %s: Groq prompt tokens=%s, cached_tokens=%s", label, usage.get('prompt_tokens', 'N/A'), cached_tokens if cached_tokens is not None else 'N/A')
+
+# --- Prompt Token Budgeting ---
+# llama3 uses its own BPE vocabulary, so exact counts would need the model tokenizer; for budgeting a
+# conservative characters-per-token estimate is enough to keep prompts inside the budget below.
+# Per-call prompt budget, not a model limit: both routed models accept 131072 tokens, but a prompt this large means runaway
+# input (pasted documents, unbounded history) that would burn the shared tokens-per-minute quota, so such calls use the fallback
+GROQ_CONTEXT_WINDOW_TOKENS = 8192
+APPROX_CHARS_PER_TOKEN = 3.5 # Deliberately below English's ~4 so the estimate errs high
+
+def estimate_token_count(text):
+    return int(len(text) / APPROX_CHARS_PER_TOKEN) + 1 if text else 0
+
+def fit_to_token_budget(text, token_budget):
+    """Trims text from the front (keeping the most recent part) so its estimated size fits token_budget."""
+    if estimate_token_count(text) <= token_budget:
+        return text
+    return text[-int(token_budget * APPROX_CHARS_PER_TOKEN):]
+
+def truncate_to_token_budget(text, token_budget):
+    """Keeps the beginning of text, cut back to a word boundary, so its estimated size fits token_budget."""
+    if estimate_token_count(text) <= token_budget:
+        return text
+    truncated = text[:int(token_budget * APPROX_CHARS_PER_TOKEN)]
+    last_space = truncated.rfind(' ')
+    return truncated[:last_space] if last_space > 0 else truncated
+
+_HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+def clean_prompt_text(text):
+    """Drops HTML tags and collapses whitespace runs in free-form user text (bios, briefs) before it goes in a prompt."""
+    return " ".join(_HTML_TAG_PATTERN.sub(" ", text).split()) if text else text
+
+def groq_prompt_fits_context(max_tokens, *prompt_parts):
+    """True if the prompt parts plus the requested completion fit in the GROQ_CONTEXT_WINDOW_TOKENS budget."""
+    prompt_tokens = sum(estimate_token_count(part) for part in prompt_parts)
+    return prompt_tokens + max_tokens <= GROQ_CONTEXT_WINDOW_TOKENS
+
+# --- Groq JSON Extraction ---
+_JSON_DECODER = json.JSONDecoder()
+
+def extract_first_json(text):
+    """Returns the first complete JSON object embedded in an LLM reply (prose, markdown fences and stray braces are skipped).
+    Each candidate '{' is handed to raw_decode, which stops at the end of the object instead of re-scanning the whole string."""
+    # JSON-mode replies are the bare object, so try a straight parse before scanning.
+    # Only when the reply starts with '{': a prose-led reply would just raise here and go to the scan anyway.
+    if text.lstrip().startswith('{'):
+        try:
+            parsed_object = orjson.loads(text)
+            if isinstance(parsed_object, dict):
+                return parsed_object
+        except orjson.JSONDecodeError:
+            pass
+    position = 0
+    while True:
+        position = text.find('{', position)
+        if position < 0:
+            raise ValueError("Could not find valid JSON block in AI response.")
+        try:
+            parsed_object, _ = _JSON_DECODER.raw_decode(text, position)
+            return parsed_object
+        except json.JSONDecodeError:
+            position += 1
+
+# --- Groq Streaming (opt-in Server-Sent Events) ---
+# Clients that send ?stream=1 or Accept: text/event-stream get the completion token-by-token as `delta` events,
+# followed by one `result` event carrying exactly the body the plain JSON endpoint would have returned.
+def wants_event_stream():
+    return request.args.get('stream') == '1' or 'text/event-stream' in request.headers.get('Accept', '')
+
+def _format_sse_event(event_name, data):
+    return f"event: {event_name}\ndata: {app.json.dumps(data)}\n\n"
+
+def make_sse_result_response(result_body):
+    """SSE response with just the final `result` event (cache hits and other paths that never call Groq)."""
+    return Response(_format_sse_event("result", result_body), mimetype='text/event-stream', headers={"Cache-Control": "no-cache"})
+
+def iter_groq_stream_content(payload_body):
+    """Yields content deltas from a streamed Groq chat completion. payload_body comes from encode_groq_payload(..., stream=True)."""
+    with GROQ_SESSION.post(GROQ_CHAT_COMPLETIONS_URL, data=payload_body, timeout=GROQ_REQUEST_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data: "):
+                continue
+            event_data = line[len("data: "):]
+            if event_data == "[DONE]":
+                break
+            choices = orjson.loads(event_data).get('choices') or [{}]
+            delta_content = choices[0].get('delta', {}).get('content')
+            if delta_content:
+                yield delta_content
+
+def stream_groq_json_response(payload_body, on_complete, on_failure):
+    """
+    Streams a Groq JSON completion to the client as SSE.
+    on_complete(parsed_json) returns the final result body (raise ValueError to reject the object);
+    on_failure(error_message) returns the fallback result body.
+    """
+    def generate():
+        content_stream = iter_groq_stream_content(payload_body)
+        accumulated_chunks = []
+        parsed_object = None
+        open_braces = 0 # Running '{' minus '}' count (ignores strings); only gates the parse attempt below
+        try:
+            for delta_content in content_stream:
+                accumulated_chunks.append(delta_content)
+                yield _format_sse_event("delta", {"content": delta_content})
+                open_braces += delta_content.count('{') - delta_content.count('}')
+                if open_braces > 0 or '}' not in delta_content:
+                    continue
+                # Braces balanced: the top-level object has probably closed, so try to stop reading the stream early
+                accumulated_text = "".join(accumulated_chunks)
+                object_start = accumulated_text.find('{')
+                if object_start < 0:
+                    continue
+                try:
+                    parsed_object, _ = _JSON_DECODER.raw_decode(accumulated_text, object_start)
+                    break
+                except json.JSONDecodeError:
+                    continue
+            if parsed_object is None:
+                parsed_object = extract_first_json("".join(accumulated_chunks))
+            yield _format_sse_event("result", on_complete(parsed_object))
+        except ValueError as e: # Includes json.JSONDecodeError
+            LOGGER.error("Error parsing or validating streamed AI JSON response: %s", e)
+            yield _format_sse_event("result", on_failure("AI response parsing/validation failed, using fallback."))
+        except GROQ_TRANSPORT_ERRORS as e:
+            LOGGER.error("Groq API streaming request failed: %s", e)
+            yield _format_sse_event("result", on_failure(str(e)))
+        except Exception as e:
+            LOGGER.exception("An unexpected error occurred while streaming Groq response: %s", e)
+            yield _format_sse_event("result", on_failure("An unexpected error occurred on the backend."))
+        finally:
+            content_stream.close() # Releases the pooled connection when we stop before [DONE]
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# --- LLM Response Cache (canonicalized request keys) ---
+# Near-identical requests (retries, re-clicks, same creator re-scored in a batch) reuse a previous AI result
+# instead of paying for another Groq round-trip. Keys are built from a normalized subset of the payload.
+LLM_RESPONSE_CACHE_TTL_SECONDS = 3600
+_LLM_RESPONSE_CACHE = TTLCache(maxsize=2048, ttl=LLM_RESPONSE_CACHE_TTL_SECONDS)
+_LLM_RESPONSE_CACHE_LOCK = threading.Lock()
+
+def _canonicalize_cache_value(value):
+    """Trims surrounding whitespace so payloads that differ only in padding map to the same key.
+    Case and list order are kept: the prompt sees them, so they can change the answer."""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return {str(k): _canonicalize_cache_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonicalize_cache_value(v) for v in value]
+    if isinstance(value, set):
+        return sorted((_canonicalize_cache_value(v) for v in value), key=lambda v: json.dumps(v, sort_keys=True, default=str))
+    return value
+
+LLM_PROMPT_TEMPLATE_VERSION = 14 # Bump when a prompt template or model changes so stale cached answers are not served
+
+def build_llm_cache_key(endpoint, fields):
+    canonical_json = json.dumps({"endpoint": endpoint, "version": LLM_PROMPT_TEMPLATE_VERSION, "fields": _canonicalize_cache_value(fields)}, sort_keys=True, default=str)
+    return hashlib.sha256(canonical_json.encode('utf-8')).hexdigest()
+
+def get_cached_llm_response(cache_key):
+    # Hands back the stored dict itself (no re-parse on a hit). Treat it as read-only: callers spread or wrap it
+    # into their response body, and the one that needs to change a field copies it first.
+    with _LLM_RESPONSE_CACHE_LOCK:
+        return _LLM_RESPONSE_CACHE.get(cache_key)
+
+def cache_llm_response(cache_key, content):
+    # Stores the validated, adapted content, so a hit skips extraction and validation as well as the Groq call
+    with _LLM_RESPONSE_CACHE_LOCK:
+        _LLM_RESPONSE_CACHE[cache_key] = content
+
+# --- Shared Groq Endpoint Plumbing ---
+def request_groq_json(payload_body, agent_label):
+    """
+    Sends a pre-encoded chat payload, logs prompt-cache usage and returns the first JSON object in the reply.
+    Raises GROQ_TRANSPORT_ERRORS on transport/HTTP failures and ValueError when the reply holds no usable JSON.
+    """
+    response = call_groq_chat(payload_body)
+    response.raise_for_status() # Raise an exception for HTTP errors
+    ai_response_data = orjson.loads(response.content)
+    log_groq_cached_tokens(agent_label, ai_response_data)
+    ai_message_content = ai_response_data['choices'][0]['message']['content']
+    try:
+        return extract_first_json(ai_message_content)
+    except ValueError:
+        LOGGER.error("Raw AI response content that caused parsing error (%s): %s", agent_label, ai_message_content[:500])
+        raise
+
+# What a @groq_call view returns when the request should go to Groq:
+#   prompt        - dynamic user message, or a zero-argument callable that builds it (skipped on cache hits)
+#   cache_key     - key for the LLM response cache
+#   validate      - validate(parsed_json) -> content to cache/return; raises ValueError to reject
+#   success_body  - success_body(content) -> JSON response body
+#   fallback_body - fallback_body(error_message) -> JSON response body used on any failure
+#   profile       - optional GroqEndpointProfile replacing the decorator's payload prefix / max tokens / system prompt
+GroqEndpointProfile = namedtuple('GroqEndpointProfile', ['payload_prefix', 'max_tokens', 'system_prompt_builder'])
+GroqEndpointPlan = namedtuple('GroqEndpointPlan', ['prompt', 'cache_key', 'validate', 'success_body', 'fallback_body', 'profile'], defaults=(None,))
+
+def groq_call(agent_label, payload_prefix, max_tokens, system_prompt_builder):
+    """
+    Decorator for JSON-generating Groq endpoints. The view receives request.json and returns either a ready
+    Flask response (validation errors, template paths) or a GroqEndpointPlan; the decorator then handles the
+    response cache, context budget, opt-in streaming, the Groq call, JSON extraction and fallbacks uniformly.
+    system_prompt_builder may be None for endpoints that send only a user message.
+    """
+    default_profile = GroqEndpointProfile(payload_prefix, max_tokens, system_prompt_builder)
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            plan = view(request.json, *args, **kwargs)
+            if not isinstance(plan, GroqEndpointPlan):
+                return plan
+
+            def respond(body):
+                return make_sse_result_response(body) if wants_event_stream() else jsonify(body)
+
+            cached_content = get_cached_llm_response(plan.cache_key)
+            g.llm_cache_status = "MISS" if cached_content is None else "HIT"
+            if cached_content is not None:
+                LOGGER.info("⚡ %s: Cache hit, skipping Groq call.", agent_label)
+                return respond({**plan.success_body(cached_content), "cacheHit": True})
+
+            payload_prefix, max_tokens, system_prompt_builder = plan.profile or default_profile
+            prompt = plan.prompt() if callable(plan.prompt) else plan.prompt # Built only once the cache has missed
+            system_prompt = system_prompt_builder() if system_prompt_builder else ""
+            if not groq_prompt_fits_context(max_tokens, system_prompt, prompt):
+                # Groq would reject or truncate this; skip the wasted round-trip
+                LOGGER.warning("⚠️ %s: Prompt (~%s tokens) exceeds the context budget. Using fallback.", agent_label, estimate_token_count(prompt))
+                return respond(plan.fallback_body("Prompt too long for the AI model, using fallback."))
+
+            def accept_content(parsed_json):
+                content = plan.validate(parsed_json)
+                cache_llm_response(plan.cache_key, content)
+                return plan.success_body(content)
+
+            messages = [{"role": "user", "content": prompt}]
+            if system_prompt:
+                messages.insert(0, {"role": "system", "content": system_prompt})
+            if wants_event_stream():
+                return stream_groq_json_response(encode_groq_payload(payload_prefix, messages, stream=True), accept_content, plan.fallback_body)
+
+            LOGGER.info("🤖 %s: Making AI API call...", agent_label)
+            try:
+                body = accept_content(request_groq_json(encode_groq_payload(payload_prefix, messages), agent_label))
+                LOGGER.info("✨ %s: AI response generated.", agent_label)
+                return respond(body)
+            except GROQ_TRANSPORT_ERRORS as e:
+                LOGGER.error("❌ %s: Groq API request failed: %s", agent_label, e)
+                return respond(plan.fallback_body(str(e)))
+            except ValueError as e: # Includes json.JSONDecodeError
+                LOGGER.error("❌ %s: Error parsing or validating AI JSON response: %s", agent_label, e)
+                return respond(plan.fallback_body("AI response parsing/validation failed, using fallback."))
+            except Exception as e:
+                LOGGER.exception("❌ %s: An unexpected error occurred: %s", agent_label, e)
+                return respond(plan.fallback_body("An unexpected error occurred on the backend."))
+        return wrapper
+    return decorator
+
+def run_groq_batch(agent_label, plans, profile, max_concurrency):
+    """
+    Batch counterpart of groq_call: fans a list of per-item GroqEndpointPlans out over call_groq_chat_batch and
+    returns one body per item, in input order. An item may instead be a ready body dict (invalid input, template
+    path), which is passed through. Cache, context budget and fallbacks behave as in groq_call, per item.
+    """
+    results = [None] * len(plans)
+    pending = [] # Result indexes of the plans that need a Groq call
+    pending_payloads = []
+    for index, plan in enumerate(plans):
+        if not isinstance(plan, GroqEndpointPlan):
+            results[index] = plan
+            continue
+        cached_content = get_cached_llm_response(plan.cache_key)
+        if cached_content is not None:
+            results[index] = {**plan.success_body(cached_content), "cacheHit": True}
+            continue
+        payload_prefix, max_tokens, system_prompt_builder = plan.profile or profile
+        prompt = plan.prompt() if callable(plan.prompt) else plan.prompt
+        system_prompt = system_prompt_builder() if system_prompt_builder else ""
+        if not groq_prompt_fits_context(max_tokens, system_prompt, prompt):
+            LOGGER.warning("⚠️ %s: Prompt for item %s (~%s tokens) exceeds the context budget. Using fallback.", agent_label, index, estimate_token_count(prompt))
+            results[index] = plan.fallback_body("Prompt too long for the AI model, using fallback.")
+            continue
+        messages = [{"role": "user", "content": prompt}]
+        if system_prompt:
+            messages.insert(0, {"role": "system", "content": system_prompt})
+        pending.append(index)
+        pending_payloads.append(encode_groq_payload(payload_prefix, messages))
+
+    if pending:
+        LOGGER.info("🤖 %s: Fanning out %s AI calls (max %s concurrent)...", agent_label, len(pending), max_concurrency)
+        try:
+            responses = call_groq_chat_batch(pending_payloads, max_concurrency=max_concurrency)
+        except GROQ_TRANSPORT_ERRORS as e:
+            LOGGER.error("❌ %s: Groq batch request failed: %s", agent_label, e)
+            responses = [e] * len(pending)
+
+        for index, response in zip(pending, responses):
+            plan = plans[index]
+            if isinstance(response, BaseException):
+                LOGGER.error("❌ %s: Groq API request failed for item %s: %s", agent_label, index, response)
+                results[index] = plan.fallback_body(str(response))
+                continue
+            try:
+                response.raise_for_status()
+                ai_message_content = orjson.loads(response.content)['choices'][0]['message']['content']
+                content = plan.validate(extract_first_json(ai_message_content))
+                cache_llm_response(plan.cache_key, content)
+                results[index] = plan.success_body(content)
+            except GROQ_TRANSPORT_ERRORS as e:
+                LOGGER.error("❌ %s: Groq API request failed for item %s: %s", agent_label, index, e)
+                results[index] = plan.fallback_body(str(e))
+            except (KeyError, IndexError, ValueError) as e: # ValueError includes json.JSONDecodeError
+                LOGGER.error("❌ %s: Error parsing or validating AI JSON for item %s: %s", agent_label, index, e)
+                results[index] = plan.fallback_body("AI response parsing/validation failed, using fallback.")
+
+    LOGGER.info("✨ %s: Batch done for %s items.", agent_label, len(results))
+    return results
+
+# --- Helper: Build Negotiation System Prompt (static, prefix-cacheable) ---
+@lru_cache(maxsize=1)
+def build_negotiation_system_prompt():
+    # Everything here is identical across requests so Groq can serve it from its prefix cache.
+    # Per-request values belong in build_stage_aware_negotiation_prompt().
+    return """You are an expert negotiation agent for influencer marketing deals. Provide strategic negotiation guidance based on the current stage, context, and conversation history.
+
+STAGE-SPECIFIC GUIDANCE (the user message states which stage applies):
+- INTERESTED STAGE: Focus on building excitement and presenting value.
+- NEGOTIATING STAGE: Address concerns and find win-win solutions.
+- GENERAL STAGE: Maintain professional and positive tone.
 
 NEGOTIATION REQUIREMENTS:
 1. Analyze the current negotiation stage.
-2. { "Continue the conversation naturally based on previous exchanges" if (has_email_history or has_call_history) else "Provide a personalized response that starts the negotiation conversation"}
+2. If the user message provides conversation history, continue the conversation naturally based on previous exchanges. If it is the initial outreach, provide a personalized response that starts the negotiation conversation.
 3. Recommend negotiation tactics.
 4. Suggest an appropriate offer amount with reasoning.
 5. Outline clear next steps.
@@ -597,16 +1423,121 @@ RESPONSE TONE:
 - Be specific and action-oriented.
 
 Response format (JSON only):
-{{
+{
   "currentPhase": "initial_interest" | "price_discussion" | "terms_negotiation" | "closing",
   "suggestedResponse": "Personalized message for the creator.",
   "negotiationTactics": ["tactic 1", "tactic 2"],
-  "recommendedOffer": {{ "amount": number, "reasoning": "Strategic reasoning." }},
+  "recommendedOffer": { "amount": number, "reasoning": "Strategic reasoning." },
   "nextSteps": ["actionable step 1", "actionable step 2"]
-}}
-Ensure the entire response is a single, valid JSON object with no extra text, and all strings are properly quoted and elements correctly comma-separated.
+}
 Focus on building genuine relationships and creating mutually beneficial partnerships. The message should read naturally and professionally without any system-generated metadata."""
-    return prompt
+
+# --- Negotiation user-prompt templates (parsed once at import) ---
+NEGOTIATION_PROMPT_DEFAULTS = {
+    'creatorName': 'N/A',
+    'creatorPlatform': 'N/A',
+    'status': 'N/A',
+    'confidence': 0,
+    'brandName': 'N/A'
+}
+
+NEGOTIATION_USER_PROMPT_TEMPLATE = string.Template("""OUTREACH CONTEXT:
+- Creator: ${creatorName} (@${creatorPlatform})
+- Current Status: ${status}
+- Confidence Score: ${confidence}%
+- Brand: ${brandName}
+- Campaign: ${campaignContextSummary}...
+- Current Offer: ${currentOfferStr}
+
+${historySection}
+
+APPLICABLE STAGE: ${stageGuidance}
+CONVERSATION MODE: ${conversationMode}""")
+
+# History block variants keyed by (has_email_history, has_call_history)
+NEGOTIATION_HISTORY_TEMPLATES = {
+    (True, True): string.Template("""CONVERSATION HISTORY (Emails & Calls):
+Email Summary:
+${emailSummary}
+
+Recent Call Transcript Snippets:
+${callSummary}
+
+IMPORTANT: Based on ALL conversation history above..."""),
+    (True, False): string.Template("""EMAIL CONVERSATION HISTORY:
+${emailSummary}
+
+IMPORTANT: Based on the email conversation history above..."""),
+    (False, True): string.Template("""RECENT CALL TRANSCRIPT SNIPPETS:
+${callSummary}
+
+IMPORTANT: Based on the call transcript history above...""")
+}
+NEGOTIATION_NO_HISTORY_SECTION = "INITIAL OUTREACH CONTEXT: This is the beginning of the negotiation conversation." # Constant, nothing to substitute
+
+# Which of the stages described in the system prompt applies; anything else is the general stage
+NEGOTIATION_STAGE_LABELS = {
+    'interested': "INTERESTED STAGE",
+    'negotiating': "NEGOTIATING STAGE"
+}
+NEGOTIATION_DEFAULT_STAGE_LABEL = "GENERAL STAGE"
+
+NEGOTIATION_CONVERSATION_MODES = {
+    True: "Continue the conversation naturally based on previous exchanges",
+    False: "Provide a personalized response that starts the negotiation conversation"
+}
+
+NEGOTIATION_EMAIL_HISTORY_TOKEN_BUDGET = 5000
+NEGOTIATION_CALL_HISTORY_TOKEN_BUDGET = 1000
+NEGOTIATION_CAMPAIGN_CONTEXT_SUMMARY_CHARS = 150
+
+# --- Helper: Build Stage-Aware Negotiation Prompt (Python version) ---
+# Returns only the dynamic user message; the static instructions live in build_negotiation_system_prompt().
+def build_stage_aware_negotiation_prompt(outreach_data):
+    # Get email conversation history summary from the payload (as before)
+    email_conversation_summary = outreach_data.get('conversationHistorySummary', "No previous email conversation.")
+    
+    # Get recent call transcripts from our in-memory store
+    call_transcripts = get_recent_transcripts(outreach_data.get('id', 'unknown_outreach'))
+    call_transcript_summary = "\n".join(call_transcripts) if call_transcripts else "No recent call transcripts available."
+
+    has_email_history = bool(email_conversation_summary and email_conversation_summary != "No previous email conversation.")
+    has_call_history = bool(call_transcript_summary and call_transcript_summary != "No recent call transcripts available.")
+
+    if has_email_history or has_call_history:
+        # Long histories are cut from the front so the most recent exchanges survive and the prompt stays in budget
+        history_section = NEGOTIATION_HISTORY_TEMPLATES[(has_email_history, has_call_history)].substitute(
+            emailSummary=fit_to_token_budget(email_conversation_summary, NEGOTIATION_EMAIL_HISTORY_TOKEN_BUDGET) if has_email_history else "",
+            callSummary=fit_to_token_budget(call_transcript_summary, NEGOTIATION_CALL_HISTORY_TOKEN_BUDGET) if has_call_history else ""
+        )
+    else:
+        history_section = NEGOTIATION_NO_HISTORY_SECTION
+
+    current_offer_raw = outreach_data.get('currentOffer')
+    campaign_context = outreach_data.get('campaignContext') or 'N/A'
+    derived_fields = {
+        'campaignContextSummary': campaign_context if len(campaign_context) <= NEGOTIATION_CAMPAIGN_CONTEXT_SUMMARY_CHARS else campaign_context[:NEGOTIATION_CAMPAIGN_CONTEXT_SUMMARY_CHARS], # Summary
+        'currentOfferStr': f"₹{current_offer_raw}" if current_offer_raw else 'Not set',
+        'historySection': history_section,
+        'stageGuidance': NEGOTIATION_STAGE_LABELS.get(outreach_data.get('status', 'N/A'), NEGOTIATION_DEFAULT_STAGE_LABEL),
+        'conversationMode': NEGOTIATION_CONVERSATION_MODES[has_email_history or has_call_history]
+    }
+    # Derived values first, then the raw payload (keys match what frontend sends), then defaults
+    return NEGOTIATION_USER_PROMPT_TEMPLATE.substitute(ChainMap(derived_fields, outreach_data, NEGOTIATION_PROMPT_DEFAULTS))
+
+def build_negotiation_cache_key(outreach_data):
+    return build_llm_cache_key("negotiation", {
+        "outreachId": outreach_data.get('id'),
+        "creator": outreach_data.get('creatorName'),
+        "platform": outreach_data.get('creatorPlatform'),
+        "status": outreach_data.get('status'),
+        "confidence": outreach_data.get('confidence'),
+        "brand": outreach_data.get('brandName'),
+        "campaign": outreach_data.get('campaignContext'),
+        "offer": outreach_data.get('currentOffer'),
+        "history": outreach_data.get('conversationHistorySummary'),
+        "calls": get_recent_transcripts(outreach_data.get('id', 'unknown_outreach'))
+    })
 
 # --- Helper: Generate Fallback Strategy (Python version) ---
 def generate_advanced_fallback_strategy(outreach_data):
@@ -626,11 +1557,11 @@ def generate_advanced_fallback_strategy(outreach_data):
 # NEW FUNCTION START
 def build_live_voice_negotiation_prompt(call_session_data): # MODIFIED: Parameter changed from call_sid to call_session_data
     if not call_session_data:
-        print(f"❌ build_live_voice_negotiation_prompt: call_session_data is None or empty.")
+        LOGGER.error("❌ build_live_voice_negotiation_prompt: call_session_data is None or empty.")
         return None
 
     call_sid = call_session_data.get('call_sid', 'unknown_sid') # Get call_sid for logging if needed
-    print(f"🔨 Building prompt for SID {call_sid} using call_session_data: {call_session_data}")
+    LOGGER.info("🔨 Building prompt for SID %s using call_session_data: %s", call_sid, call_session_data)
 
     # Extract necessary details from call_session_data (the Supabase record)
     # These fields might be in the 'metadata' JSONB field or top-level, adjust as per your DB structure.
@@ -653,7 +1584,7 @@ def build_live_voice_negotiation_prompt(call_session_data): # MODIFIED: Paramete
 
     live_call_history_list = call_session_data.get('conversation_history', [])
     if not isinstance(live_call_history_list, list):
-        print(f"⚠️ Conversation history for SID {call_sid} is not a list in call_session_data. Resetting.")
+        LOGGER.warning("⚠️ Conversation history for SID %s is not a list in call_session_data. Resetting.", call_sid)
         live_call_history_list = []
 
     # Format live call conversation history
@@ -700,65 +1631,55 @@ Your response:'''
     return prompt
 # NEW FUNCTION END
 
+NEGOTIATION_GROQ_MAX_TOKENS = 500 # Schema needs ~300; decode time grows with this
+NEGOTIATION_GROQ_PAYLOAD_PREFIX = build_groq_payload_prefix(
+    model=GROQ_LARGE_MODEL, # Or your preferred Groq model
+    temperature=0.3,
+    max_tokens=NEGOTIATION_GROQ_MAX_TOKENS,
+    response_format={"type": "json_object"},
+    stop=["\n\n\n"] # Abort runaway generations after the object
+)
+NEGOTIATION_FAST_GROQ_PROFILE = GroqEndpointProfile(
+    build_groq_payload_prefix(
+        model=GROQ_FAST_MODEL,
+        temperature=0.3,
+        max_tokens=NEGOTIATION_GROQ_MAX_TOKENS,
+        response_format={"type": "json_object"},
+        stop=["\n\n\n"]
+    ),
+    NEGOTIATION_GROQ_MAX_TOKENS,
+    build_negotiation_system_prompt
+)
+NEGOTIATION_LARGE_MODEL_STATUSES = frozenset(('negotiating',)) # Live price haggling is where the 70B model earns its latency
+
+def negotiation_groq_profile(outreach_data):
+    """Early-stage outreach gets the fast model; the decorator's 70B defaults are kept for active negotiations."""
+    return None if outreach_data.get('status') in NEGOTIATION_LARGE_MODEL_STATUSES else NEGOTIATION_FAST_GROQ_PROFILE
+
+def validate_negotiation_insights(insights):
+    # Basic validation of the parsed insights
+    if not all(k in insights for k in ["currentPhase", "suggestedResponse", "recommendedOffer"]):
+        raise ValueError("AI response JSON missing required keys")
+    return insights
+
 @app.route('/api/negotiation/generate-strategy', methods=['POST'])
 @token_required # Apply the JWT authentication decorator
-def handle_generate_negotiation_strategy():
+@groq_call("Negotiation Agent (Backend)", NEGOTIATION_GROQ_PAYLOAD_PREFIX, NEGOTIATION_GROQ_MAX_TOKENS, build_negotiation_system_prompt)
+def handle_generate_negotiation_strategy(outreach_data):
     if not groq_api_key:
-        return jsonify({"success": False, "error": "Groq API key not configured on backend.", "method": "algorithmic_fallback", "insight": generate_advanced_fallback_strategy(request.json)}), 500
+        return jsonify({"success": False, "error": "Groq API key not configured on backend.", "method": "algorithmic_fallback", "insight": generate_advanced_fallback_strategy(outreach_data)}), 500
 
-    outreach_data = request.json
     if not outreach_data:
         return jsonify({"success": False, "error": "Missing outreach data in request body."}), 400
 
-    prompt = build_stage_aware_negotiation_prompt(outreach_data)
-    
-    try:
-        headers = {
-            "Authorization": f"Bearer {groq_api_key}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "model": "llama3-70b-8192", # Or your preferred Groq model
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.3,
-            "max_tokens": 1500
-        }
-        
-        response = requests.post("https://api.groq.com/openai/v1/chat/completions", headers=headers, json=payload)
-        response.raise_for_status() # Raise an exception for HTTP errors
-        
-        ai_response_data = response.json()
-        ai_message_content = ai_response_data['choices'][0]['message']['content']
-        
-        # Attempt to parse the AI's JSON response string
-        try:
-            # Try to find the JSON block within the AI's response
-            # This looks for the first '{' and the last '}'
-            json_start_index = ai_message_content.find('{')
-            json_end_index = ai_message_content.rfind('}')
-
-            if json_start_index != -1 and json_end_index != -1 and json_start_index < json_end_index:
-                json_str = ai_message_content[json_start_index : json_end_index + 1]
-                insights = json.loads(json_str)
-                # Basic validation of the parsed insights
-                if not all(k in insights for k in ["currentPhase", "suggestedResponse", "recommendedOffer"]):
-                    raise ValueError("AI response JSON missing required keys")
-                return jsonify({"success": True, "insight": insights, "method": "ai_generated"})
-            else:
-                raise ValueError("Could not find valid JSON block in AI response.")
-                
-        except (json.JSONDecodeError, ValueError) as e:
-            print(f"Error parsing or validating AI JSON response: {e}")
-            print(f"Raw AI response content that caused parsing/validation error: {ai_message_content}")
-            # Fallback if AI response is not valid JSON or misses keys
-            return jsonify({"success": True, "insight": generate_advanced_fallback_strategy(outreach_data), "method": "algorithmic_fallback", "error": "AI response parsing/validation failed, using fallback."})
-
-    except requests.exceptions.RequestException as e:
-        print(f"Groq API request failed: {e}")
-        return jsonify({"success": True, "insight": generate_advanced_fallback_strategy(outreach_data), "method": "algorithmic_fallback", "error": str(e)})
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        return jsonify({"success": True, "insight": generate_advanced_fallback_strategy(outreach_data), "method": "algorithmic_fallback", "error": "An unexpected error occurred on the backend."})
+    return GroqEndpointPlan(
+        prompt=partial(build_stage_aware_negotiation_prompt, outreach_data),
+        cache_key=build_negotiation_cache_key(outreach_data),
+        validate=validate_negotiation_insights,
+        success_body=lambda insights: {"success": True, "insight": insights, "method": "ai_generated"},
+        fallback_body=lambda error_message: {"success": True, "insight": generate_advanced_fallback_strategy(outreach_data), "method": "algorithmic_fallback", "error": error_message},
+        profile=negotiation_groq_profile(outreach_data)
+    )
 
 @app.route('/api/hello', methods=['GET'])
 def hello_world():
@@ -948,38 +1869,11 @@ def set_simple_cookie():
 # --- Google OAuth Helper Functions --- START ---
 # ... (rest of your file) ...
 
-# --- Helper: Build Personalized Outreach Prompt (Python version) ---
-def build_personalized_outreach_prompt(campaign_data, creator_match_data, requirements_data):
-    campaign_title = campaign_data.get('title', '[Campaign Title]')
-    campaign_brand = campaign_data.get('brand', '[Brand Name]')
-    product_service = requirements_data.get('productService', '[Product/Service]')
-    campaign_objective = requirements_data.get('campaignObjective', '[Campaign Objective]')
-    budget_min = campaign_data.get('budgetMin', 0)
-    budget_max = campaign_data.get('budgetMax', 0)
-    key_message = requirements_data.get('keyMessage', '[Key Message]')
-
-    creator_name = creator_match_data.get('creator', {}).get('name', '[Creator Name]')
-    creator_platform = creator_match_data.get('creator', {}).get('platform', '[Platform]')
-    creator_followers = creator_match_data.get('creator', {}).get('metrics', {}).get('followers', 0)
-    creator_niches = ", ".join(creator_match_data.get('creator', {}).get('niche', []))
-    creator_reasoning = creator_match_data.get('reasoning', '[Reasoning for fit]')
-
-    prompt = f"""Generate a personalized, professional outreach email for an influencer collaboration.
-
-CAMPAIGN DETAILS:
-Company: {campaign_brand}
-Product/Service: {product_service}
-Campaign: {campaign_title}
-Objective: {campaign_objective}
-Budget Range: ₹{budget_min}-₹{budget_max}
-Key Message: {key_message}
-
-CREATOR DETAILS:
-Name: {creator_name}
-Platform: {creator_platform}
-Followers: {creator_followers:,}
-Niches: {creator_niches}
-Why they're a good fit: {creator_reasoning}
+# --- Helper: Build Outreach System Prompt (static, prefix-cacheable) ---
+@lru_cache(maxsize=1)
+def build_outreach_system_prompt():
+    # Static instructions shared by every outreach request; the campaign/creator details go in the user message.
+    return """Generate a personalized, professional outreach email for an influencer collaboration, using the campaign and creator details provided in the user message.
 
 EMAIL REQUIREMENTS:
 - Professional but friendly and engaging tone.
@@ -990,32 +1884,35 @@ EMAIL REQUIREMENTS:
 - Include a strong, clear call-to-action.
 
 Response format (JSON only):
-{{
-  "subject": "Partnership Opportunity: [Craft a compelling, personalized subject line, e.g., {campaign_brand} x {creator_name} for {campaign_title}]",
+{
+  "subject": "Partnership Opportunity: [Craft a compelling, personalized subject line, e.g., <Company> x <Creator Name> for <Campaign>]",
   "message": "[Your professionally crafted, personalized email content here. Use placeholders like [Creator Name] if needed, which will be replaced.]"
-}}
+}
 
 Make it authentic and avoid overly generic or spammy language. The goal is to genuinely connect and start a positive conversation."""
-    return prompt
 
-# --- Helper: Generate Template Outreach (Python version) ---
-def generate_template_outreach_py(campaign_data, creator_match_data, requirements_data):
-    campaign_brand = campaign_data.get('brand', '[Brand Name]')
-    creator_name = creator_match_data.get('creator', {}).get('name', '[Creator Name]')
-    creator_platform = creator_match_data.get('creator', {}).get('platform', '[Platform]')
-    creator_niches_list = creator_match_data.get('creator', {}).get('niche', [])
-    creator_niches = " and ".join(creator_niches_list) if creator_niches_list else "[Their Niche]"
-    campaign_title = campaign_data.get('title', '[Campaign Title]')
-    creator_followers = creator_match_data.get('creator', {}).get('metrics', {}).get('followers', 0)
-    product_service = requirements_data.get('productService', '[Product/Service]')
-    creator_reasoning = creator_match_data.get('reasoning', 'your unique content and audience fit our campaign goals.')
+# --- Outreach templates (parsed once at import) ---
+OUTREACH_USER_PROMPT_TEMPLATE = string.Template("""CAMPAIGN DETAILS:
+Company: ${campaignBrand}
+Product/Service: ${productService}
+Campaign: ${campaignTitle}
+Objective: ${campaignObjective}
+Budget Range: ₹${budgetMin}-₹${budgetMax}
+Key Message: ${keyMessage}
 
-    subject = f"Partnership Opportunity: {campaign_brand} x {creator_name}"
-    message = f"""Hi {creator_name},
+CREATOR DETAILS:
+Name: ${creatorName}
+Platform: ${creatorPlatform}
+Followers: ${creatorFollowers}
+Niches: ${creatorNiches}
+Why they're a good fit: ${creatorReasoning}""")
 
-I hope this message finds you well! I'm reaching out from {campaign_brand} because we've been following your {creator_platform} content in the {creator_niches} space, and we're genuinely impressed by your engagement and authentic voice.
+OUTREACH_TEMPLATE_SUBJECT = string.Template("Partnership Opportunity: ${campaignBrand} x ${creatorName}")
+OUTREACH_TEMPLATE_MESSAGE = string.Template("""Hi ${creatorName},
 
-We're launching our "{campaign_title}" campaign and believe your audience of {creator_followers:,}+ followers would be a perfect fit for our {product_service}. Your content style and focus align perfectly with our campaign objectives.
+I hope this message finds you well! I'm reaching out from ${campaignBrand} because we've been following your ${creatorPlatform} content in the ${creatorNiches} space, and we're genuinely impressed by your engagement and authentic voice.
+
+We're launching our "${campaignTitle}" campaign and believe your audience of ${creatorFollowers}+ followers would be a perfect fit for our ${productService}. Your content style and focus align perfectly with our campaign objectives.
 
 We'd love to discuss a collaboration that would be mutually beneficial. Our campaign budget allows for competitive compensation, and we're flexible on content format and timing to match your style.
 
@@ -1024,15 +1921,94 @@ Would you be interested in learning more about this partnership opportunity? I'd
 Looking forward to hearing from you!
 
 Best regards,
-{campaign_brand} Partnership Team
+${campaignBrand} Partnership Team
+
+P.S. We chose you specifically because ${creatorReasoning}""")
+
+# --- Helper: Build Personalized Outreach Prompt (Python version) ---
+# Returns only the dynamic user message; the static instructions live in build_outreach_system_prompt().
+def build_personalized_outreach_prompt(campaign_data, creator_match_data, requirements_data):
+    creator = creator_match_data.get('creator', {})
+    return OUTREACH_USER_PROMPT_TEMPLATE.substitute(
+        campaignBrand=campaign_data.get('brand', '[Brand Name]'),
+        productService=requirements_data.get('productService', '[Product/Service]'),
+        campaignTitle=campaign_data.get('title', '[Campaign Title]'),
+        campaignObjective=requirements_data.get('campaignObjective', '[Campaign Objective]'),
+        budgetMin=campaign_data.get('budgetMin', 0),
+        budgetMax=campaign_data.get('budgetMax', 0),
+        keyMessage=requirements_data.get('keyMessage', '[Key Message]'),
+        creatorName=creator.get('name', '[Creator Name]'),
+        creatorPlatform=creator.get('platform', '[Platform]'),
+        creatorFollowers=f"{creator.get('metrics', {}).get('followers', 0):,}",
+        creatorNiches=", ".join(creator.get('niche', [])),
+        creatorReasoning=creator_match_data.get('reasoning', '[Reasoning for fit]')
+    )
 
-P.S. We chose you specifically because {creator_reasoning}"""
+def build_outreach_cache_key(campaign_data, creator_match_data, requirements_data):
+    # Every field OUTREACH_USER_PROMPT_TEMPLATE renders must be here, or a cached email can quote another creator's details
+    creator = creator_match_data.get('creator', {})
+    return build_llm_cache_key("outreach", {
+        "campaign": campaign_data.get('title'),
+        "brand": campaign_data.get('brand'),
+        "budget": [campaign_data.get('budgetMin'), campaign_data.get('budgetMax')],
+        "product": requirements_data.get('productService'),
+        "objective": requirements_data.get('campaignObjective'),
+        "keyMessage": requirements_data.get('keyMessage'),
+        "creator": creator.get('name'),
+        "platform": creator.get('platform'),
+        "followers": creator.get('metrics', {}).get('followers'),
+        "niches": creator.get('niche', []),
+        "reasoning": creator_match_data.get('reasoning')
+    })
+
+# --- Helper: Generate Template Outreach (Python version) ---
+def generate_template_outreach_py(campaign_data, creator_match_data, requirements_data):
+    creator = creator_match_data.get('creator', {})
+    creator_niches_list = creator.get('niche', [])
+    template_fields = {
+        'campaignBrand': campaign_data.get('brand', '[Brand Name]'),
+        'creatorName': creator.get('name', '[Creator Name]'),
+        'creatorPlatform': creator.get('platform', '[Platform]'),
+        'creatorNiches': " and ".join(creator_niches_list) if creator_niches_list else "[Their Niche]",
+        'campaignTitle': campaign_data.get('title', '[Campaign Title]'),
+        'creatorFollowers': f"{creator.get('metrics', {}).get('followers', 0):,}",
+        'productService': requirements_data.get('productService', '[Product/Service]'),
+        'creatorReasoning': creator_match_data.get('reasoning', 'your unique content and audience fit our campaign goals.')
+    }
+    subject = OUTREACH_TEMPLATE_SUBJECT.substitute(template_fields)
+    message = OUTREACH_TEMPLATE_MESSAGE.substitute(template_fields)
     return {"subject": subject, "message": message}
 
+OUTREACH_MESSAGE_REQUIRED_KEYS = frozenset(("subject", "message")) # Shared by the outreach, initial-outreach and follow-up validators
+
+def normalize_outreach_ai_content(content):
+    """Adapts an AI outreach JSON object to the {subject, message} response shape; raises ValueError if it can't."""
+    # Adapt the 'body' field from AI to 'message' for consistent response structure with other endpoints
+    if "body" in content and "message" not in content:
+        content["message"] = content.pop("body")
+    # Basic validation for expected keys after adaptation
+    if not OUTREACH_MESSAGE_REQUIRED_KEYS.issubset(content):
+        raise ValueError("AI outreach response JSON missing required keys (subject, message) after adaptation")
+    return content
+
+OUTREACH_BATCH_MAX_CONCURRENCY = 16 # Concurrent Groq calls per batch request
+OUTREACH_BATCH_MAX_ITEMS = 100 # Bounds the work per request (GROQ_BATCH_MAX_WAIT_SECONDS bounds the wait); split larger batches across requests
+OUTREACH_BATCH_INVALID_ITEM_ERROR = "Each creator match must be an object with a creator object."
+
+OUTREACH_GROQ_MAX_TOKENS = 450 # Schema needs ~400
+OUTREACH_GROQ_PAYLOAD_PREFIX = build_groq_payload_prefix(
+    model=GROQ_FAST_MODEL, # A short personalized email doesn't need the 70B model
+    temperature=0.4, # Slightly more creative for outreach
+    max_tokens=OUTREACH_GROQ_MAX_TOKENS,
+    response_format={"type": "json_object"},
+    stop=["\n\n\n"] # Abort runaway generations after the object
+)
+OUTREACH_GROQ_PROFILE = GroqEndpointProfile(OUTREACH_GROQ_PAYLOAD_PREFIX, OUTREACH_GROQ_MAX_TOKENS, build_outreach_system_prompt)
+
 @app.route('/api/outreach/generate-message', methods=['POST'])
 @token_required # Secure this endpoint
-def handle_generate_outreach_message():
-    data = request.json
+@groq_call("Outreach Agent (Backend)", OUTREACH_GROQ_PAYLOAD_PREFIX, OUTREACH_GROQ_MAX_TOKENS, build_outreach_system_prompt)
+def handle_generate_outreach_message(data):
     if not data or not all(k in data for k in ['campaign', 'creatorMatch', 'requirements']):
         return jsonify({"success": False, "error": "Missing required data: campaign, creatorMatch, or requirements."}), 400
 
@@ -1042,156 +2018,81 @@ def handle_generate_outreach_message():
     prefer_ai_generation = requirements_data.get('personalizedOutreach', False)
 
     if not groq_api_key:
-        print("🤖 Outreach Agent (Backend): Groq API key not configured. Using template.")
+        LOGGER.info("🤖 Outreach Agent (Backend): Groq API key not configured. Using template.")
         template_content = generate_template_outreach_py(campaign_data, creator_match_data, requirements_data)
         return jsonify({"success": True, **template_content, "method": "template_based"})
 
-    # Decide whether to use AI based on preference and API key availability
-    use_ai = prefer_ai_generation # We already checked for groq_api_key
+    if not prefer_ai_generation:
+        LOGGER.info("📝 Outreach Agent (Backend): Using template for %s", creator_match_data.get('creator', {}).get('name', 'N/A'))
+        template_content = generate_template_outreach_py(campaign_data, creator_match_data, requirements_data)
+        return jsonify({"success": True, **template_content, "method": "template_based"})
 
-    if use_ai:
-        prompt = build_personalized_outreach_prompt(campaign_data, creator_match_data, requirements_data)
-        try:
-            print(f"🤖 Outreach Agent (Backend): Making AI API call for {creator_match_data.get('creator', {}).get('name', 'N/A')}...")
-            headers = {
-                "Authorization": f"Bearer {groq_api_key}",
-                "Content-Type": "application/json"
-            }
-            payload = {
-                "model": "llama3-70b-8192",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.4, # Slightly more creative for outreach
-                "max_tokens": 800
-            }
-            
-            response = requests.post("https://api.groq.com/openai/v1/chat/completions", headers=headers, json=payload)
-            response.raise_for_status()
-            
-            ai_response_data = response.json()
-            ai_message_content = ai_response_data['choices'][0]['message']['content']
-            
-            try:
-                json_str = ai_message_content # Default to the full content
-                # Attempt to strip markdown fences if present
-                if ai_message_content.strip().startswith("```json"):
-                    # Find the start of the actual JSON after the ```json
-                    json_block_start = ai_message_content.find('{')
-                    # Find the end of the JSON before the closing ```
-                    json_block_end = ai_message_content.rfind('}')
-                    if json_block_start != -1 and json_block_end != -1 and json_block_start < json_block_end:
-                        json_str = ai_message_content[json_block_start : json_block_end + 1]
-                elif ai_message_content.strip().startswith("{") and ai_message_content.strip().endswith("}"):
-                    json_str = ai_message_content.strip() # It's already a JSON string (hopefully)
-                else: # If no clear JSON structure, try finding the first { and last }
-                    json_start_index = ai_message_content.find('{')
-                    json_end_index = ai_message_content.rfind('}')
-                    if json_start_index != -1 and json_end_index != -1 and json_start_index < json_end_index:
-                        json_str = ai_message_content[json_start_index : json_end_index + 1]
-                    else:
-                        raise ValueError("Could not find any JSON-like block in AI response.")
+    def template_fallback_body(error_message):
+        template_content = generate_template_outreach_py(campaign_data, creator_match_data, requirements_data)
+        return {"success": True, **template_content, "method": "template_based", "error": error_message}
+
+    return GroqEndpointPlan(
+        prompt=partial(build_personalized_outreach_prompt, campaign_data, creator_match_data, requirements_data),
+        cache_key=build_outreach_cache_key(campaign_data, creator_match_data, requirements_data),
+        validate=normalize_outreach_ai_content,
+        success_body=lambda content: {"success": True, **content, "method": "ai_generated"},
+        fallback_body=template_fallback_body
+    )
 
-                content = json.loads(json_str) 
-                
-                # Adapt the 'body' field from AI to 'message' for consistent response structure with other endpoints
-                if "body" in content and "message" not in content:
-                    content["message"] = content.pop("body")
+@app.route('/api/outreach/generate-batch', methods=['POST'])
+@token_required # Secure this endpoint
+def handle_generate_outreach_batch():
+    """
+    Generates outreach for many creators of one campaign in a single request.
+    Body: {"campaign": {...}, "requirements": {...}, "creatorMatches": [...]}.
+    Groq calls are fanned out concurrently; each creator falls back to the template independently.
+    """
+    data = request.json
+    if not data or not all(k in data for k in ['campaign', 'creatorMatches', 'requirements']):
+        return jsonify({"success": False, "error": "Missing required data: campaign, creatorMatches, or requirements."}), 400
+    if not isinstance(data['creatorMatches'], list):
+        return jsonify({"success": False, "error": "creatorMatches must be a list."}), 400
+    if len(data['creatorMatches']) > OUTREACH_BATCH_MAX_ITEMS:
+        return jsonify({"success": False, "error": f"Too many creatorMatches ({len(data['creatorMatches'])}); at most {OUTREACH_BATCH_MAX_ITEMS} per request."}), 400
 
-                # Basic validation for expected keys after adaptation
-                if not all(k in content for k in ["subject", "message"]):
-                    raise ValueError("AI outreach response JSON missing required keys (subject, message) after adaptation")
-                
-                print(f"✨ Outreach Agent (Backend): AI outreach generated for {creator_match_data.get('creator', {}).get('name', 'N/A')}")
-                return jsonify({"success": True, **content, "method": "ai_generated"})
-            except (json.JSONDecodeError, ValueError) as e:
-                print(f"Error parsing AI outreach JSON response: {e}. Raw: {ai_message_content}")
-                # Fallback to template if AI JSON parsing fails
-                template_content = generate_template_outreach_py(campaign_data, creator_match_data, requirements_data)
-                return jsonify({"success": True, **template_content, "method": "template_based", "error": "AI response parsing failed, using template."})
-
-        except requests.exceptions.RequestException as e:
-            print(f"Groq API request failed for outreach: {e}")
-            template_content = generate_template_outreach_py(campaign_data, creator_match_data, requirements_data)
-            return jsonify({"success": True, **template_content, "method": "template_based", "error": str(e)})
-        except Exception as e:
-            print(f"An unexpected error occurred during AI outreach generation: {e}")
-            template_content = generate_template_outreach_py(campaign_data, creator_match_data, requirements_data)
-            return jsonify({"success": True, **template_content, "method": "template_based", "error": "Unexpected backend error during AI outreach."})
-    else:
-        print(f"📝 Outreach Agent (Backend): Using template for {creator_match_data.get('creator', {}).get('name', 'N/A')}")
-        template_content = generate_template_outreach_py(campaign_data, creator_match_data, requirements_data)
-        return jsonify({"success": True, **template_content, "method": "template_based"})
+    campaign_data = data['campaign']
+    creator_matches = data['creatorMatches']
+    requirements_data = data['requirements']
+    use_ai = bool(groq_api_key) and requirements_data.get('personalizedOutreach', False)
+
+    def creator_match_plan(creator_match_data):
+        if not isinstance(creator_match_data, dict) or not isinstance(creator_match_data.get('creator'), dict):
+            return {"success": False, "error": OUTREACH_BATCH_INVALID_ITEM_ERROR}
+        creator_id = creator_match_data['creator'].get('id')
+        def template_result(error_message=None):
+            result = {**generate_template_outreach_py(campaign_data, creator_match_data, requirements_data), "method": "template_based", "creatorId": creator_id}
+            if error_message:
+                result["error"] = error_message
+            return result
+        if not use_ai:
+            return template_result()
+        return GroqEndpointPlan(
+            prompt=partial(build_personalized_outreach_prompt, campaign_data, creator_match_data, requirements_data),
+            cache_key=build_outreach_cache_key(campaign_data, creator_match_data, requirements_data),
+            validate=normalize_outreach_ai_content,
+            success_body=lambda content: {**content, "method": "ai_generated", "creatorId": creator_id},
+            fallback_body=template_result
+        )
 
-# --- Helper: Build Campaign Generation Prompt (Python version) ---
-def build_campaign_generation_prompt(requirements_data):
-    # Extracting data with defaults to prevent KeyErrors
-    company_name = requirements_data.get('companyName', 'the client')
-    industry_list = requirements_data.get('industry', [])
-    # For the prompt context, using the first industry from the list if available.
-    # The LLM will be asked to determine the primary campaign industry for the JSON output.
-    primary_industry_for_context = industry_list[0] if industry_list else '[General Industry]'
-    product_service = requirements_data.get('productService', '[Product/Service]')
-    business_goals_list = requirements_data.get('businessGoals', [])
-    business_goals_str = ", ".join(business_goals_list) if business_goals_list else '[Business Goals]'
-    
-    # Updated to use campaignAudienceDescription for the viewers
-    campaign_audience_desc = requirements_data.get('campaignAudienceDescription', '[Campaign Target Audience - Viewers]')
-    
-    # Added to get targetInfluencerDescription for the creators
-    target_influencer_desc = requirements_data.get('targetInfluencerDescription', '[Target Influencer Profile - Creators]')
-    
-    demographics = requirements_data.get('demographics', '[Demographics]') # Assuming this key might exist
-    
-    # Handle campaignObjective, ensuring it's a string for the prompt
-    campaign_objectives_input = requirements_data.get('campaignObjective', ['Not specified']) # Default to list with 'Not specified'
-    if isinstance(campaign_objectives_input, list):
-        campaign_objective_str_for_prompt = ", ".join(campaign_objectives_input) if campaign_objectives_input else 'Not specified'
-    elif isinstance(campaign_objectives_input, str):
-        campaign_objective_str_for_prompt = campaign_objectives_input if campaign_objectives_input else 'Not specified'
-    else:
-        campaign_objective_str_for_prompt = 'Not specified' # Fallback for unexpected types
+    results = run_groq_batch("Outreach Agent (Backend)", [creator_match_plan(creator_match_data) for creator_match_data in creator_matches],
+                             OUTREACH_GROQ_PROFILE, OUTREACH_BATCH_MAX_CONCURRENCY)
+    return jsonify({"success": True, "results": results})
 
-    key_message = requirements_data.get('keyMessage', '[Key Message]') # Assuming this key might exist
-    budget_min_req = requirements_data.get('budgetRange', {}).get('min', 0)
-    budget_max_req = requirements_data.get('budgetRange', {}).get('max', 10000)
-    timeline = requirements_data.get('timeline', '[Timeline]')
-    preferred_platforms_list = requirements_data.get('preferredPlatforms', [])
-    preferred_platforms = ", ".join(preferred_platforms_list) if preferred_platforms_list else 'No preference'
-    content_types_list = requirements_data.get('contentTypes', []) # Assuming this key might exist
-    content_types = ", ".join(content_types_list) if content_types_list else 'Open to suggestions'
-    special_requirements = requirements_data.get('specialRequirements', 'None') # Assuming this key might exist
-
-    # AI-Optimized Budget (example, can be refined)
-    budget_min_ai = int(budget_min_req * 0.8)
-    budget_max_ai = int(budget_max_req * 0.9)
-
-    # Original prompt structure with modifications for new audience fields:
-    prompt = f"""You are an expert campaign strategist. Based on the following business requirements, generate a comprehensive and creative influencer marketing campaign plan.
-
-Business Requirements:
-Company Name: {company_name}
-Primary Industry Context: {primary_industry_for_context} # This is context from requirements
-Product/Service: {product_service}
-Campaign Objective: {campaign_objective_str_for_prompt}
-Campaign's Target Audience (Viewers): {campaign_audience_desc} # MODIFIED: New field and label
-Target Influencer Profile (Creators): {target_influencer_desc} # MODIFIED: New field and label
-Key Message: {key_message}
-Budget Range: {budget_min_req} - {budget_max_req} # MODIFIED: Use budget_min_req, budget_max_req
-Timeline: {timeline}
-Content Requirements/Deliverables: {content_types} # MODIFIED: Use content_types
-Preferred Platforms: {preferred_platforms} # MODIFIED: Use preferred_platforms
-Geographic Focus: {requirements_data.get('locations', ['Not specified'])}
-Tone/Voice: {requirements_data.get('toneOfVoice', 'Professional and engaging')}
-Existing Brand Guidelines: {requirements_data.get('brandGuidelines', 'None specified')}
-KPIs for Success: {requirements_data.get('kpis', ['Not specified'])}
+# --- Helper: Build Campaign System Prompt (static, prefix-cacheable) ---
+@lru_cache(maxsize=1)
+def build_campaign_system_prompt():
+    # Kept byte-identical across requests (no company name interpolated) so Groq can reuse the cached prefix.
+    return """You are an expert campaign strategist. Based on the business requirements provided in the user message, generate a comprehensive and creative influencer marketing campaign plan.
 
 CAMPAIGN GENERATION REQUIREMENTS:
-Your response MUST be a single, valid JSON object and NOTHING ELSE.
-NO INTRODUCTORY TEXT. NO EXPLANATIONS. NO MARKDOWN CODE FENCES (```json or ```).
-ADHERE STRICTLY TO THE JSON FORMAT AND ALL SYNTAX RULES.
-
 JSON Structure and Rules:
 1.  **`title` (String)**: Catchy and descriptive. Must be a single string in double quotes (e.g., "My Awesome Campaign").
-2.  **`brand` (String)**: Brand name for the campaign (use "{company_name}"). Must be a single string in double quotes.
+2.  **`brand` (String)**: Brand name for the campaign (use the Company Name from the Business Requirements). Must be a single string in double quotes.
 3.  **`industry` (String or Null)**: The primary industry for THIS SPECIFIC CAMPAIGN (e.g., "Technology", "Fashion", "Gaming"). This might be derived from the business requirements but should be a single descriptor for the campaign. If not clearly identifiable or applicable, use null.
 4.  **`description` (String)**: Short, compelling overview (2-3 sentences). Must be a single string in double quotes.
 5.  **`brief` (String)**: Detailed brief (3-5 sentences) expanding on the objective and target audience. Must be a single string in double quotes. Do NOT use arrays or lists for this field.
@@ -1213,19 +2114,10 @@ JSON Structure and Rules:
     *   `optimizationSuggestions` (Array of Strings): Tips for improvement. Must be a JSON array of strings.
 17. **`confidence` (Float)**: Your confidence in this campaign plan (0.0 to 1.0, e.g., 0.9).
 
-CRITICAL JSON SYNTAX REMINDERS:
-- Every key MUST be in double quotes (e.g., "title").
-- Every string value MUST be in double quotes (e.g., "My Campaign"). This includes all items within arrays of strings.
-- Key-value pairs are separated by a colon (`:`). (e.g., "title": "My Campaign").
-- Pairs are separated by commas (`,`). THE LAST PAIR IN AN OBJECT OR THE LAST ITEM IN AN ARRAY SHOULD NOT HAVE A TRAILING COMMA.
-- JSON objects are enclosed in curly braces (`{{` and `}}`).
-- JSON arrays are enclosed in square brackets (`[` and `]`).
-
 Example of the REQUIRED JSON output format:
-```json
-{{
+{
   "title": "Example Campaign: AI for Small Business Growth",
-  "brand": "{company_name}",
+  "brand": "Company Name from the Business Requirements",
   "description": "A dynamic campaign to promote AI solutions for SMBs, driving adoption and engagement.",
   "brief": "This campaign targets small to medium-sized business owners and decision-makers, educating them on the benefits of AI tools for marketing, operations, and customer service. The goal is to generate leads and establish the brand as a leader in AI for SMBs.",
   "platforms": ["LinkedIn", "YouTube"],
@@ -1238,24 +2130,95 @@ Example of the REQUIRED JSON output format:
   "startDate": "2024-08-01",
   "endDate": "2024-09-30",
   "applicationDeadline": "2024-07-15",
-  "aiInsights": {{
+  "aiInsights": {
     "strategy": "Focus on educational content showcasing real-world AI applications for SMBs. Partner with influencers who are trusted voices in the small business community.",
     "reasoning": "SMB owners respond well to practical advice and case studies. LinkedIn is key for B2B, YouTube for deeper explanations.",
     "successFactors": ["High-quality educational content", "Credible influencers with engaged SMB audiences", "Clear call-to-action for lead generation"],
     "potentialChallenges": ["Cutting through the noise in the AI space", "Ensuring content is accessible and not overly technical"],
     "optimizationSuggestions": ["Run A/B tests on LinkedIn ad copy", "Host a Q&A webinar with an influencer", "Repurpose video content into short clips for social media"]
-  }},
+  },
   "confidence": 0.9
-}}
-```
+}
 
-Now, generate the campaign plan. Remember, ONLY the JSON object.
+When given the business requirements, generate the campaign plan.
 """
-    return prompt
+
+# --- Campaign user-prompt template (parsed once at import) ---
+CAMPAIGN_PROMPT_DEFAULTS = {
+    'companyName': 'the client',
+    'productService': '[Product/Service]',
+    'campaignAudienceDescription': '[Campaign Target Audience - Viewers]',
+    'targetInfluencerDescription': '[Target Influencer Profile - Creators]',
+    'keyMessage': '[Key Message]',
+    'timeline': '[Timeline]',
+    'locations': ['Not specified'],
+    'toneOfVoice': 'Professional and engaging',
+    'brandGuidelines': 'None specified',
+    'kpis': ['Not specified']
+}
+
+CAMPAIGN_USER_PROMPT_TEMPLATE = string.Template("""Business Requirements:
+Company Name: ${companyName}
+Primary Industry Context: ${primaryIndustryContext} # This is context from requirements
+Product/Service: ${productService}
+Campaign Objective: ${campaignObjectiveText}
+Campaign's Target Audience (Viewers): ${campaignAudienceDescription} # MODIFIED: New field and label
+Target Influencer Profile (Creators): ${targetInfluencerDescription} # MODIFIED: New field and label
+Key Message: ${keyMessage}
+Budget Range: ${budgetMinReq} - ${budgetMaxReq} # MODIFIED: Use budget_min_req, budget_max_req
+Timeline: ${timeline}
+Content Requirements/Deliverables: ${contentTypesText} # MODIFIED: Use content_types
+Preferred Platforms: ${preferredPlatformsText} # MODIFIED: Use preferred_platforms
+Geographic Focus: ${locations}
+Tone/Voice: ${toneOfVoice}
+Existing Brand Guidelines: ${brandGuidelines}
+KPIs for Success: ${kpis}
+
+Now, generate the campaign plan.
+""")
+
+# --- Helper: Build Campaign Generation Prompt (Python version) ---
+# Returns only the dynamic user message; the static rules and example live in build_campaign_system_prompt().
+def build_campaign_generation_prompt(requirements_data):
+    industry_list = requirements_data.get('industry', [])
+    
+    # Handle campaignObjective, ensuring it's a string for the prompt
+    campaign_objectives_input = requirements_data.get('campaignObjective', ['Not specified']) # Default to list with 'Not specified'
+    if isinstance(campaign_objectives_input, list):
+        campaign_objective_str_for_prompt = ", ".join(campaign_objectives_input) if campaign_objectives_input else 'Not specified'
+    elif isinstance(campaign_objectives_input, str):
+        campaign_objective_str_for_prompt = campaign_objectives_input if campaign_objectives_input else 'Not specified'
+    else:
+        campaign_objective_str_for_prompt = 'Not specified' # Fallback for unexpected types
+
+    budget_range = requirements_data.get('budgetRange', {})
+    preferred_platforms_list = requirements_data.get('preferredPlatforms', [])
+    content_types_list = requirements_data.get('contentTypes', []) # Assuming this key might exist
+
+    derived_fields = {
+        # For the prompt context, using the first industry from the list if available.
+        # The LLM will be asked to determine the primary campaign industry for the JSON output.
+        'primaryIndustryContext': industry_list[0] if industry_list else '[General Industry]',
+        'campaignObjectiveText': campaign_objective_str_for_prompt,
+        'budgetMinReq': budget_range.get('min', 0),
+        'budgetMaxReq': budget_range.get('max', 10000),
+        'preferredPlatformsText': ", ".join(preferred_platforms_list) if preferred_platforms_list else 'No preference',
+        'contentTypesText': ", ".join(content_types_list) if content_types_list else 'Open to suggestions'
+    }
+    # Dynamic business requirements only; rules and example are in the cached system prompt.
+    return CAMPAIGN_USER_PROMPT_TEMPLATE.substitute(ChainMap(derived_fields, requirements_data, CAMPAIGN_PROMPT_DEFAULTS))
+
+@lru_cache(maxsize=1)
+def fallback_campaign_dates(today):
+    """(startDate, endDate, applicationDeadline) strings for a fallback campaign created on `today`; formatted once per day."""
+    start_date = today + timedelta(days=7)
+    end_date = start_date + timedelta(days=30)
+    app_deadline = start_date - timedelta(days=3)
+    return start_date.isoformat(), end_date.isoformat(), app_deadline.isoformat()
 
 # --- Helper: Generate Fallback Campaign (Python version) ---
 def generate_fallback_campaign_py(requirements_data):
-    print("🤖 Campaign Agent (Backend): Generating campaign using OFFLINE algorithmic strategy...")
+    LOGGER.info("🤖 Campaign Agent (Backend): Generating campaign using OFFLINE algorithmic strategy...")
     company_name = requirements_data.get('companyName', '[Company]')
     
     # Determine campaign industry from requirements_data.industry
@@ -1281,10 +2244,7 @@ def generate_fallback_campaign_py(requirements_data):
     target_influencer_desc = requirements_data.get('targetInfluencerDescription', '[Target Influencer Profile - Creators]')
     budget_min = int(requirements_data.get('budgetRange', {}).get('min', 10000) * 0.8)
     budget_max = int(requirements_data.get('budgetRange', {}).get('max', 50000) * 0.9)
-    from datetime import datetime, timedelta
-    start_date_obj = datetime.now() + timedelta(days=7)
-    end_date_obj = start_date_obj + timedelta(days=30)
-    app_deadline_obj = start_date_obj - timedelta(days=3)
+    start_date_str, end_date_str, app_deadline_str = fallback_campaign_dates(request_now().date())
     platforms = requirements_data.get('preferredPlatforms', ['instagram', 'youtube'])[:2]
     
     # Use the determined campaign_industry for the niche or a general one
@@ -1314,9 +2274,9 @@ def generate_fallback_campaign_py(requirements_data):
         "deliverables": ["Generic Post", "Generic Story"],
         "budgetMin": budget_min,
         "budgetMax": budget_max,
-        "startDate": start_date_obj.strftime('%Y-%m-%d'),
-        "endDate": end_date_obj.strftime('%Y-%m-%d'),
-        "applicationDeadline": app_deadline_obj.strftime('%Y-%m-%d'),
+        "startDate": start_date_str,
+        "endDate": end_date_str,
+        "applicationDeadline": app_deadline_str,
         "aiInsights": {
             "strategy": "Default algorithmic strategy focusing on core requirements.",
             "reasoning": "Generated due to AI unavailability or error.",
@@ -1326,7 +2286,7 @@ def generate_fallback_campaign_py(requirements_data):
         },
         "confidence": 0.60, # Lower confidence for algorithmic fallback
         "agentVersion": "campaign-builder-fallback-py-v1.1", # Updated version to reflect changes
-        "generatedAt": datetime.now().isoformat()
+        "generatedAt": request_now_iso()
     }
 
 # NEW HELPER: Validate date strings or return None if placeholder/invalid
@@ -1351,7 +2311,7 @@ def save_campaign_to_db(campaign_payload, user_id, original_requirements, raw_jw
     # Ensure supabase_client and its postgrest component are available
     if not supabase_client or not hasattr(supabase_client, 'postgrest'):
         error_message = "Supabase client or postgrest interface not available."
-        print(f"❌ {error_message}")
+        LOGGER.error("❌ %s", error_message)
         return {"success": False, "error": error_message, "data": None}
 
     # Prepare the payload for the 'campaigns' table
@@ -1390,36 +2350,38 @@ def save_campaign_to_db(campaign_payload, user_id, original_requirements, raw_jw
         'key_message': original_requirements.get('keyMessage'),
         # created_at and updated_at will be set by Supabase default or triggers if defined,
         # otherwise we can set them here if needed like in the other create endpoint
-        "created_at": datetime.now(timezone.utc).isoformat(),
-        "updated_at": datetime.now(timezone.utc).isoformat()
+        "created_at": request_now_iso(),
+        "updated_at": request_now_iso()
     }
 
-    print(f"💾 DEBUG: Preparing to insert into Supabase. User ID for insert: {user_id}")
-    print(f"💾 DEBUG: Full db_payload for Supabase insert: {json.dumps(db_payload, indent=2, default=str)}")
+    LOGGER.debug("💾 DEBUG: Preparing to insert into Supabase. User ID for insert: %s", user_id)
+    if LOGGER.isEnabledFor(logging.DEBUG): # Skip serializing the whole payload unless it will be shown
+        LOGGER.debug("💾 DEBUG: Full db_payload for Supabase insert: %s", json.dumps(db_payload, indent=2, default=str))
     
     if not raw_jwt_token:
-        print("🟡 DEBUG: Raw JWT token is MISSING in save_campaign_to_db. RLS will rely on default client auth if policy needs user context.")
+        LOGGER.debug("🟡 DEBUG: Raw JWT token is MISSING in save_campaign_to_db. RLS will rely on default client auth if policy needs user context.")
 
     # Store the current headers of the PostgREST client session
     # This is crucial to restore the client's auth state (e.g., service role key) afterwards
+    SUPABASE_POSTGREST_AUTH_LOCK.acquire()
     original_postgrest_headers = supabase_client.postgrest.session.headers.copy()
 
     try:
         if raw_jwt_token:
-            print(f"💾 DEBUG: Temporarily setting PostgREST auth to user's JWT for RLS. Token snippet: {raw_jwt_token[:20]}...")
+            LOGGER.debug("💾 DEBUG: Temporarily setting PostgREST auth to user's JWT for RLS. Token snippet: %s...", raw_jwt_token[:20])
             # This sets the Authorization: Bearer <user_jwt> header for the PostgREST client
             supabase_client.postgrest.auth(raw_jwt_token)
         else:
             # If no JWT, the client will use its default authentication (e.g., service role key)
             # RLS policies checking auth.uid() might fail if they expect a user context not provided by the service key alone.
-            print("💾 DEBUG: Proceeding with default PostgREST client authentication (e.g., service key).")
+            LOGGER.debug("💾 DEBUG: Proceeding with default PostgREST client authentication (e.g., service key).")
 
-        print(f"💾 DEBUG: Attempting insert. User ID for insert: {user_id}")
+        LOGGER.debug("💾 DEBUG: Attempting insert. User ID for insert: %s", user_id)
         insert_response = supabase_client.table('campaigns').insert(db_payload).execute()
         
         if hasattr(insert_response, 'data') and insert_response.data and len(insert_response.data) > 0:
             saved_campaign_data = insert_response.data[0]
-            print(f"✅ Campaign '{saved_campaign_data.get('title')}' (ID: {saved_campaign_data.get('id')}) saved successfully for user {user_id}.")
+            LOGGER.info("✅ Campaign '%s' (ID: %s) saved successfully for user %s.", saved_campaign_data.get('title'), saved_campaign_data.get('id'), user_id)
             return {"success": True, "data": saved_campaign_data, "error": None}
         else:
             error_msg = "Campaign data not returned from DB after insert."
@@ -1432,23 +2394,56 @@ def save_campaign_to_db(campaign_payload, user_id, original_requirements, raw_jw
             elif hasattr(insert_response, 'status_code') and insert_response.status_code >= 400:
                  error_msg += f" HTTP Status: {insert_response.status_code}. Response: {getattr(insert_response, 'text', str(insert_response))[:200]}"
 
-            print(f"❌ {error_msg} Raw Response: {insert_response}")
+            LOGGER.error("❌ %s Raw Response: %s", error_msg, insert_response)
             return {"success": False, "error": error_msg, "data": None}
 
     except Exception as e:
         error_message = f"Error saving campaign to Supabase: {type(e).__name__} - {str(e)}"
-        print(f"❌ {error_message}")
-        import traceback
-        traceback.print_exc() # Print full traceback for debugging
+        LOGGER.exception("❌ %s", error_message)
         return {"success": False, "error": error_message, "data": None}
     finally:
         # CRITICAL: Restore the original headers to the PostgREST client
         # This ensures the global client reverts to its original authentication state (e.g., service role)
-        print("💾 DEBUG: Restoring original PostgREST client session headers.")
+        LOGGER.debug("💾 DEBUG: Restoring original PostgREST client session headers.")
         supabase_client.postgrest.session.headers = original_postgrest_headers
+        SUPABASE_POSTGREST_AUTH_LOCK.release()
         # Verify restoration (optional debug log)
         # print(f"💾 DEBUG: Headers restored to: {supabase_client.postgrest.session.headers}")
 
+CAMPAIGN_GROQ_MODEL = groq_model_for("campaign_generate", GROQ_LARGE_MODEL) # Long-form creative plan; keeps the 70B model
+CAMPAIGN_GROQ_MAX_TOKENS = 1200
+CAMPAIGN_GROQ_PAYLOAD_PREFIX = build_groq_payload_prefix(
+    model=CAMPAIGN_GROQ_MODEL,
+    temperature=0.3,
+    max_tokens=CAMPAIGN_GROQ_MAX_TOKENS,
+    response_format={"type": "json_object"}
+)
+
+# Keys a generated campaign must carry (update these to match the JSON structure in build_campaign_system_prompt)
+CAMPAIGN_ESSENTIAL_KEYS = ("title", "brand", "description", "brief", "platforms",
+                           "niches", "locations", "deliverables", "budgetMin",
+                           "budgetMax", "startDate", "endDate", "applicationDeadline", "aiInsights")
+
+def validate_generated_campaign(content):
+    if not isinstance(content, dict):
+        raise ValueError(f"Parsed JSON is not a dictionary. Type: {type(content)}, Content snippet: {str(content)[:200]}")
+
+    missing_keys = [key for key in CAMPAIGN_ESSENTIAL_KEYS if key not in content]
+    # Allow either 'minFollowers' (from prompt) or 'followers' (actual LLM output seen)
+    if "minFollowers" not in content and "followers" not in content:
+        missing_keys.append("minFollowers_or_followers") # Indicate the specific lack of any follower key
+    if missing_keys:
+        raise ValueError(f"AI campaign response JSON missing required keys: {', '.join(missing_keys)}. Found keys: {list(content.keys())}")
+
+    # Legacy adaptation (if still needed for some LLM responses)
+    if "body" in content and "message" not in content:
+        content["message"] = content.pop("body")
+
+    content['agentVersion'] = 'campaign-builder-py-v1.5' # increment version
+    content['generatedAt'] = request_now_iso()
+    if 'confidence' not in content: content['confidence'] = 0.85 # Default confidence
+    return content
+
 @app.route('/api/campaign/generate', methods=['POST'])
 @token_required # Secure this endpoint
 def handle_generate_campaign():
@@ -1457,7 +2452,7 @@ def handle_generate_campaign():
         return jsonify({"success": False, "error": "Missing business requirements in request body."}), 400
 
     if not hasattr(request, 'current_user') or not request.current_user or not hasattr(request.current_user, 'id') or not hasattr(request, 'raw_jwt'):
-        print("🔴 Current user or raw_jwt not found in request for handle_generate_campaign.") 
+        LOGGER.error("🔴 Current user or raw_jwt not found in request for handle_generate_campaign.") 
         return jsonify({"success": False, "error": "User context or token not available for campaign generation."}), 401
         
     current_user_id = request.current_user.id
@@ -1465,251 +2460,225 @@ def handle_generate_campaign():
     campaign_to_save = None
     generation_method = "unknown"
     error_during_generation = None
+    cached_campaign = None
+    prompt = None
+    if groq_api_key:
+        cache_key = build_llm_cache_key("campaign", requirements_data)
+        cached_campaign = get_cached_llm_response(cache_key)
+        g.llm_cache_status = "MISS" if cached_campaign is None else "HIT"
+        if cached_campaign is None:
+            prompt = build_campaign_generation_prompt(requirements_data)
+
+    def save_campaign_body(campaign, method, generation_warning=None):
+        """Saves the generated campaign and returns (response body, HTTP status)."""
+        # Pass the raw_jwt_from_request to save_campaign_to_db
+        db_save_result = save_campaign_to_db(campaign, current_user_id, requirements_data, raw_jwt_from_request)
+        if not db_save_result["success"]:
+            return {
+                "success": False, 
+                "error": f"Campaign content was generated (method: {method}) but failed to save to database: {db_save_result['error']}",
+                "generation_warning": generation_warning,
+                "generated_campaign_data_for_debug": campaign
+            }, 500
+        response_payload = {
+            "success": True, 
+            "campaign": db_save_result["data"], 
+            "method": method, 
+            "message": "Campaign generated and saved successfully."
+        }
+        if generation_warning:
+             response_payload["generation_warning"] = generation_warning
+        if cached_campaign is not None:
+            response_payload["cacheHit"] = True
+        return response_payload, 201
 
     if not groq_api_key:
-        print("🤖 Campaign Agent (Backend): Groq API key not configured. Using fallback campaign strategy.")
+        LOGGER.info("🤖 Campaign Agent (Backend): Groq API key not configured. Using fallback campaign strategy.")
         campaign_to_save = generate_fallback_campaign_py(requirements_data)
         generation_method = "algorithmic_fallback_no_api_key"
+    elif cached_campaign is not None:
+        LOGGER.info("⚡ Campaign Agent (Backend): Cache hit for identical requirements, skipping Groq call: %s", cached_campaign.get('title'))
+        campaign_to_save = {**cached_campaign, 'generatedAt': request_now_iso()} # Copy; the cached dict is shared
+        generation_method = "ai_generated"
+    elif not groq_prompt_fits_context(CAMPAIGN_GROQ_MAX_TOKENS, build_campaign_system_prompt(), prompt):
+        LOGGER.warning("⚠️ Campaign Agent (Backend): Requirements exceed the AI model's context budget. Using fallback campaign strategy.")
+        error_during_generation = "Business requirements too long for the AI model, used fallback strategy."
+        campaign_to_save = generate_fallback_campaign_py(requirements_data)
+        generation_method = "algorithmic_fallback_prompt_too_long"
+    elif wants_event_stream():
+        # Stream the campaign JSON as it decodes; the save happens once the object is complete and rides on the result event
+        def accept_streamed_campaign(parsed_json):
+            content = validate_generated_campaign(parsed_json)
+            LOGGER.info("✨ Campaign Agent (Backend): Streamed AI campaign JSON parsed & validated: %s", content.get('title'))
+            cache_llm_response(cache_key, content)
+            return save_campaign_body(content, "ai_generated")[0]
+
+        def fallback_streamed_campaign(error_message):
+            return save_campaign_body(generate_fallback_campaign_py(requirements_data), "algorithmic_fallback_after_stream_error", error_message)[0]
+
+        LOGGER.info("🤖 Campaign Agent (Backend): Streaming AI API call for campaign generation...")
+        messages = [
+            {"role": "system", "content": build_campaign_system_prompt()},
+            {"role": "user", "content": prompt}
+        ]
+        return stream_groq_json_response(encode_groq_payload(CAMPAIGN_GROQ_PAYLOAD_PREFIX, messages, stream=True), accept_streamed_campaign, fallback_streamed_campaign)
     else:
-        prompt = build_campaign_generation_prompt(requirements_data)
         try:
-            print(f"🤖 Campaign Agent (Backend): Making AI API call for campaign generation...")
-            headers = {"Authorization": f"Bearer {groq_api_key}", "Content-Type": "application/json"}
-            payload = {
-                "model": "llama3-70b-8192", 
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.3,
-                "max_tokens": 2000
-            }
-            response = requests.post("https://api.groq.com/openai/v1/chat/completions", headers=headers, json=payload)
-            response.raise_for_status()
-            ai_response_data = response.json()
-            ai_message_content = ai_response_data['choices'][0]['message']['content']
+            LOGGER.info("🤖 Campaign Agent (Backend): Making AI API call for campaign generation...")
+            messages = [
+                {"role": "system", "content": build_campaign_system_prompt()},
+                {"role": "user", "content": prompt}
+            ]
             try:
-                json_str = None
-                # 1. Try to extract JSON from markdown code fence ```json ... ``` (case-insensitive for 'json')
-                match_md_json = re.search(r"```json\s*(\{.*?\})\s*```", ai_message_content, re.DOTALL | re.IGNORECASE)
-                if match_md_json:
-                    json_str = match_md_json.group(1)
-                    print("🤖 Campaign Agent (Backend): Extracted JSON from markdown code fence.")
-                else:
-                    # 2. If no markdown, find the first '{' and last '}' as a broader fallback
-                    first_brace_index = ai_message_content.find('{')
-                    last_brace_index = ai_message_content.rfind('}')
-                    if first_brace_index != -1 and last_brace_index != -1 and first_brace_index < last_brace_index:
-                        json_str = ai_message_content[first_brace_index : last_brace_index + 1]
-                        print("🤖 Campaign Agent (Backend): Extracted JSON using first '{' and last '}'.")
-                
-                if not json_str:
-                    raise ValueError(f"Could not find any JSON-like block in AI response. Raw content prefix: {ai_message_content[:300]}")
-                
-                # 3. Basic cleaning of the extracted string - strip whitespace
-                json_str_cleaned = json_str.strip()
-                
-                # Ensure it still looks like a JSON object after stripping
-                if not (json_str_cleaned.startswith("{") and json_str_cleaned.endswith("}")):
-                    s_idx = json_str_cleaned.find('{')
-                    e_idx = json_str_cleaned.rfind('}')
-                    if s_idx != -1 and e_idx != -1 and s_idx < e_idx:
-                        json_str_cleaned = json_str_cleaned[s_idx : e_idx+1]
-                    else:
-                        raise ValueError(f"Extracted string block does not appear to be a valid JSON object. Snippet: {json_str_cleaned[:200]}")
-                
-                # 4. Attempt to parse
-                print(f"🤖 Campaign Agent (Backend): Attempting to parse THIS JSON string:\n---\n{json_str_cleaned}\n---") # ADDED LOG
-                content = json.loads(json_str_cleaned)
-                
-                if not isinstance(content, dict):
-                    raise ValueError(f"Parsed JSON is not a dictionary. Type: {type(content)}, Content snippet: {str(content)[:200]}")
-
-                # 5. Validate essential keys (Update these keys to match your exact expected JSON structure from the LLM prompt)
-                # Allow either 'minFollowers' (from prompt) or 'followers' (actual LLM output seen)
-                essential_keys_check = ["title", "brand", "description", "brief", "platforms", 
-                                 "niches", "locations", "deliverables", "budgetMin", 
-                                 "budgetMax", "startDate", "endDate", "applicationDeadline", "aiInsights"]
-                
-                has_minfollowers_key = "minFollowers" in content
-                has_followers_key = "followers" in content
-
-                if not (has_minfollowers_key or has_followers_key):
-                    # If neither key for followers is present, add one to missing_keys to trigger error
-                    missing_keys = [key for key in essential_keys_check if key not in content] # Re-check without follower keys first
-                    missing_keys.append("minFollowers_or_followers") # Indicate the specific lack of any follower key
-                else:
-                    missing_keys = [key for key in essential_keys_check if key not in content]
-
-                if missing_keys: # If there are still missing keys after aiInsights check
-                    raise ValueError(f"AI campaign response JSON missing required keys: {', '.join(missing_keys)}. Found keys: {list(content.keys())}")
-                
-                # Legacy adaptation (if still needed for some LLM responses)
-                if "body" in content and "message" not in content:
-                    content["message"] = content.pop("body")
-                
-                content['agentVersion'] = 'campaign-builder-py-v1.5' # increment version
-                content['generatedAt'] = datetime.now(timezone.utc).isoformat()
-                if 'confidence' not in content: content['confidence'] = 0.85 # Default confidence
-                
-                print(f"✨ Campaign Agent (Backend): AI campaign JSON successfully parsed & validated: {content.get('title')}")
+                content = validate_generated_campaign(request_groq_json(encode_groq_payload(CAMPAIGN_GROQ_PAYLOAD_PREFIX, messages), "Campaign Agent (Backend)"))
+                LOGGER.info("✨ Campaign Agent (Backend): AI campaign JSON successfully parsed & validated: %s", content.get('title'))
+                cache_llm_response(cache_key, content)
                 campaign_to_save = content
                 generation_method = "ai_generated"
             except (json.JSONDecodeError, ValueError) as e_parse:
-                error_msg = f"Error parsing or validating AI campaign JSON response: {e_parse}. Raw content snippet (first 500 chars): {ai_message_content[:500]}"
-                print(error_msg)
+                error_msg = f"Error parsing or validating AI campaign JSON response: {e_parse}"
+                LOGGER.error("%s", error_msg)
                 error_during_generation = error_msg 
                 campaign_to_save = generate_fallback_campaign_py(requirements_data)
                 generation_method = "algorithmic_fallback_after_parse_error"
-        except requests.exceptions.RequestException as e_req:
+        except GROQ_TRANSPORT_ERRORS as e_req:
             error_msg = f"Groq API request failed for campaign generation: {e_req}"
-            print(error_msg)
+            LOGGER.error("%s", error_msg)
             error_during_generation = error_msg
             campaign_to_save = generate_fallback_campaign_py(requirements_data)
             generation_method = "algorithmic_fallback_after_api_error"
         except Exception as e_gen:
             error_msg = f"An unexpected error occurred during AI campaign generation: {e_gen}"
-            print(error_msg)
-            import traceback
-            traceback.print_exc()
+            LOGGER.exception("%s", error_msg)
             error_during_generation = error_msg
             campaign_to_save = generate_fallback_campaign_py(requirements_data)
             generation_method = "algorithmic_fallback_after_unexpected_error"
 
-    if campaign_to_save:
-        # Pass the raw_jwt_from_request to save_campaign_to_db
-        db_save_result = save_campaign_to_db(campaign_to_save, current_user_id, requirements_data, raw_jwt_from_request)
-        if db_save_result["success"]:
-            response_payload = {
-                "success": True, 
-                "campaign": db_save_result["data"], 
-                "method": generation_method, 
-                "message": "Campaign generated and saved successfully."
-            }
-            if error_during_generation:
-                 response_payload["generation_warning"] = error_during_generation
-            return jsonify(response_payload), 201
-        else:
-            return jsonify({
-                "success": False, 
-                "error": f"Campaign content was generated (method: {generation_method}) but failed to save to database: {db_save_result['error']}",
-                "generation_warning": error_during_generation,
-                "generated_campaign_data_for_debug": campaign_to_save
-            }), 500
-    else:
+    if not campaign_to_save:
         return jsonify({"success": False, "error": "Critical error: Failed to produce any campaign content to save."}), 500
+    response_body, status_code = save_campaign_body(campaign_to_save, generation_method, error_during_generation)
+    if wants_event_stream():
+        return make_sse_result_response(response_body)
+    return jsonify(response_body), status_code
 
 # --- Helper: Build Creator Scoring Prompt (Python version) ---
-def build_creator_scoring_prompt(campaign_data, creator_data):
-    # Extract relevant details for the prompt
-    campaign_title = campaign_data.get('title', '[Campaign Title]')
-    campaign_brief = campaign_data.get('brief', '[Campaign Brief]')[:300] # Summary of brief
-    campaign_niches = ", ".join(campaign_data.get('niches', []))
-    campaign_platforms = ", ".join(campaign_data.get('platforms', []))
-    campaign_budget_min = campaign_data.get('budgetMin', 0)
-    campaign_budget_max = campaign_data.get('budgetMax', 0)
+# --- Helper: Build Creator Scoring System Prompt (static, prefix-cacheable) ---
+@lru_cache(maxsize=1)
+def build_creator_scoring_system_prompt():
+    return """You are an AI expert at evaluating influencer-campaign fit. Analyze the campaign and creator details provided in the user message to generate a compatibility score and detailed assessment.
 
-    creator_name = creator_data.get('name', '[Creator Name]')
-    creator_platform = creator_data.get('platform', '[Platform]')
-    creator_followers = creator_data.get('metrics', {}).get('followers', 0)
-    creator_engagement = creator_data.get('metrics', {}).get('engagementRate', 0)
-    creator_niche_list = creator_data.get('niche', [])
-    creator_niches_str = ", ".join(creator_niche_list)
-    creator_bio = creator_data.get('bio', '')[:200] # Summary of bio
-    creator_avg_likes = creator_data.get('metrics', {}).get('avgLikes', 0)
-    creator_avg_comments = creator_data.get('metrics', {}).get('avgComments', 0)
-    creator_post_rate = creator_data.get('rates', {}).get('post', 0)
-
-    prompt = f"""You are an AI expert at evaluating influencer-campaign fit. Analyze the provided campaign and creator details to generate a compatibility score and detailed assessment.
-
-CAMPAIGN DETAILS:
-- Title: {campaign_title}
-- Brief Summary: {campaign_brief}...
-- Target Niches: {campaign_niches}
-- Target Platforms: {campaign_platforms}
-- Budget Range: ₹{campaign_budget_min}-₹{campaign_budget_max}
-
-CREATOR DETAILS:
-- Name: {creator_name}
-- Platform: {creator_platform}
-- Followers: {creator_followers:,}
-- Engagement Rate: {creator_engagement}%
-- Niches: {creator_niches_str}
-- Bio Summary: {creator_bio}...
-- Avg Likes: {creator_avg_likes:,}
-- Avg Comments: {creator_avg_comments:,}
-- Est. Post Rate: ₹{creator_post_rate:,}
-
-EVALUATION TASK:
-Provide a comprehensive analysis in JSON format. The score should be between 0-100.
-
-JSON Response Structure:
-{{
+Respond in this JSON structure:
+{
   "score": number, // Overall compatibility score (0-100)
   "reasoning": "Detailed explanation for the score, highlighting alignment and potential gaps.",
   "strengths": ["Specific strength 1 (e.g., Strong niche alignment)", "Specific strength 2"],
   "concerns": ["Specific concern 1 (e.g., Engagement rate slightly below ideal)", "Specific concern 2 (if any)"],
-  "fitAnalysis": {{
+  "fitAnalysis": {
     "audienceAlignment": number, // Score 0-100
     "contentQuality": number,    // Score 0-100 (based on implicit quality from bio/niche)
     "engagementRateFit": number, // Score 0-100 (how well engagement fits campaign goals)
     "brandSafety": number,      // Score 0-100 (assume high unless bio indicates issues)
     "costEfficiency": number   // Score 0-100 (based on rate vs budget)
-  }},
+  },
   "recommendedAction": "highly_recommend" | "recommend" | "consider" | "not_recommended",
-  "estimatedPerformance": {{
+  "estimatedPerformance": {
     "expectedReach": number, // e.g., 75% of followers
     "expectedEngagement": number, // e.g., followers * engagementRate
     "expectedROI": number // A qualitative or simple numeric ROI estimate (e.g., 2.0 to 3.5)
-  }}
-}}
-
-Instructions for AI:
-- Base the `score` on overall fit. 
-- `reasoning` should be specific and actionable.
-- `strengths` should highlight positive matches.
-- `concerns` should point out potential issues or areas for verification.
-- `fitAnalysis` sub-scores should reflect how well creator attributes match campaign needs.
-- `recommendedAction` should be based on the overall score (e.g., >80 highly_recommend, >65 recommend, >45 consider).
-- `estimatedPerformance` should be realistic based on provided metrics.
-Ensure the entire response is a single, valid JSON object with no extra text, and all strings are properly quoted and elements correctly comma-separated.
-"""
-    return prompt
+  }
+}
+
+recommendedAction follows the score: >80 highly_recommend, >65 recommend, >45 consider, else not_recommended."""
+
+# Parsed once at import; only the campaign/creator details vary, the evaluation task lives in build_creator_scoring_system_prompt().
+# The campaign block comes first and is identical for every creator scored against that campaign.
+CREATOR_SCORING_CAMPAIGN_TEMPLATE = string.Template("""CAMPAIGN DETAILS:
+- Title: ${campaignTitle}
+- Brief Summary: ${campaignBrief}...
+- Target Niches: ${campaignNiches}
+- Target Platforms: ${campaignPlatforms}
+- Budget Range: ₹${budgetMin}-₹${budgetMax}
+
+""")
+CREATOR_SCORING_CREATOR_TEMPLATE = string.Template("""CREATOR DETAILS:
+- Name: ${creatorName}
+- Platform: ${creatorPlatform}
+- Followers: ${creatorFollowers}
+- Engagement Rate: ${creatorEngagement}%
+- Niches: ${creatorNiches}
+- Bio Summary: ${creatorBio}...
+- Avg Likes: ${creatorAvgLikes}
+- Avg Comments: ${creatorAvgComments}
+- Est. Post Rate: ₹${creatorPostRate}""")
+
+CREATOR_SCORING_BRIEF_TOKEN_BUDGET = 40 # ~140 chars; enough for a fit decision
+CREATOR_SCORING_BIO_TOKEN_BUDGET = 25 # ~90 chars
+
+def build_campaign_scoring_context(campaign_data):
+    """Renders the campaign half of the scoring prompt; batch scoring builds it once and reuses it for every creator."""
+    return CREATOR_SCORING_CAMPAIGN_TEMPLATE.substitute(
+        campaignTitle=campaign_data.get('title', '[Campaign Title]'),
+        campaignBrief=truncate_to_token_budget(clean_prompt_text(campaign_data.get('brief', '[Campaign Brief]')), CREATOR_SCORING_BRIEF_TOKEN_BUDGET), # Summary of brief
+        campaignNiches=", ".join(campaign_data.get('niches', [])),
+        campaignPlatforms=", ".join(campaign_data.get('platforms', [])),
+        budgetMin=campaign_data.get('budgetMin', 0),
+        budgetMax=campaign_data.get('budgetMax', 0)
+    )
+
+def build_creator_scoring_prompt(campaign_data, creator_data, campaign_context=None):
+    if campaign_context is None:
+        campaign_context = build_campaign_scoring_context(campaign_data)
+    creator_metrics = creator_data.get('metrics', {})
+    return campaign_context + CREATOR_SCORING_CREATOR_TEMPLATE.substitute(
+        creatorName=creator_data.get('name', '[Creator Name]'),
+        creatorPlatform=creator_data.get('platform', '[Platform]'),
+        creatorFollowers=f"{creator_metrics.get('followers', 0):,}",
+        creatorEngagement=creator_metrics.get('engagementRate', 0),
+        creatorNiches=", ".join(creator_data.get('niche', [])),
+        creatorBio=truncate_to_token_budget(clean_prompt_text(creator_data.get('bio', '')), CREATOR_SCORING_BIO_TOKEN_BUDGET), # Summary of bio
+        creatorAvgLikes=f"{creator_metrics.get('avgLikes', 0):,}",
+        creatorAvgComments=f"{creator_metrics.get('avgComments', 0):,}",
+        creatorPostRate=f"{creator_data.get('rates', {}).get('post', 0):,}"
+    )
 
 # --- Helper: Generate Fallback Scoring (Python version) ---
+# Fallback scoring rules, applied in order: (check, score delta, reason, strength) when the check passes, concern when it fails
+FALLBACK_SCORING_RULES = (
+    ("platform", 10, "Platform match.", "Platform aligned with campaign.", "Platform mismatch."),
+    ("followers", 10, "Sufficient follower count.", "Meets minimum follower requirement.", "Follower count below minimum."),
+    ("rate", 5, None, "Rate within campaign budget.", "Stated rate may exceed campaign max budget.")
+)
+FALLBACK_RECOMMENDED_ACTION_BOUNDS = (45, 65, 80) # Score thresholds, ascending
+FALLBACK_RECOMMENDED_ACTIONS = ("not_recommended", "consider", "recommend", "highly_recommend")
+
 def generate_fallback_scoring_py(campaign_data, creator_data):
-    print(f"🤖 Creator Scoring (Backend): Generating FALLBACK score for {creator_data.get('name', 'N/A')}...")
+    LOGGER.info("🤖 Creator Scoring (Backend): Generating FALLBACK score for %s...", creator_data.get('name', 'N/A'))
+    creator_metrics = creator_data.get('metrics', {}) # Looked up once; reused for every metric below
+    creator_followers = creator_metrics.get('followers', 0)
+    creator_post_rate = creator_data.get('rates', {}).get('post', float('inf'))
+    campaign_budget_max = campaign_data.get('budgetMax', 0)
     score = 50  # Base fallback score
     reasons = ["Fallback scoring due to AI unavailability or error."]
     strengths = ["Basic profile data available."]
     concerns = ["Full AI-driven analysis not performed."]
-    
-    # Basic checks for fallback score adjustment
-    if creator_data.get('platform') in campaign_data.get('platforms', []):
-        score += 10
-        reasons.append("Platform match.")
-        strengths.append("Platform aligned with campaign.")
-    else:
-        concerns.append("Platform mismatch.")
 
-    if creator_data.get('metrics', {}).get('followers', 0) >= campaign_data.get('minFollowers', 5000):
-        score += 10
-        reasons.append("Sufficient follower count.")
-        strengths.append("Meets minimum follower requirement.")
-    else:
-        concerns.append("Follower count below minimum.")
-
-    creator_post_rate = creator_data.get('rates', {}).get('post', float('inf'))
-    campaign_budget_max = campaign_data.get('budgetMax', 0)
-    if creator_post_rate <= campaign_budget_max:
-        score += 5
-        strengths.append("Rate within campaign budget.")
-    else:
-        concerns.append("Stated rate may exceed campaign max budget.")
+    # Basic checks for fallback score adjustment
+    checks = {
+        "platform": creator_data.get('platform') in campaign_data.get('platforms', []),
+        "followers": creator_followers >= campaign_data.get('minFollowers', 5000),
+        "rate": creator_post_rate <= campaign_budget_max
+    }
+    for check, delta, reason, strength, concern in FALLBACK_SCORING_RULES:
+        if checks[check]:
+            score += delta
+            if reason:
+                reasons.append(reason)
+            strengths.append(strength)
+        else:
+            concerns.append(concern)
 
     score = min(max(score, 0), 100) # Cap score between 0-100
-
-    recommended_action = "consider"
-    if score >= 80: recommended_action = "highly_recommend"
-    elif score >= 65: recommended_action = "recommend"
-    elif score < 45: recommended_action = "not_recommended"
+    recommended_action = FALLBACK_RECOMMENDED_ACTIONS[bisect.bisect_right(FALLBACK_RECOMMENDED_ACTION_BOUNDS, score)]
 
     return {
         "score": score,
@@ -1725,114 +2694,253 @@ def generate_fallback_scoring_py(campaign_data, creator_data):
         },
         "recommendedAction": recommended_action,
         "estimatedPerformance": {
-            "expectedReach": int(creator_data.get('metrics', {}).get('followers', 0) * 0.7),
-            "expectedEngagement": int(creator_data.get('metrics', {}).get('followers', 0) * creator_data.get('metrics', {}).get('engagementRate', 0) / 100),
+            "expectedReach": int(creator_followers * 0.7),
+            "expectedEngagement": int(creator_followers * creator_metrics.get('engagementRate', 0) / 100),
             "expectedROI": 1.5
         }
     }
 
+CREATOR_SCORING_GROQ_MODEL = groq_model_for("creator_score", GROQ_FAST_MODEL) # Classification-style scoring; 8B is plenty
+CREATOR_SCORING_GROQ_MAX_TOKENS = 600 # Schema needs ~350
+CREATOR_SCORING_GROQ_PAYLOAD_PREFIX = build_groq_payload_prefix(
+    model=CREATOR_SCORING_GROQ_MODEL,
+    temperature=0.2,
+    max_tokens=CREATOR_SCORING_GROQ_MAX_TOKENS,
+    response_format={"type": "json_object"}
+)
+
+def validate_creator_score(content):
+    if not isinstance(content, dict):
+        raise ValueError(f"Parsed JSON for scoring is not a dictionary. Type: {type(content)}")
+    # Validate essential keys for the scoring response
+    required_keys = ["score", "reasoning", "strengths", "concerns", "fitAnalysis", "recommendedAction", "estimatedPerformance"]
+    missing_keys = [key for key in required_keys if key not in content]
+    if missing_keys:
+        raise ValueError(f"AI scoring response JSON missing required keys: {', '.join(missing_keys)}. Found keys: {list(content.keys())}")
+    # Further validation for nested structures can be added if needed
+    # e.g., if not isinstance(content.get('fitAnalysis'), dict) or not content.get('fitAnalysis').get('audienceAlignment'): ...
+    return content
+
+def build_creator_score_cache_key(campaign_data, creator_data):
+    # The same campaign x creator pair is re-scored a lot while browsing results
+    return build_llm_cache_key("creator-score", {"model": CREATOR_SCORING_GROQ_MODEL, "campaign": campaign_data, "creator": creator_data})
+
+CREATOR_SCORING_BATCH_MAX_CONCURRENCY = 16 # Concurrent Groq calls per batch request
+CREATOR_SCORING_BATCH_MAX_ITEMS = 100 # Bounds the work per request (GROQ_BATCH_MAX_WAIT_SECONDS bounds the wait); use the offline Batch API mode beyond it
+CREATOR_SCORING_INVALID_ITEM_ERROR = "Each creator must be an object."
+
 @app.route('/api/creator/score', methods=['POST'])
 @token_required
-def handle_score_creator():
-    data = request.json
+@groq_call("Creator Scoring (Backend)", CREATOR_SCORING_GROQ_PAYLOAD_PREFIX, CREATOR_SCORING_GROQ_MAX_TOKENS, build_creator_scoring_system_prompt)
+def handle_score_creator(data):
     if not data or not all(k in data for k in ['campaign', 'creator']):
         return jsonify({"success": False, "error": "Missing campaign or creator data in request body."}), 400
 
     campaign_data = data['campaign']
     creator_data = data['creator']
-    ai_message_content = "" # Initialize for robust logging in except block
 
     if not groq_api_key:
-        print("🤖 Creator Scoring (Backend): Groq API key not configured. Using fallback scoring.")
+        LOGGER.info("🤖 Creator Scoring (Backend): Groq API key not configured. Using fallback scoring.")
         fallback_match_data = generate_fallback_scoring_py(campaign_data, creator_data)
         return jsonify({"success": True, "creatorMatch": fallback_match_data, "method": "algorithmic_fallback"})
 
-    prompt = build_creator_scoring_prompt(campaign_data, creator_data)
-    try:
-        print(f"🤖 Creator Scoring (Backend): Making AI API call for {creator_data.get('name', 'N/A')}. Prompt length: {len(prompt)}")
-        headers = {"Authorization": f"Bearer {groq_api_key}", "Content-Type": "application/json"}
-        payload = {
-            "model": "llama3-8b-8192", # Switched to 8b for potentially better instruction following / JSON adherence
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.2,
-            "max_tokens": 1500, 
-            "response_format": { "type": "json_object" }
-        }
-        
-        response = requests.post("https://api.groq.com/openai/v1/chat/completions", headers=headers, json=payload)
-        response.raise_for_status()
-        
-        ai_response_data = response.json()
-        ai_message_content = ai_response_data.get('choices', [{}])[0].get('message', {}).get('content', '')
-        print(f"🤖 Creator Scoring (Backend): Raw LLM response for {creator_data.get('name', 'N/A')}:\n{ai_message_content[:1000]}...")
-        
-        json_str_cleaned = None
-        if ai_message_content.strip().startswith("{") and ai_message_content.strip().endswith("}"):
-            json_str_cleaned = ai_message_content.strip()
-        else: # Try to find JSON within markdown or preamble/postamble
-            match_md_json = re.search(r"```json\s*(\{.*?\})\s*```", ai_message_content, re.DOTALL | re.IGNORECASE)
-            if match_md_json:
-                json_str_cleaned = match_md_json.group(1).strip()
-                print(f"🤖 Creator Scoring (Backend): Extracted JSON from markdown for {creator_data.get('name', 'N/A')}.")
-            else:
-                first_brace = ai_message_content.find('{')
-                last_brace = ai_message_content.rfind('}')
-                if first_brace != -1 and last_brace != -1 and first_brace < last_brace:
-                    json_str_cleaned = ai_message_content[first_brace : last_brace + 1].strip()
-                    print(f"🤖 Creator Scoring (Backend): Extracted JSON using braces for {creator_data.get('name', 'N/A')}.")
-        
-        if not json_str_cleaned:
-            raise ValueError(f"Could not find any JSON-like block in AI response for {creator_data.get('name', 'N/A')}. Raw: {ai_message_content[:300]}")
+    return GroqEndpointPlan(
+        prompt=build_creator_scoring_prompt(campaign_data, creator_data),
+        cache_key=build_creator_score_cache_key(campaign_data, creator_data),
+        validate=validate_creator_score,
+        success_body=lambda content: {"success": True, "creatorMatch": content, "method": "ai_generated"},
+        fallback_body=lambda error_message: {"success": True, "creatorMatch": generate_fallback_scoring_py(campaign_data, creator_data), "method": "algorithmic_fallback", "error_details": error_message}
+    )
 
-        print(f"🤖 Creator Scoring (Backend): Attempting to parse THIS JSON for {creator_data.get('name', 'N/A')}:\n---\n{json_str_cleaned}\n---")
-        content = json.loads(json_str_cleaned)
-        
-        if not isinstance(content, dict):
-            raise ValueError(f"Parsed JSON for scoring is not a dictionary for {creator_data.get('name', 'N/A')}.")
-
-        # Validate essential keys for the scoring response
-        required_keys = ["score", "reasoning", "strengths", "concerns", "fitAnalysis", "recommendedAction", "estimatedPerformance"]
-        missing_keys = [key for key in required_keys if key not in content]
-        if missing_keys:
-            raise ValueError(f"AI scoring response JSON missing required keys: {', '.join(missing_keys)} for {creator_data.get('name', 'N/A')}. Found keys: {list(content.keys())}")
-        
-        # Further validation for nested structures can be added if needed
-        # e.g., if not isinstance(content.get('fitAnalysis'), dict) or not content.get('fitAnalysis').get('audienceAlignment'): ...
-            
-        print(f"✅ Creator Scoring (Backend): AI score generated and validated for {creator_data.get('name', 'N/A')}: {content.get('score')}")
-        return jsonify({"success": True, "creatorMatch": content, "method": "ai_generated"})
+def build_creator_scoring_payload(campaign_data, creator_data, campaign_context=None):
+    messages = [
+        {"role": "system", "content": build_creator_scoring_system_prompt()},
+        {"role": "user", "content": build_creator_scoring_prompt(campaign_data, creator_data, campaign_context)}
+    ]
+    return encode_groq_payload(CREATOR_SCORING_GROQ_PAYLOAD_PREFIX, messages)
 
-    except (json.JSONDecodeError, ValueError) as e_parse_validate:
-        print(f"❌ Error parsing/validating AI scoring JSON for {creator_data.get('name', 'N/A')}: {e_parse_validate}. Raw content snippet: {ai_message_content[:500]}")
-        fallback_match_data = generate_fallback_scoring_py(campaign_data, creator_data)
-        return jsonify({"success": True, "creatorMatch": fallback_match_data, "method": "algorithmic_fallback", "error_details": str(e_parse_validate)})
-    except requests.exceptions.RequestException as e_req:
-        print(f"❌ Groq API request failed for creator scoring for {creator_data.get('name', 'N/A')}: {e_req}")
-        fallback_match_data = generate_fallback_scoring_py(campaign_data, creator_data)
-        return jsonify({"success": True, "creatorMatch": fallback_match_data, "method": "algorithmic_fallback", "error_details": str(e_req)})
-    except Exception as e_gen:
-        print(f"❌ Unexpected error during AI creator scoring for {creator_data.get('name', 'N/A')}: {e_gen}")
-        import traceback
-        traceback.print_exc()
-        fallback_match_data = generate_fallback_scoring_py(campaign_data, creator_data)
-        return jsonify({"success": True, "creatorMatch": fallback_match_data, "method": "algorithmic_fallback", "error_details": str(e_gen)})
+CREATOR_SCORING_GROQ_PROFILE = GroqEndpointProfile(CREATOR_SCORING_GROQ_PAYLOAD_PREFIX, CREATOR_SCORING_GROQ_MAX_TOKENS, build_creator_scoring_system_prompt)
 
-# --- Helper: Build Creator Query Analysis Prompt (Python version) ---
-def build_creator_query_analysis_prompt(user_query_text, conversation_context_text=None):
-    context_section = ""
-    if conversation_context_text and conversation_context_text.strip():
-        context_section = f"""CONVERSATION CONTEXT (Previous messages):
-{conversation_context_text}
+def score_creators_with_fanout(campaign_data, creators):
+    """
+    Scores creators against one campaign with concurrent Groq calls, in input order.
+    Each creator falls back to algorithmic scoring independently.
+    """
+    campaign_context = build_campaign_scoring_context(campaign_data) # Same for every creator in the batch
+
+    def creator_plan(creator_data):
+        if not isinstance(creator_data, dict):
+            return {"success": False, "error": CREATOR_SCORING_INVALID_ITEM_ERROR, "creatorId": None}
+        creator_id = creator_data.get('id')
+        def fallback_body(error_message=None):
+            result = {"creatorMatch": generate_fallback_scoring_py(campaign_data, creator_data), "method": "algorithmic_fallback", "creatorId": creator_id}
+            if error_message:
+                result["error_details"] = error_message
+            return result
+        if not groq_api_key:
+            return fallback_body()
+        return GroqEndpointPlan(
+            prompt=partial(build_creator_scoring_prompt, campaign_data, creator_data, campaign_context),
+            cache_key=build_creator_score_cache_key(campaign_data, creator_data),
+            validate=validate_creator_score,
+            success_body=lambda content: {"creatorMatch": content, "method": "ai_generated", "creatorId": creator_id},
+            fallback_body=fallback_body
+        )
 
-Based on the above context and the latest user query:"""
-    else:
-        context_section = "Based on the user query:"
+    return run_groq_batch("Creator Scoring (Backend)", [creator_plan(creator_data) for creator_data in creators],
+                          CREATOR_SCORING_GROQ_PROFILE, CREATOR_SCORING_BATCH_MAX_CONCURRENCY)
+
+def parse_creator_batch_request(data):
+    """Returns an error response for a malformed {"campaign", "creators"} body, or None if it is usable."""
+    if not data or not all(k in data for k in ['campaign', 'creators']):
+        return jsonify({"success": False, "error": "Missing campaign or creators data in request body."}), 400
+    if not isinstance(data['creators'], list):
+        return jsonify({"success": False, "error": "creators must be a list."}), 400
+    return None
+
+def creator_batch_too_large_response(creators):
+    """Returns a 400 response when an in-request scoring batch is over CREATOR_SCORING_BATCH_MAX_ITEMS, or None."""
+    if len(creators) <= CREATOR_SCORING_BATCH_MAX_ITEMS:
+        return None
+    return jsonify({
+        "success": False,
+        "error": f"Too many creators ({len(creators)}); at most {CREATOR_SCORING_BATCH_MAX_ITEMS} can be scored per request. "
+                 "Submit larger batches to /api/creator/score-batch-offline with \"mode\": \"offline\"."
+    }), 400
+
+@app.route('/api/creator/score-batch', methods=['POST'])
+@token_required
+def handle_score_creator_batch():
+    """
+    Scores many creators against one campaign in a single request.
+    Body: {"campaign": {...}, "creators": [...]}. Returns {"success": True, "matches": [...]} in input order.
+    Groq calls are fanned out concurrently; each creator falls back to algorithmic scoring independently.
+    """
+    data = request.json
+    error_response = parse_creator_batch_request(data) or creator_batch_too_large_response(data['creators'])
+    if error_response:
+        return error_response
+    return jsonify({"success": True, "matches": score_creators_with_fanout(data['campaign'], data['creators'])})
+
+# --- Offline creator scoring via the Groq Batch API ---
+# Bulk scoring that doesn't need an interactive answer is submitted as one JSONL batch job: Groq bills batch
+# requests at a discount and runs them outside the per-minute rate limits the interactive endpoints share.
+# Each line's custom_id is "<input index>:<creator id>", so results map back to creators without any server-side state.
+GROQ_FILES_URL = "https://api.groq.com/openai/v1/files"
+GROQ_BATCHES_URL = "https://api.groq.com/openai/v1/batches"
+GROQ_BATCH_COMPLETION_WINDOW = "24h"
+GROQ_BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+def build_creator_scoring_batch_jsonl(campaign_data, creators):
+    campaign_context = build_campaign_scoring_context(campaign_data) # Same for every creator in the batch
+    lines = []
+    for index, creator_data in enumerate(creators):
+        if not isinstance(creator_data, dict):
+            continue # No result line; the index gap shows which inputs were skipped
+        custom_id = orjson.dumps(f"{index}:{creator_data.get('id', '')}")
+        payload = build_creator_scoring_payload(campaign_data, creator_data, campaign_context) # Already-encoded JSON, spliced in as-is
+        lines.append(b'{"custom_id":' + custom_id + b',"method":"POST","url":"/v1/chat/completions","body":' + payload + b'}')
+    return b"\n".join(lines)
+
+def submit_groq_batch(jsonl_body):
+    # Content-Type None drops the session's JSON header so requests can set the multipart boundary
+    upload = GROQ_SESSION.post(GROQ_FILES_URL, data={"purpose": "batch"}, files={"file": ("creator-scoring.jsonl", jsonl_body, "application/jsonl")},
+                               headers={"Content-Type": None}, timeout=GROQ_REQUEST_TIMEOUT)
+    upload.raise_for_status()
+    batch = GROQ_SESSION.post(GROQ_BATCHES_URL, data=orjson.dumps({
+        "input_file_id": upload.json()["id"],
+        "endpoint": "/v1/chat/completions",
+        "completion_window": GROQ_BATCH_COMPLETION_WINDOW
+    }), timeout=GROQ_REQUEST_TIMEOUT)
+    batch.raise_for_status()
+    return batch.json()
+
+def parse_creator_batch_line(line):
+    """Turns one line of a Groq batch output/error file into a match record for the NDJSON stream."""
+    record = orjson.loads(line)
+    index, _, creator_id = record.get("custom_id", "").partition(":")
+    result = {"index": int(index) if index.isdigit() else None, "creatorId": creator_id or None}
+    try:
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            raise ValueError(f"Batch request failed: {record.get('error') or response.get('status_code')}")
+        ai_message_content = response["body"]["choices"][0]["message"]["content"]
+        result["creatorMatch"] = validate_creator_score(extract_first_json(ai_message_content))
+        result["method"] = "ai_generated"
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        result["error_details"] = str(e)
+    return result
+
+@app.route('/api/creator/score-batch-offline', methods=['POST'])
+@token_required
+def handle_score_creator_batch_offline():
+    """
+    Body: {"campaign": {...}, "creators": [...], "mode": "offline"}.
+    With mode "offline" the creators are submitted as a Groq batch job and {"success", "mode": "offline", "batchId", "status"} is
+    returned; poll GET /api/creator/score-batch/<batchId> for the results. Any other mode, a missing Groq key, or a failed
+    submission scores the creators right away with the same fan-out as /api/creator/score-batch.
+    """
+    data = request.json
+    error_response = parse_creator_batch_request(data)
+    if error_response:
+        return error_response
+    campaign_data = data['campaign']
+    creators = data['creators']
+
+    if data.get('mode') == 'offline' and groq_api_key and creators:
+        try:
+            batch = submit_groq_batch(build_creator_scoring_batch_jsonl(campaign_data, creators))
+            LOGGER.info("✅ Creator Scoring (Backend): Submitted offline batch %s for %s creators.", batch.get('id'), len(creators))
+            return jsonify({"success": True, "mode": "offline", "batchId": batch.get('id'), "status": batch.get('status')}), 202
+        except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+            LOGGER.warning("⚠️ Creator Scoring (Backend): Offline batch submission failed, scoring in-request instead: %s", e)
+
+    error_response = creator_batch_too_large_response(creators) # The in-request path has the same cap as /api/creator/score-batch
+    if error_response:
+        return error_response
+    return jsonify({"success": True, "mode": "buffered", "matches": score_creators_with_fanout(campaign_data, creators)})
+
+@app.route('/api/creator/score-batch/<batch_id>', methods=['GET'])
+@token_required
+def handle_score_creator_batch_status(batch_id):
+    """
+    Status of an offline scoring batch. Until it finishes this returns {"success", "batchId", "status", "requestCounts"};
+    once completed the results stream back as NDJSON, one {"index", "creatorId", "creatorMatch" | "error_details"} per line.
+    """
+    try:
+        status_response = GROQ_SESSION.get(f"{GROQ_BATCHES_URL}/{batch_id}", timeout=GROQ_REQUEST_TIMEOUT)
+        status_response.raise_for_status()
+        batch = status_response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        LOGGER.error("❌ Creator Scoring (Backend): Could not fetch batch %s: %s", batch_id, e)
+        return jsonify({"success": False, "batchId": batch_id, "error": str(e)}), 502
+
+    status = batch.get('status')
+    if status != "completed":
+        return jsonify({
+            "success": status not in GROQ_BATCH_TERMINAL_STATUSES,
+            "batchId": batch_id,
+            "status": status,
+            "requestCounts": batch.get('request_counts')
+        })
+
+    result_file_ids = [file_id for file_id in (batch.get('output_file_id'), batch.get('error_file_id')) if file_id]
 
-    prompt = f"""You are an AI assistant expert in understanding influencer marketing search queries. 
-Analyze the following user query and any provided conversation context to determine their intent and extract key search criteria.
+    def generate():
+        for file_id in result_file_ids:
+            with GROQ_SESSION.get(f"{GROQ_FILES_URL}/{file_id}/content", timeout=GROQ_REQUEST_TIMEOUT, stream=True) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if line:
+                        yield orjson.dumps(parse_creator_batch_line(line)) + b"\n"
 
-{context_section}
-User Query: "{user_query_text}"
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson', headers={"X-Batch-Status": status})
+
+# --- Helper: Build Creator Query Analysis System Prompt (static, prefix-cacheable) ---
+@lru_cache(maxsize=1)
+def build_creator_query_analysis_system_prompt():
+    return """You are an AI assistant expert in understanding influencer marketing search queries. 
+Analyze the user query in the user message, and any conversation context provided with it, to determine their intent and extract key search criteria.
 
 TASK:
 1. Determine the primary `intent` of the user (e.g., "find budget influencers", "find high engagement creators", "niche specific search").
@@ -1841,60 +2949,100 @@ TASK:
 4. Identify up to 3 `keyRequirements` (list of strings) that are most important from the query.
 
 Response format (JSON only):
-{{
+{
   "intent": "User's primary goal.",
   "queryType": "selected_query_type",
-  "extractedCriteria": {{
+  "extractedCriteria": {
     "platforms": ["platform1", "platform2"],
     "niches": ["nicheA", "nicheB"],
     "followerRange": "e.g., 10k-50k",
     "budget": "e.g., around $1000",
     "location": "e.g., USA"
-  }},
+  },
   "keyRequirements": ["most important requirement 1", "requirement 2"],
   "confidence": 0.85
-}}
+}
 
-Ensure the entire response is a single, valid JSON object. If a criterion is not mentioned, omit it or use null/empty list.
-"""
-    return prompt
+If a criterion is not mentioned, omit it or use null/empty list."""
+
+# --- Helper: Build Creator Query Analysis Prompt (Python version) ---
+# Returns only the dynamic user message; the task and schema live in build_creator_query_analysis_system_prompt().
+CREATOR_QUERY_ANALYSIS_USER_PROMPT_TEMPLATE = string.Template("""${contextSection}
+User Query: "${userQuery}\"""")
+CREATOR_QUERY_ANALYSIS_CONTEXT_TEMPLATE = string.Template("""CONVERSATION CONTEXT (Previous messages):
+${conversationContext}
+
+Based on the above context and the latest user query:""")
+CREATOR_QUERY_ANALYSIS_NO_CONTEXT_SECTION = "Based on the user query:"
+CREATOR_QUERY_ANALYSIS_CONTEXT_TOKEN_BUDGET = 800
+
+def build_creator_query_analysis_prompt(user_query_text, conversation_context_text=None):
+    if conversation_context_text and conversation_context_text.strip():
+        # Oldest messages are dropped first so the latest turns always make it into the prompt
+        context_section = CREATOR_QUERY_ANALYSIS_CONTEXT_TEMPLATE.substitute(
+            conversationContext=fit_to_token_budget(conversation_context_text, CREATOR_QUERY_ANALYSIS_CONTEXT_TOKEN_BUDGET)
+        )
+    else:
+        context_section = CREATOR_QUERY_ANALYSIS_NO_CONTEXT_SECTION
+    return CREATOR_QUERY_ANALYSIS_USER_PROMPT_TEMPLATE.substitute(contextSection=context_section, userQuery=user_query_text)
+
+# Basic keyword matching for fallback: one compiled alternation per category replaces a chain of substring scans.
+# Checked in order; the first matching query type wins (same substring semantics as before, e.g. "interact" matches "interactive").
+FALLBACK_QUERY_TYPE_PATTERNS = (
+    (re.compile(r"budget|cheap|affordable"), "budget_optimization"),
+    (re.compile(r"reach|followers|audience"), "reach_maximization"),
+    (re.compile(r"engagement|interact"), "engagement_focused")
+)
+FALLBACK_PLATFORM_PATTERN = re.compile(r"instagram|youtube|tiktok")
+FALLBACK_PLATFORM_ORDER = ("instagram", "youtube", "tiktok")
+
+@lru_cache(maxsize=4096) # Pure function of the query; repeated canned queries skip the scans entirely
+def classify_fallback_query(query_lower):
+    query_type = next((label for pattern, label in FALLBACK_QUERY_TYPE_PATTERNS if pattern.search(query_lower)), "general_search")
+    found_platforms = set(FALLBACK_PLATFORM_PATTERN.findall(query_lower))
+    return query_type, tuple(platform for platform in FALLBACK_PLATFORM_ORDER if platform in found_platforms)
 
 # --- Helper: Generate Fallback Query Analysis (Python version) ---
 def generate_fallback_query_analysis_py(user_query_text):
-    print(f"🤖 Creator Query Analysis (Backend): Generating FALLBACK analysis for query: {user_query_text[:50]}...")
-    # Basic keyword matching for fallback
-    query_lower = user_query_text.lower()
-    query_type = "general_search"
-    niches = []
-    platforms = []
-
-    if "budget" in query_lower or "cheap" in query_lower or "affordable" in query_lower:
-        query_type = "budget_optimization"
-    elif "reach" in query_lower or "followers" in query_lower or "audience" in query_lower:
-        query_type = "reach_maximization"
-    elif "engagement" in query_lower or "interact" in query_lower:
-        query_type = "engagement_focused"
-    
-    if "instagram" in query_lower: platforms.append("instagram")
-    if "youtube" in query_lower: platforms.append("youtube")
-    if "tiktok" in query_lower: platforms.append("tiktok")
+    LOGGER.info("🤖 Creator Query Analysis (Backend): Generating FALLBACK analysis for query: %s...", user_query_text[:50])
+    query_type, platforms = classify_fallback_query(user_query_text.lower())
 
     # This is a very simplified extraction for fallback
     return {
         "intent": "Basic understanding: user is looking for influencers.",
         "queryType": query_type,
         "extractedCriteria": {
-            "platforms": platforms if platforms else None,
+            "platforms": list(platforms) if platforms else None,
             "niches": ["general"] # Default niche for fallback
         },
         "keyRequirements": [user_query_text[:70] + "... (algorithmic extraction)"],
         "confidence": 0.40
     }
 
+CREATOR_QUERY_ANALYSIS_GROQ_MODEL = groq_model_for("query_analyze", GROQ_FAST_MODEL) # Extraction task; 8B is plenty
+CREATOR_QUERY_ANALYSIS_GROQ_MAX_TOKENS = 400 # Schema needs ~200
+CREATOR_QUERY_ANALYSIS_GROQ_PAYLOAD_PREFIX = build_groq_payload_prefix(
+    model=CREATOR_QUERY_ANALYSIS_GROQ_MODEL,
+    temperature=0.2,
+    max_tokens=CREATOR_QUERY_ANALYSIS_GROQ_MAX_TOKENS,
+    response_format={"type": "json_object"}
+)
+
+def validate_creator_query_analysis(content):
+    if not isinstance(content, dict):
+        raise ValueError(f"Parsed JSON for query analysis is not a dictionary. Type: {type(content)}")
+    # Adapt the 'body' field from AI to 'message' for consistent response structure with other endpoints
+    if "body" in content and "message" not in content:
+        content["message"] = content.pop("body")
+    # Basic validation for expected keys after adaptation
+    if not all(k in content for k in ["intent", "queryType", "extractedCriteria"]):
+        raise ValueError("AI query analysis JSON missing required keys")
+    return content
+
 @app.route('/api/creator/analyze-query', methods=['POST'])
 @token_required # Secure this endpoint
-def handle_analyze_creator_query():
-    data = request.json
+@groq_call("Creator Query Analysis (Backend)", CREATOR_QUERY_ANALYSIS_GROQ_PAYLOAD_PREFIX, CREATOR_QUERY_ANALYSIS_GROQ_MAX_TOKENS, build_creator_query_analysis_system_prompt)
+def handle_analyze_creator_query(data):
     if not data or not data.get('query'):
         return jsonify({"success": False, "error": "Missing 'query' in request body."}), 400
 
@@ -1902,135 +3050,115 @@ def handle_analyze_creator_query():
     conversation_context = data.get('conversationContext') # Optional
 
     if not groq_api_key:
-        print("🤖 Creator Query Analysis (Backend): Groq API key not configured. Using fallback analysis.")
+        LOGGER.info("🤖 Creator Query Analysis (Backend): Groq API key not configured. Using fallback analysis.")
         fallback_analysis = generate_fallback_query_analysis_py(user_query)
         return jsonify({"success": True, "analysis": fallback_analysis, "method": "algorithmic_fallback"})
 
-    prompt = build_creator_query_analysis_prompt(user_query, conversation_context)
-    try:
-        print(f"🤖 Creator Query Analysis (Backend): Making AI API call for query: {user_query[:50]}...")
-        headers = {
-            "Authorization": f"Bearer {groq_api_key}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "model": "llama3-70b-8192", 
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.2, 
-            "max_tokens": 800 
-        }
-        
-        response = requests.post("https://api.groq.com/openai/v1/chat/completions", headers=headers, json=payload)
-        response.raise_for_status()
-        
-        ai_response_data = response.json()
-        ai_message_content = ai_response_data['choices'][0]['message']['content']
-        
-        try:
-            json_str = ai_message_content # Default to the full content
-            # Attempt to strip markdown fences if present
-            if ai_message_content.strip().startswith("```json"):
-                # Find the start of the actual JSON after the ```json
-                json_block_start = ai_message_content.find('{')
-                # Find the end of the JSON before the closing ```
-                json_block_end = ai_message_content.rfind('}')
-                if json_block_start != -1 and json_block_end != -1 and json_block_start < json_block_end:
-                    json_str = ai_message_content[json_block_start : json_block_end + 1]
-            elif ai_message_content.strip().startswith("{") and ai_message_content.strip().endswith("}"):
-                json_str = ai_message_content.strip() # It's already a JSON string (hopefully)
-            else: # If no clear JSON structure, try finding the first { and last }
-                json_start_index = ai_message_content.find('{')
-                json_end_index = ai_message_content.rfind('}')
-                if json_start_index != -1 and json_end_index != -1 and json_start_index < json_end_index:
-                    json_str = ai_message_content[json_start_index : json_end_index + 1]
-                else:
-                    raise ValueError("Could not find any JSON-like block in AI response.")
-
-            content = json.loads(json_str) 
-            
-            # Adapt the 'body' field from AI to 'message' for consistent response structure with other endpoints
-            if "body" in content and "message" not in content:
-                content["message"] = content.pop("body")
-
-            # Basic validation for expected keys after adaptation
-            if not all(k in content for k in ["intent", "queryType", "extractedCriteria"]):
-                raise ValueError("AI query analysis JSON missing required keys")
-            
-            print(f"✅ Creator Query Analysis (Backend): AI analysis successful for query: {user_query[:50]}...")
-            return jsonify({"success": True, "analysis": content, "method": "ai_generated"})
-        except (json.JSONDecodeError, ValueError) as e:
-            print(f"Error parsing AI query analysis JSON: {e}. Raw: {ai_message_content}")
-            fallback_analysis = generate_fallback_query_analysis_py(user_query)
-            return jsonify({"success": True, "analysis": fallback_analysis, "method": "algorithmic_fallback", "error": "AI response parsing failed, using fallback."})
-
-    except requests.exceptions.RequestException as e:
-        print(f"Groq API request failed for query analysis: {e}")
-        fallback_analysis = generate_fallback_query_analysis_py(user_query)
-        return jsonify({"success": True, "analysis": fallback_analysis, "method": "algorithmic_fallback", "error": str(e)})
-    except Exception as e:
-        print(f"An unexpected error occurred during AI query analysis: {e}")
-        fallback_analysis = generate_fallback_query_analysis_py(user_query)
-        return jsonify({"success": True, "analysis": fallback_analysis, "method": "algorithmic_fallback", "error": "Unexpected backend error during query analysis."})
-
-# --- Helper: Build Initial Outreach Prompt (Python version) ---
-def build_initial_outreach_prompt_py(creator_data, brand_info_data, campaign_context_str):
-    creator_name = creator_data.get('name', '[Creator Name]')
-    creator_platform = creator_data.get('platform', '[Platform]')
-    # ... (other variable extractions for context are fine) ...
+    return GroqEndpointPlan(
+        prompt=build_creator_query_analysis_prompt(user_query, conversation_context),
+        # Canonicalized key: copies of the same query that differ only in surrounding whitespace share one analysis
+        cache_key=build_llm_cache_key("creator-query-analysis", {"model": CREATOR_QUERY_ANALYSIS_GROQ_MODEL, "query": user_query, "context": conversation_context}),
+        validate=validate_creator_query_analysis,
+        success_body=lambda content: {"success": True, "analysis": content, "method": "ai_generated"},
+        fallback_body=lambda error_message: {"success": True, "analysis": generate_fallback_query_analysis_py(user_query), "method": "algorithmic_fallback", "error": error_message}
+    )
 
-    prompt = f"""You are an AI tasked with generating a JSON object for an outreach email.
+# --- Helper: Build Initial Outreach System Prompt (static, prefix-cacheable) ---
+@lru_cache(maxsize=1)
+def build_initial_outreach_system_prompt():
+    return """You are an AI tasked with generating a JSON object for an outreach email.
 
-Use the following CREATOR PROFILE and BRAND COLLABORATION details to craft the email content:
-CREATOR NAME: {creator_name}
-CREATOR PLATFORM: {creator_platform}
-CAMPAIGN CONTEXT: {campaign_context_str}
-BRAND NAME: {brand_info_data.get('name', '[Brand Name]')}
-CAMPAIGN OBJECTIVES: {", ".join(brand_info_data.get('campaignGoals', []))}
-DELIVERABLES: {", ".join(brand_info_data.get('contentRequirements', []))}
+Use the CREATOR PROFILE and BRAND COLLABORATION details in the user message to craft the email content.
 
 IMPORTANT INSTRUCTIONS:
 1. Your entire response MUST be a single, valid JSON object.
-2. DO NOT include any text before or after the JSON object (e.g., no "Here is the JSON:" or ```json markdown).
-3. The JSON object MUST contain exactly two keys: "subject" and "message".
-4. The value for "subject" MUST be a string suitable for an email subject line.
-5. The value for "message" MUST be a string containing the full email body. This string can include newlines (which should be represented as \n in the JSON string value).
+2. The JSON object MUST contain exactly two keys: "subject" and "message".
+3. The value for "subject" MUST be a string suitable for an email subject line.
+4. The value for "message" MUST be a string containing the full email body. This string can include newlines (which should be represented as \\n in the JSON string value).
 
 Example of the REQUIRED JSON output format:
-{{
-  "subject": "Collaboration for {campaign_context_str} with {brand_info_data.get('name', '[Brand Name]')}",
-  "message": "Hi {creator_name},\n\nI saw your content on {creator_platform} and was impressed. We at {brand_info_data.get('name', '[Brand Name]')} are running a campaign for '{campaign_context_str}' about {brand_info_data.get('campaignGoals', [])[0] if brand_info_data.get('campaignGoals') else 'our new initiative'}. We think you'd be a great fit to help create {brand_info_data.get('contentRequirements', [])[0] if brand_info_data.get('contentRequirements') else 'engaging content'}.\n\nWould you be interested in discussing this?\n\nThanks,\n[Your Name]"
-}}
+{
+  "subject": "Collaboration for [Campaign Context] with [Brand Name]",
+  "message": "Hi [Creator Name],\\n\\nI saw your content on [Platform] and was impressed. We at [Brand Name] are running a campaign for '[Campaign Context]' about [first campaign objective]. We think you'd be a great fit to help create [first deliverable].\\n\\nWould you be interested in discussing this?\\n\\nThanks,\\n[Your Name]"
+}
 
-Generate ONLY the JSON object now based on the CREATOR and BRAND details provided above.
-"""
-    return prompt
+Generate ONLY the JSON object based on the CREATOR and BRAND details provided."""
+
+# --- Helper: Build Initial Outreach Prompt (Python version) ---
+# Returns only the dynamic user message; the format rules live in build_initial_outreach_system_prompt().
+INITIAL_OUTREACH_USER_PROMPT_TEMPLATE = string.Template("""CREATOR NAME: ${creatorName}
+CREATOR PLATFORM: ${creatorPlatform}
+CAMPAIGN CONTEXT: ${campaignContext}
+BRAND NAME: ${brandName}
+CAMPAIGN OBJECTIVES: ${campaignGoals}
+DELIVERABLES: ${contentRequirements}""")
+
+def build_initial_outreach_prompt_py(creator_data, brand_info_data, campaign_context_str):
+    return INITIAL_OUTREACH_USER_PROMPT_TEMPLATE.substitute(
+        creatorName=creator_data.get('name', '[Creator Name]'),
+        creatorPlatform=creator_data.get('platform', '[Platform]'),
+        campaignContext=campaign_context_str,
+        brandName=brand_info_data.get('name', '[Brand Name]'),
+        campaignGoals=", ".join(brand_info_data.get('campaignGoals', [])),
+        contentRequirements=", ".join(brand_info_data.get('contentRequirements', []))
+    )
 
 # --- Helper: Generate Fallback Initial Outreach (Python version) ---
-def generate_fallback_initial_outreach_py(creator_data, brand_info_data, campaign_context_str):
-    creator_name = creator_data.get('name', 'Creator')
-    brand_name = brand_info_data.get('name', 'Our Brand')
-    subject = f"Collaboration Opportunity: {brand_name} x {creator_name}"
-    body = f"""Hi {creator_name},
+# Parsed once at import: under a Groq outage every initial-outreach request renders these
+INITIAL_OUTREACH_FALLBACK_SUBJECT = string.Template("Collaboration Opportunity: ${brandName} x ${creatorName}")
+INITIAL_OUTREACH_FALLBACK_MESSAGE = string.Template("""Hi ${creatorName},
 
-We are impressed with your content on {creator_data.get('platform', 'your platform')} and would love to discuss a potential collaboration with {brand_name} for our upcoming campaign: {campaign_context_str}.
+We are impressed with your content on ${creatorPlatform} and would love to discuss a potential collaboration with ${brandName} for our upcoming campaign: ${campaignContext}.
 
 We believe your audience aligns well with our goals. Please let us know if you're interested in learning more.
 
 Best,
-The {brand_name} Team"""
+The ${brandName} Team""")
+
+INITIAL_OUTREACH_FALLBACK_STATIC_FIELDS = { # Same for every fallback; tuples so no response can mutate them
+    "reasoning": "Standard algorithmic fallback outreach message.",
+    "keyPoints": ("Generic introduction", "Basic value proposition"),
+    "nextSteps": ("Await creator response",),
+    "confidence": 0.5
+}
+
+def generate_fallback_initial_outreach_py(creator_data, brand_info_data, campaign_context_str):
+    template_fields = {
+        'creatorName': creator_data.get('name', 'Creator'),
+        'brandName': brand_info_data.get('name', 'Our Brand'),
+        'creatorPlatform': creator_data.get('platform', 'your platform'),
+        'campaignContext': campaign_context_str
+    }
     return {
-        "subject": subject,
-        "message": body, # Changed from 'body' to 'message' to match expected response structure
-        "reasoning": "Standard algorithmic fallback outreach message.",
-        "keyPoints": ["Generic introduction", "Basic value proposition"],
-        "nextSteps": ["Await creator response"],
-        "confidence": 0.5
+        "subject": INITIAL_OUTREACH_FALLBACK_SUBJECT.substitute(template_fields),
+        "message": INITIAL_OUTREACH_FALLBACK_MESSAGE.substitute(template_fields), # Changed from 'body' to 'message' to match expected response structure
+        **INITIAL_OUTREACH_FALLBACK_STATIC_FIELDS
     }
 
+INITIAL_OUTREACH_GROQ_MODEL = groq_model_for("initial_outreach", GROQ_FAST_MODEL) # Short two-field JSON email
+INITIAL_OUTREACH_GROQ_MAX_TOKENS = 1024
+INITIAL_OUTREACH_GROQ_PAYLOAD_PREFIX = build_groq_payload_prefix(
+    model=INITIAL_OUTREACH_GROQ_MODEL,
+    temperature=0.3,
+    max_tokens=INITIAL_OUTREACH_GROQ_MAX_TOKENS,
+    response_format={"type": "json_object"}
+)
+
+def validate_initial_outreach(content):
+    if not isinstance(content, dict):
+        raise ValueError(f"Parsed JSON is not a dictionary. Type: {type(content)}")
+    if "body" in content and "message" not in content: content["message"] = content.pop("body")
+    if not OUTREACH_MESSAGE_REQUIRED_KEYS.issubset(content):
+        missing_keys = [key for key in ("subject", "message") if key not in content]
+        raise ValueError(f"AI initial outreach JSON missing required keys: {', '.join(missing_keys)}. Found: {list(content.keys())}")
+    if not isinstance(content["subject"], str) or not isinstance(content["message"], str):
+        raise ValueError("'subject' or 'message' is not a string.")
+    return content
+
 @app.route('/api/outreach/initial-message', methods=['POST'])
 @token_required
-def handle_generate_initial_outreach():
-    data = request.json
+@groq_call("Initial Outreach (Backend)", INITIAL_OUTREACH_GROQ_PAYLOAD_PREFIX, INITIAL_OUTREACH_GROQ_MAX_TOKENS, build_initial_outreach_system_prompt)
+def handle_generate_initial_outreach(data):
     # Add null checks for data and its properties if necessary
     if not data or not data.get('creator') or not data.get('brandInfo') or not data.get('campaignContext'):
         return jsonify({"success": False, "error": "Missing required data for initial outreach."}), 400
@@ -2040,125 +3168,49 @@ def handle_generate_initial_outreach():
     campaign_context_str = data['campaignContext']
 
     if not groq_api_key:
-        print("🤖 Initial Outreach (Backend): Groq API key missing. Using template fallback.")
+        LOGGER.info("🤖 Initial Outreach (Backend): Groq API key missing. Using template fallback.")
         fallback_content = generate_fallback_initial_outreach_py(creator_data, brand_info_data, campaign_context_str)
         return jsonify({"success": True, **fallback_content, "method": "algorithmic_fallback"})
 
-    prompt = build_initial_outreach_prompt_py(creator_data, brand_info_data, campaign_context_str)
-    ai_message_content = "" # Initialize to ensure it's defined for the except block's logging
-    try:
-        print(f"🤖 Initial Outreach (Backend): Calling Groq for {creator_data.get('name', 'N/A')}. Prompt length: {len(prompt)}")
-        headers = {"Authorization": f"Bearer {groq_api_key}", "Content-Type": "application/json"}
-        # Using a model known for good instruction following and JSON output if available
-        payload = {"model": "llama3-8b-8192", "messages": [{"role": "user", "content": prompt}], "temperature": 0.3, "max_tokens": 1024, "response_format": { "type": "json_object" } }
-        
-        response = requests.post("https://api.groq.com/openai/v1/chat/completions", headers=headers, json=payload)
-        response.raise_for_status()
-        
-        ai_response_data = response.json()
-        ai_message_content = ai_response_data.get('choices', [{}])[0].get('message', {}).get('content', '')
-        print(f"🤖 Initial Outreach (Backend): Raw LLM response for {creator_data.get('name', 'N/A')}:\n{ai_message_content[:1000]}...")
-
-        if not ai_message_content.strip().startswith("{") or not ai_message_content.strip().endswith("}"):
-            # Attempt to find the JSON block if there's preamble/postamble
-            match_md_json = re.search(r"```json\s*(\{.*?\})\s*```", ai_message_content, re.DOTALL | re.IGNORECASE)
-            if match_md_json:
-                json_str_cleaned = match_md_json.group(1).strip()
-                print(f"🤖 Initial Outreach (Backend): Extracted JSON from markdown for {creator_data.get('name', 'N/A')}.")
-            else:
-                first_brace_index = ai_message_content.find('{')
-                last_brace_index = ai_message_content.rfind('}')
-                if first_brace_index != -1 and last_brace_index != -1 and first_brace_index < last_brace_index:
-                    json_str_cleaned = ai_message_content[first_brace_index : last_brace_index + 1].strip()
-                    print(f"🤖 Initial Outreach (Backend): Extracted JSON using braces for {creator_data.get('name', 'N/A')}.")
-                else:
-                    raise ValueError(f"Could not find a valid JSON block. Raw: {ai_message_content[:300]}")
-        else:
-            json_str_cleaned = ai_message_content.strip()
-
-        print(f"🤖 Initial Outreach (Backend): Attempting to parse THIS JSON for {creator_data.get('name', 'N/A')}:\n---\n{json_str_cleaned}\n---")
-        content = json.loads(json_str_cleaned)
-        
-        if not isinstance(content, dict):
-             raise ValueError(f"Parsed JSON is not a dictionary for {creator_data.get('name', 'N/A')}. Type: {type(content)}")
-
-        if "body" in content and "message" not in content: content["message"] = content.pop("body")
-        required_keys = ["subject", "message"]
-        missing_keys = [key for key in required_keys if key not in content]
-        if missing_keys:
-            raise ValueError(f"AI initial outreach JSON missing required keys: {', '.join(missing_keys)} for {creator_data.get('name', 'N/A')}. Found: {list(content.keys())}")
-        if not isinstance(content["subject"], str) or not isinstance(content["message"], str):
-            raise ValueError(f"'subject' or 'message' is not a string for {creator_data.get('name', 'N/A')}.")
-        
-        # Correctly unindented return statement:
-        return jsonify({"success": True, **content, "method": "ai_generated"})
-
-    except (json.JSONDecodeError, ValueError) as e_parse_validate:
-        print(f"❌ Error parsing/validating AI initial outreach JSON for {creator_data.get('name', 'N/A')}: {e_parse_validate}. Raw content snippet: {ai_message_content[:500]}")
-        fallback_content = generate_fallback_initial_outreach_py(creator_data, brand_info_data, campaign_context_str)
-        return jsonify({"success": True, **fallback_content, "method": "algorithmic_fallback", "error_details": str(e_parse_validate)})
-    except requests.exceptions.RequestException as e_req:
-        print(f"❌ Groq API request failed for initial outreach for {creator_data.get('name', 'N/A')}: {e_req}")
-        fallback_content = generate_fallback_initial_outreach_py(creator_data, brand_info_data, campaign_context_str)
-        return jsonify({"success": True, **fallback_content, "method": "algorithmic_fallback", "error_details": str(e_req)})
-    except Exception as e_gen:
-        print(f"❌ Unexpected error during AI initial outreach for {creator_data.get('name', 'N/A')}: {e_gen}")
-        import traceback
-        traceback.print_exc() 
-        fallback_content = generate_fallback_initial_outreach_py(creator_data, brand_info_data, campaign_context_str)
-        return jsonify({"success": True, **fallback_content, "method": "algorithmic_fallback", "error_details": str(e_gen)})
+    return GroqEndpointPlan(
+        prompt=build_initial_outreach_prompt_py(creator_data, brand_info_data, campaign_context_str),
+        cache_key=build_llm_cache_key("initial-outreach", {"model": INITIAL_OUTREACH_GROQ_MODEL, "creator": creator_data, "brand": brand_info_data, "campaign": campaign_context_str}),
+        validate=validate_initial_outreach,
+        success_body=lambda content: {"success": True, **content, "method": "ai_generated"},
+        fallback_body=lambda error_message: {"success": True, **generate_fallback_initial_outreach_py(creator_data, brand_info_data, campaign_context_str), "method": "algorithmic_fallback", "error_details": error_message}
+    )
 
 # --- Helper: Determine Follow-up Strategy (Python version) ---
+# Upper bounds (inclusive, in days) of each follow-up bucket; past the last one is the final entry.
+FOLLOW_UP_STRATEGY_DAY_BOUNDS = (3, 7, 14, 30)
+FOLLOW_UP_STRATEGIES = (
+    {"strategy": "Wait Longer", "tone": "Patient", "focus": "Give space"},
+    {"strategy": "Gentle Reminder", "tone": "Friendly & Understanding", "focus": "Soft check-in + value"},
+    {"strategy": "Value-Added Follow-up", "tone": "Professional & Informative", "focus": "Share updates or improved offer"},
+    {"strategy": "Strategic Re-engagement", "tone": "Direct & Respectful", "focus": "Best offer or deadline"},
+    {"strategy": "Relationship Preservation", "tone": "Gracious & Future-Focused", "focus": "Keep door open"}
+)
+
 def determine_follow_up_strategy_py(days_since_last_contact, _previous_email_type):
     # This logic can be expanded based on previous_email_type too
-    if days_since_last_contact <= 3:
-        return {"strategy": "Wait Longer", "tone": "Patient", "focus": "Give space"}
-    elif days_since_last_contact <= 7:
-        return {"strategy": "Gentle Reminder", "tone": "Friendly & Understanding", "focus": "Soft check-in + value"}
-    elif days_since_last_contact <= 14:
-        return {"strategy": "Value-Added Follow-up", "tone": "Professional & Informative", "focus": "Share updates or improved offer"}
-    elif days_since_last_contact <= 30:
-        return {"strategy": "Strategic Re-engagement", "tone": "Direct & Respectful", "focus": "Best offer or deadline"}
-    else:
-        return {"strategy": "Relationship Preservation", "tone": "Gracious & Future-Focused", "focus": "Keep door open"}
+    return FOLLOW_UP_STRATEGIES[bisect.bisect_left(FOLLOW_UP_STRATEGY_DAY_BOUNDS, days_since_last_contact)]
 
 # --- Helper: Get Follow-up Guidelines (Python version) ---
-def get_follow_up_guidelines_py(days_since_last_contact, _previous_email_type):
-    if days_since_last_contact <= 7:
-        return "EARLY FOLLOW-UP: Acknowledge they might still be considering. Provide additional value. No pressure."
-    elif days_since_last_contact <= 14:
-        return "MID-TERM FOLLOW-UP: Reference campaign timeline. Share new achievements. Offer slight incentive or flexibility."
-    elif days_since_last_contact <= 30:
-        return "LATE FOLLOW-UP: Likely final attempt. Provide best offer. Create gentle urgency. Offer alternatives."
-    else:
-        return "RELATIONSHIP PRESERVATION: Acknowledge this campaign may not be a fit. Keep door open for future."
-
-# --- Helper: Build Follow-up Email Prompt (Python version) ---
-def build_follow_up_email_prompt_py(creator_data, brand_info_data, days_since_last_contact, previous_email_type, conversation_context_str=None):
-    creator_name = creator_data.get('name', '[Creator Name]')
-    brand_name = brand_info_data.get('name', '[Brand Name]')
-    
-    follow_up_strategy_info = determine_follow_up_strategy_py(days_since_last_contact, previous_email_type)
-    follow_up_guidelines = get_follow_up_guidelines_py(days_since_last_contact, previous_email_type)
-
-    context_prompt_section = ""
-    if conversation_context_str and conversation_context_str.strip():
-        context_prompt_section = f"\nRECENT CONVERSATION SNIPPET:\n{conversation_context_str}\n"
+FOLLOW_UP_GUIDELINE_DAY_BOUNDS = (7, 14, 30)
+FOLLOW_UP_GUIDELINES = (
+    "EARLY FOLLOW-UP: Acknowledge they might still be considering. Provide additional value. No pressure.",
+    "MID-TERM FOLLOW-UP: Reference campaign timeline. Share new achievements. Offer slight incentive or flexibility.",
+    "LATE FOLLOW-UP: Likely final attempt. Provide best offer. Create gentle urgency. Offer alternatives.",
+    "RELATIONSHIP PRESERVATION: Acknowledge this campaign may not be a fit. Keep door open for future."
+)
 
-    prompt = f"""You are an expert relationship manager for influencer collaborations. Generate an intelligent follow-up email.
+def get_follow_up_guidelines_py(days_since_last_contact, _previous_email_type):
+    return FOLLOW_UP_GUIDELINES[bisect.bisect_left(FOLLOW_UP_GUIDELINE_DAY_BOUNDS, days_since_last_contact)]
 
-CREATOR: {creator_name} ({creator_data.get('platform', '')})
-BRAND: {brand_name}
+# --- Helper: Build Follow-up System Prompt (static, prefix-cacheable) ---
+FOLLOW_UP_SYSTEM_PROMPT_INSTRUCTIONS = """You are an expert relationship manager for influencer collaborations. Generate an intelligent follow-up email.
 
-FOLLOW-UP CONTEXT:
-- Days Since Last Contact: {days_since_last_contact}
-- Previous Email Type: {previous_email_type}
-- Current Follow-up Strategy: {follow_up_strategy_info['strategy']}
-- Recommended Tone: {follow_up_strategy_info['tone']}
-- Key Focus for this email: {follow_up_strategy_info['focus']}
-{context_prompt_section}
-SPECIFIC GUIDELINES FOR THIS FOLLOW-UP:
-{follow_up_guidelines}
+Use the CREATOR, BRAND, FOLLOW-UP CONTEXT and SPECIFIC GUIDELINES in the user message.
 
 EMAIL REQUIREMENTS:
 - Acknowledge the time since last contact appropriately.
@@ -2167,49 +3219,154 @@ EMAIL REQUIREMENTS:
 - Include a clear call-to-action or an easy way for them to respond/decline.
 - Keep the email brief and to the point.
 
-JSON Response Format (ONLY JSON, no other text):
-{{
-  "subject": "Strategic follow-up subject (e.g., Following Up: {brand_name} x {creator_name} Collaboration?)",
+"""
+FOLLOW_UP_RESPONSE_FORMAT = """JSON Response Format:
+{
+  "subject": "Strategic follow-up subject (e.g., Following Up: [Brand Name] x [Creator Name] Collaboration?)",
   "body": "Complete follow-up email text, incorporating the strategy and guidelines above.",
   "reasoning": "Explanation of why this specific follow-up approach and messaging were chosen.",
   "keyPoints": ["Key element of this follow-up 1", "Key element 2"],
   "nextSteps": ["Expected creator action", "Brand next step"],
   "confidence": 0.80 
-}}
-Ensure the JSON is valid, strings are quoted, and commas are used correctly.
-"""
-    return prompt
+}"""
+# Compact replies skip reasoning/keyPoints/nextSteps/confidence, roughly halving the tokens Groq has to generate
+FOLLOW_UP_COMPACT_RESPONSE_FORMAT = """JSON Response Format:
+{
+  "subject": "Strategic follow-up subject (e.g., Following Up: [Brand Name] x [Creator Name] Collaboration?)",
+  "body": "Complete follow-up email text, incorporating the strategy and guidelines above."
+}"""
+
+@lru_cache(maxsize=1)
+def build_follow_up_system_prompt():
+    # Byte-stable across requests so Groq can serve it from its prefix cache; per-request values go in the user message.
+    return FOLLOW_UP_SYSTEM_PROMPT_INSTRUCTIONS + FOLLOW_UP_RESPONSE_FORMAT
+
+@lru_cache(maxsize=1)
+def build_follow_up_compact_system_prompt():
+    return FOLLOW_UP_SYSTEM_PROMPT_INSTRUCTIONS + FOLLOW_UP_COMPACT_RESPONSE_FORMAT
+
+# --- Helper: Build Follow-up Email Prompt (Python version) ---
+# Returns only the dynamic user message; the requirements and schema live in build_follow_up_system_prompt().
+FOLLOW_UP_PROMPT_TEMPLATE = string.Template("""CREATOR: ${creatorName} (${creatorPlatform})
+BRAND: ${brandName}
+
+FOLLOW-UP CONTEXT:
+- Days Since Last Contact: ${daysSinceLastContact}
+- Previous Email Type: ${previousEmailType}
+- Current Follow-up Strategy: ${strategy}
+- Recommended Tone: ${tone}
+- Key Focus for this email: ${focus}
+${contextSection}
+SPECIFIC GUIDELINES FOR THIS FOLLOW-UP:
+${guidelines}""")
+FOLLOW_UP_CONTEXT_SECTION = string.Template("\nRECENT CONVERSATION SNIPPET:\n${conversationContext}\n")
+
+def build_follow_up_email_prompt_py(creator_data, brand_info_data, days_since_last_contact, previous_email_type, conversation_context_str=None):
+    follow_up_strategy_info = determine_follow_up_strategy_py(days_since_last_contact, previous_email_type)
+
+    context_prompt_section = ""
+    if conversation_context_str and conversation_context_str.strip():
+        context_prompt_section = FOLLOW_UP_CONTEXT_SECTION.substitute(conversationContext=conversation_context_str)
+
+    return FOLLOW_UP_PROMPT_TEMPLATE.substitute(
+        creatorName=creator_data.get('name', '[Creator Name]'),
+        creatorPlatform=creator_data.get('platform', ''),
+        brandName=brand_info_data.get('name', '[Brand Name]'),
+        daysSinceLastContact=days_since_last_contact,
+        previousEmailType=previous_email_type,
+        strategy=follow_up_strategy_info['strategy'],
+        tone=follow_up_strategy_info['tone'],
+        focus=follow_up_strategy_info['focus'],
+        contextSection=context_prompt_section,
+        guidelines=get_follow_up_guidelines_py(days_since_last_contact, previous_email_type)
+    )
 
 # --- Helper: Generate Fallback Follow-up (Python version) ---
-def generate_fallback_follow_up_py(creator_data, brand_info_data, days_since_last_contact):
-    creator_name = creator_data.get('name', 'Creator')
-    brand_name = brand_info_data.get('name', 'Our Brand')
-    subject = f"Following Up: {brand_name} & {creator_name} Collaboration"
-    body = f"""Hi {creator_name},
+FOLLOW_UP_FALLBACK_SUBJECT = string.Template("Following Up: ${brandName} & ${creatorName} Collaboration")
+FOLLOW_UP_FALLBACK_MESSAGE = string.Template("""Hi ${creatorName},
 
-Just wanted to gently touch base regarding our previous message about a potential collaboration with {brand_name}. 
-It has been {days_since_last_contact} days, and we wanted to see if you had any thoughts or questions.
+Just wanted to gently touch base regarding our previous message about a potential collaboration with ${brandName}. 
+It has been ${daysSinceLastContact} days, and we wanted to see if you had any thoughts or questions.
 
 We understand you're busy, so no pressure at all. If you're interested, we'd love to hear from you. If not, we appreciate your time and wish you the best!
 
 Sincerely,
-The {brand_name} Team"""
+The ${brandName} Team""")
+
+FOLLOW_UP_FALLBACK_STATIC_FIELDS = { # Same for every fallback; tuples so no response can mutate them
+    "reasoning": "Standard algorithmic fallback follow-up message.",
+    "keyPoints": ("Gentle reminder", "Respectful tone"),
+    "nextSteps": ("Monitor for any response",),
+    "confidence": 0.45
+}
+
+def generate_fallback_follow_up_py(creator_data, brand_info_data, days_since_last_contact):
+    template_fields = {
+        'creatorName': creator_data.get('name', 'Creator'),
+        'brandName': brand_info_data.get('name', 'Our Brand'),
+        'daysSinceLastContact': days_since_last_contact
+    }
     return {
-        "subject": subject,
-        "message": body,
-        "reasoning": "Standard algorithmic fallback follow-up message.",
-        "keyPoints": ["Gentle reminder", "Respectful tone"],
-        "nextSteps": ["Monitor for any response"],
-        "confidence": 0.45
+        "subject": FOLLOW_UP_FALLBACK_SUBJECT.substitute(template_fields),
+        "message": FOLLOW_UP_FALLBACK_MESSAGE.substitute(template_fields),
+        **FOLLOW_UP_FALLBACK_STATIC_FIELDS
     }
 
+FOLLOW_UP_GROQ_MAX_TOKENS = 800
+FOLLOW_UP_GROQ_PAYLOAD_PREFIX = build_groq_payload_prefix(
+    model=GROQ_LARGE_MODEL,
+    temperature=0.3,
+    max_tokens=FOLLOW_UP_GROQ_MAX_TOKENS,
+    response_format={"type": "json_object"}
+)
+FOLLOW_UP_COMPACT_GROQ_MAX_TOKENS = 400
+FOLLOW_UP_COMPACT_GROQ_PROFILE = GroqEndpointProfile(
+    build_groq_payload_prefix(
+        model=GROQ_LARGE_MODEL,
+        temperature=0.3,
+        max_tokens=FOLLOW_UP_COMPACT_GROQ_MAX_TOKENS,
+        response_format={"type": "json_object"}
+    ),
+    FOLLOW_UP_COMPACT_GROQ_MAX_TOKENS,
+    build_follow_up_compact_system_prompt
+)
+FOLLOW_UP_GROQ_PROFILE = GroqEndpointProfile(FOLLOW_UP_GROQ_PAYLOAD_PREFIX, FOLLOW_UP_GROQ_MAX_TOKENS, build_follow_up_system_prompt)
+
+def follow_up_groq_profile(request_data):
+    """Clients that only render subject/message can send "verbose": false for the compact schema and a smaller completion."""
+    return FOLLOW_UP_GROQ_PROFILE if request_data.get('verbose', True) else FOLLOW_UP_COMPACT_GROQ_PROFILE
+
+FOLLOW_UP_REQUIRED_REQUEST_KEYS = frozenset(('creator', 'brandInfo', 'daysSinceLastContact', 'previousEmailType'))
+FOLLOW_UP_MISSING_KEYS_ERROR = "Missing one or more required keys: creator, brandInfo, daysSinceLastContact, previousEmailType."
+
+# Expected types of the optional follow-up fields; a field of the wrong type is dropped rather than failing the reply
+FOLLOW_UP_OPTIONAL_FIELD_TYPES = {"reasoning": str, "keyPoints": list, "nextSteps": list, "confidence": (int, float)}
+
+def build_follow_up_cache_key(creator_data, brand_info_data, days_since_last_contact, previous_email_type, conversation_context, compact=False):
+    return build_llm_cache_key("follow-up", {"model": GROQ_LARGE_MODEL, "creator": creator_data, "brand": brand_info_data, "days": days_since_last_contact, "previousEmailType": previous_email_type, "context": conversation_context, "compact": compact})
+
+def validate_follow_up(content):
+    if not isinstance(content, dict):
+        raise ValueError(f"Parsed JSON is not a dictionary. Type: {type(content)}")
+    # Adapt the 'body' field from AI to 'message' for consistent response structure with other endpoints
+    if "body" in content and "message" not in content:
+        content["message"] = content.pop("body")
+    # Basic validation for expected keys after adaptation
+    if not OUTREACH_MESSAGE_REQUIRED_KEYS.issubset(content):
+        raise ValueError("AI follow-up response JSON missing required keys (subject, message) after adaptation")
+    if not isinstance(content["subject"], str) or not isinstance(content["message"], str) or not content["message"].strip():
+        raise ValueError("'subject' or 'message' is not a non-empty string.")
+    for field_name, expected_type in FOLLOW_UP_OPTIONAL_FIELD_TYPES.items():
+        if field_name in content and (not isinstance(content[field_name], expected_type) or isinstance(content[field_name], bool)):
+            content.pop(field_name)
+    return content
+
 @app.route('/api/outreach/follow-up-message', methods=['POST'])
 @token_required
-def handle_generate_follow_up_message():
-    data = request.json
-    required_keys = ['creator', 'brandInfo', 'daysSinceLastContact', 'previousEmailType']
-    if not data or not all(k in data for k in required_keys):
-        return jsonify({"success": False, "error": f"Missing one or more required keys: {', '.join(required_keys)}."}), 400
+@groq_call("Follow-up (Backend)", FOLLOW_UP_GROQ_PAYLOAD_PREFIX, FOLLOW_UP_GROQ_MAX_TOKENS, build_follow_up_system_prompt)
+def handle_generate_follow_up_message(data):
+    if not data or not FOLLOW_UP_REQUIRED_REQUEST_KEYS.issubset(data):
+        return jsonify({"success": False, "error": FOLLOW_UP_MISSING_KEYS_ERROR}), 400
 
     creator_data = data['creator']
     brand_info_data = data['brandInfo']
@@ -2218,66 +3375,61 @@ def handle_generate_follow_up_message():
     conversation_context = data.get('conversationContext') # Optional
 
     if not groq_api_key:
-        print("🤖 Follow-up (Backend): Groq API key missing. Using template fallback.")
+        LOGGER.info("🤖 Follow-up (Backend): Groq API key missing. Using template fallback.")
         fallback_content = generate_fallback_follow_up_py(creator_data, brand_info_data, days_since_last_contact)
         return jsonify({"success": True, **fallback_content, "method": "algorithmic_fallback"})
 
-    prompt = build_follow_up_email_prompt_py(creator_data, brand_info_data, days_since_last_contact, previous_email_type, conversation_context)
-    try:
-        print(f"🤖 Follow-up (Backend): Calling Groq for {creator_data.get('name', 'N/A')} (Follow-up)")
-        headers = {"Authorization": f"Bearer {groq_api_key}", "Content-Type": "application/json"}
-        payload = {"model": "llama3-70b-8192", "messages": [{"role": "user", "content": prompt}], "temperature": 0.3, "max_tokens": 800}
-        
-        response = requests.post("https://api.groq.com/openai/v1/chat/completions", headers=headers, json=payload)
-        response.raise_for_status()
-        
-        ai_response_data = response.json()
-        ai_message_content = ai_response_data['choices'][0]['message']['content']
-        
-        try:
-            json_str = ai_message_content # Default to the full content
-            # Attempt to strip markdown fences if present
-            if ai_message_content.strip().startswith("```json"):
-                # Find the start of the actual JSON after the ```json
-                json_block_start = ai_message_content.find('{')
-                # Find the end of the JSON before the closing ```
-                json_block_end = ai_message_content.rfind('}')
-                if json_block_start != -1 and json_block_end != -1 and json_block_start < json_block_end:
-                    json_str = ai_message_content[json_block_start : json_block_end + 1]
-            elif ai_message_content.strip().startswith("{") and ai_message_content.strip().endswith("}"):
-                json_str = ai_message_content.strip() # It's already a JSON string (hopefully)
-            else: # If no clear JSON structure, try finding the first { and last }
-                json_start_index = ai_message_content.find('{')
-                json_end_index = ai_message_content.rfind('}')
-                if json_start_index != -1 and json_end_index != -1 and json_start_index < json_end_index:
-                    json_str = ai_message_content[json_start_index : json_end_index + 1]
-                else:
-                    raise ValueError("Could not find any JSON-like block in AI response.")
+    profile = follow_up_groq_profile(data)
+    return GroqEndpointPlan(
+        prompt=partial(build_follow_up_email_prompt_py, creator_data, brand_info_data, days_since_last_contact, previous_email_type, conversation_context),
+        cache_key=build_follow_up_cache_key(creator_data, brand_info_data, days_since_last_contact, previous_email_type, conversation_context, compact=profile is FOLLOW_UP_COMPACT_GROQ_PROFILE),
+        validate=validate_follow_up,
+        success_body=lambda content: {"success": True, **content, "method": "ai_generated"},
+        fallback_body=lambda error_message: {"success": True, **generate_fallback_follow_up_py(creator_data, brand_info_data, days_since_last_contact), "method": "algorithmic_fallback", "error": error_message},
+        profile=profile
+    )
 
-            content = json.loads(json_str) 
-            
-            # Adapt the 'body' field from AI to 'message' for consistent response structure with other endpoints
-            if "body" in content and "message" not in content:
-                content["message"] = content.pop("body")
+FOLLOW_UP_BATCH_MAX_CONCURRENCY = 16 # Concurrent Groq calls per batch request
+FOLLOW_UP_BATCH_MAX_ITEMS = 100 # Bounds the work per request (GROQ_BATCH_MAX_WAIT_SECONDS bounds the wait); split larger batches across requests
 
-            # Basic validation for expected keys after adaptation
-            if not all(k in content for k in ["subject", "message"]):
-                raise ValueError("AI follow-up response JSON missing required keys (subject, message) after adaptation")
-            
-            return jsonify({"success": True, **content, "method": "ai_generated"})
-        except (json.JSONDecodeError, ValueError) as e:
-            print(f"Error parsing AI follow-up JSON: {e}. Raw: {ai_message_content}")
-            fallback_content = generate_fallback_follow_up_py(creator_data, brand_info_data, days_since_last_contact)
-            return jsonify({"success": True, **fallback_content, "method": "algorithmic_fallback", "error": "AI response parsing failed, using fallback."})
-
-    except requests.exceptions.RequestException as e:
-        print(f"Groq API request failed for follow-up: {e}")
-        fallback_content = generate_fallback_follow_up_py(creator_data, brand_info_data, days_since_last_contact)
-        return jsonify({"success": True, **fallback_content, "method": "algorithmic_fallback", "error": str(e)})
-    except Exception as e:
-        print(f"Unexpected error during AI follow-up generation: {e}")
-        fallback_content = generate_fallback_follow_up_py(creator_data, brand_info_data, days_since_last_contact)
-        return jsonify({"success": True, **fallback_content, "method": "algorithmic_fallback", "error": "Unexpected backend error."})
+@app.route('/api/outreach/follow-up-message/batch', methods=['POST'])
+@token_required
+def handle_generate_follow_up_message_batch():
+    """
+    Generates follow-ups for many creators in a single request.
+    Body: {"items": [{"creator", "brandInfo", "daysSinceLastContact", "previousEmailType", "conversationContext"?}, ...], "verbose"?}.
+    Returns {"success": True, "messages": [...]} in input order; each item has the same shape as /api/outreach/follow-up-message.
+    Groq calls are fanned out concurrently; each item falls back to the template independently.
+    """
+    data = request.json
+    if not data or not isinstance(data.get('items'), list):
+        return jsonify({"success": False, "error": "Missing items list in request body."}), 400
+    items = data['items']
+    if len(items) > FOLLOW_UP_BATCH_MAX_ITEMS:
+        return jsonify({"success": False, "error": f"Too many items ({len(items)}); at most {FOLLOW_UP_BATCH_MAX_ITEMS} per request."}), 400
+    profile = follow_up_groq_profile(data) # One schema for the whole batch
+
+    def follow_up_plan(item):
+        if not isinstance(item, dict) or not FOLLOW_UP_REQUIRED_REQUEST_KEYS.issubset(item):
+            return {"success": False, "error": FOLLOW_UP_MISSING_KEYS_ERROR}
+        follow_up_args = (item['creator'], item['brandInfo'], item['daysSinceLastContact'], item['previousEmailType'], item.get('conversationContext'))
+        def fallback_result(error_message=None):
+            result = {"success": True, **generate_fallback_follow_up_py(item['creator'], item['brandInfo'], item['daysSinceLastContact']), "method": "algorithmic_fallback"}
+            if error_message:
+                result["error"] = error_message
+            return result
+        if not groq_api_key:
+            return fallback_result()
+        return GroqEndpointPlan(
+            prompt=partial(build_follow_up_email_prompt_py, *follow_up_args),
+            cache_key=build_follow_up_cache_key(*follow_up_args, compact=profile is FOLLOW_UP_COMPACT_GROQ_PROFILE),
+            validate=validate_follow_up,
+            success_body=lambda content: {"success": True, **content, "method": "ai_generated"},
+            fallback_body=fallback_result
+        )
+
+    results = run_groq_batch("Follow-up (Backend)", [follow_up_plan(item) for item in items], profile, FOLLOW_UP_BATCH_MAX_CONCURRENCY)
+    return jsonify({"success": True, "messages": results})
 
 # --- Helper: Generate Audio with ElevenLabs ---
 def generate_audio_with_elevenlabs(text_to_speak, call_sid_for_filename="unknown_call"):
@@ -2286,12 +3438,12 @@ def generate_audio_with_elevenlabs(text_to_speak, call_sid_for_filename="unknown
     Returns a tuple: (public_audio_url, local_temp_file_path) or (None, None) on failure.
     """
     if not elevenlabs_client:
-        print("🔊 ElevenLabs client not available. Cannot generate custom TTS.")
+        LOGGER.info("🔊 ElevenLabs client not available. Cannot generate custom TTS.")
         return None, None
 
     temp_file_path = None # Initialize to ensure it has a value in case of early exit
     try:
-        print(f"🔊 ElevenLabs: Attempting TTS for: {text_to_speak[:50]}...")
+        LOGGER.info("🔊 ElevenLabs: Attempting TTS for: %s...", text_to_speak[:50])
         start_time_tts_api = datetime.now() # Timing start for API call
         
         audio_stream = elevenlabs_client.text_to_speech.stream(
@@ -2304,7 +3456,7 @@ def generate_audio_with_elevenlabs(text_to_speak, call_sid_for_filename="unknown
         filename = f"{call_sid_for_filename}_{uuid.uuid4()}.mp3"
         temp_file_path = os.path.join(TEMP_AUDIO_DIR, filename)
         
-        print(f"👂 ElevenLabs: Stream object created. Attempting to save to {temp_file_path}...")
+        LOGGER.info("👂 ElevenLabs: Stream object created. Attempting to save to %s...", temp_file_path)
         bytes_written = 0
         start_time_save_file = datetime.now() # Timing start for file save
         with open(temp_file_path, "wb") as f:
@@ -2315,39 +3467,39 @@ def generate_audio_with_elevenlabs(text_to_speak, call_sid_for_filename="unknown
         
         end_time_save_file = datetime.now() # Timing end for file save
         time_taken_save_file = (end_time_save_file - start_time_save_file).total_seconds()
-        print(f"👂 ElevenLabs: Finished writing to stream. Total bytes attempted: {bytes_written}. File save took: {time_taken_save_file:.2f}s.")
+        LOGGER.info("👂 ElevenLabs: Finished writing to stream. Total bytes attempted: %s. File save took: %.2fs.", bytes_written, time_taken_save_file)
             
         end_time_tts_api = datetime.now() # Timing end for API call + stream handling
         time_taken_tts_api = (end_time_tts_api - start_time_tts_api).total_seconds()
-        print(f"⏱️ ElevenLabs TTS API call & stream handling took: {time_taken_tts_api:.2f}s (includes file write).")
+        LOGGER.info("⏱️ ElevenLabs TTS API call & stream handling took: %.2fs (includes file write).", time_taken_tts_api)
 
         if not os.path.exists(temp_file_path) or os.path.getsize(temp_file_path) == 0:
-            print(f"⚠️ ElevenLabs TTS Error: File not created or is empty at {temp_file_path} after generation attempt. Bytes written: {bytes_written}.")
+            LOGGER.warning("⚠️ ElevenLabs TTS Error: File not created or is empty at %s after generation attempt. Bytes written: %s.", temp_file_path, bytes_written)
             if os.path.exists(temp_file_path): # If it exists but is empty
                 try:
                     os.remove(temp_file_path)
-                    print(f"🗑️ Cleaned up empty file: {temp_file_path}")
+                    LOGGER.info("🗑️ Cleaned up empty file: %s", temp_file_path)
                 except OSError as e:
-                    print(f"🔥 Error deleting empty file {temp_file_path}: {e}")
+                    LOGGER.error("🔥 Error deleting empty file %s: %s", temp_file_path, e)
             return None, None # Explicitly return None if file is problematic
 
-        print(f"✅ ElevenLabs: File successfully saved. Path: {temp_file_path}, Size: {os.path.getsize(temp_file_path)} bytes.")
+        LOGGER.info("✅ ElevenLabs: File successfully saved. Path: %s, Size: %s bytes.", temp_file_path, os.path.getsize(temp_file_path))
         base_url = os.getenv("BACKEND_PUBLIC_URL", f"http://localhost:{os.getenv('PORT', 5001)}").rstrip('/')
         public_audio_url = f"{base_url}/temp_audio/{filename}"
-        print(f"🎧 ElevenLabs audio accessible at: {public_audio_url}")
+        LOGGER.info("🎧 ElevenLabs audio accessible at: %s", public_audio_url)
         return public_audio_url, temp_file_path
 
     except Exception as e:
-        print(f"❌ ElevenLabs TTS generation failed: {type(e).__name__} - {e}.")
+        LOGGER.error("❌ ElevenLabs TTS generation failed: %s - %s.", type(e).__name__, e)
         if hasattr(e, 'body') and e.body:
-             print(f"   ElevenLabs API Error Body: {e.body}")
+             LOGGER.error("   ElevenLabs API Error Body: %s", e.body)
         # Cleanup partially created file if an error occurred during stream or save
         if temp_file_path and os.path.exists(temp_file_path):
             try:
                 os.remove(temp_file_path)
-                print(f"🗑️ Cleaned up partial file due to error: {temp_file_path}")
+                LOGGER.info("🗑️ Cleaned up partial file due to error: %s", temp_file_path)
             except OSError as ose:
-                print(f"🔥 Error deleting partial file {temp_file_path}: {ose}")
+                LOGGER.error("🔥 Error deleting partial file %s: %s", temp_file_path, ose)
         return None, None
 
 # --- JWT Authentication Decorator ---
@@ -2387,7 +3539,7 @@ def make_outbound_call():
 
     if elevenlabs_client and elevenlabs_api_key and initial_greeting_message:
         try:
-            print(f"🔊 ElevenLabs: Attempting TTS for: {initial_greeting_message[:50]}...")
+            LOGGER.info("🔊 ElevenLabs: Attempting TTS for: %s...", initial_greeting_message[:50])
             unique_filename_stem = f"initial_{outreach_id.replace('-', '')}_{str(uuid.uuid4())}"
             returned_public_url, returned_local_path = generate_audio_with_elevenlabs(
                 initial_greeting_message, 
@@ -2395,12 +3547,12 @@ def make_outbound_call():
             )
             if returned_public_url:
                 elevenlabs_audio_public_url = returned_public_url
-                print(f"🎧 ElevenLabs audio accessible at: {elevenlabs_audio_public_url}")
+                LOGGER.info("🎧 ElevenLabs audio accessible at: %s", elevenlabs_audio_public_url)
             else:
-                print("⚠️ ElevenLabs: TTS generation or saving failed, will fall back to Twilio basic TTS.")
+                LOGGER.warning("⚠️ ElevenLabs: TTS generation or saving failed, will fall back to Twilio basic TTS.")
                 elevenlabs_audio_public_url = None
         except Exception as e:
-            print(f"❌ ElevenLabs TTS Error: {e}. Falling back to Twilio basic TTS.")
+            LOGGER.error("❌ ElevenLabs TTS Error: %s. Falling back to Twilio basic TTS.", e)
             elevenlabs_audio_public_url = None
 
     try:
@@ -2462,22 +3614,22 @@ def make_outbound_call():
                 "metadata": call_metadata # Use the populated metadata
             }
             try:
-                print(f"✍️ Attempting to insert into active_call_sessions for CallSid {call.sid}: {session_data}")
+                LOGGER.info("✍️ Attempting to insert into active_call_sessions for CallSid %s: %s", call.sid, session_data)
                 insert_response = supabase_admin_client.table("active_call_sessions").insert(session_data).execute()
                 if insert_response.data:
-                    print(f"✅ Call session for SID {call.sid} successfully created in Supabase.")
+                    LOGGER.info("✅ Call session for SID %s successfully created in Supabase.", call.sid)
                 else: # Changed from if not insert_response.get('data') to check error
                     # Supabase python client v2 uses model_pydantic. Vielleicht APIError.
                     # For now, let's assume if data is not present, it might indicate an error or empty response.
                     error_info = "Unknown error"
                     if hasattr(insert_response, 'error') and insert_response.error:
                         error_info = str(insert_response.error.message if hasattr(insert_response.error, 'message') else insert_response.error)
-                    print(f"⚠️ Call session for SID {call.sid} - Supabase insert might have failed or returned no data. Error: {error_info}. Response: {insert_response}")
+                    LOGGER.warning("⚠️ Call session for SID %s - Supabase insert might have failed or returned no data. Error: %s. Response: %s", call.sid, error_info, insert_response)
 
             except APIError as e_db_insert:
-                print(f"❌ Supabase DB Error inserting call session for SID {call.sid}: {e_db_insert.message}. Details: {e_db_insert.details}")
+                LOGGER.error("❌ Supabase DB Error inserting call session for SID %s: %s. Details: %s", call.sid, e_db_insert.message, e_db_insert.details)
             except Exception as e_db_general:
-                print(f"❌ General DB Error inserting call session for SID {call.sid}: {str(e_db_general)}")
+                LOGGER.error("❌ General DB Error inserting call session for SID %s: %s", call.sid, str(e_db_general))
 
             add_supabase_conversation_message(
                 outreach_id=outreach_id,
@@ -2492,17 +3644,15 @@ def make_outbound_call():
             if not call.sid: warning_msg += "CallSid missing. "
             if not outreach_id: warning_msg += "OutreachID missing. "
             if not supabase_admin_client: warning_msg += "Supabase admin client not available. "
-            print(warning_msg + f"(CallSid: {call.sid}, OutreachID: {outreach_id})")
+            LOGGER.warning("%s", warning_msg + f"(CallSid: {call.sid}, OutreachID: {outreach_id})")
 
 
-        print(f"📞 Call initiated with SID: {call.sid} to {to_phone_number}. Associated Supabase Outreach ID: {outreach_id}")
+        LOGGER.info("📞 Call initiated with SID: %s to %s. Associated Supabase Outreach ID: %s", call.sid, to_phone_number, outreach_id)
         return jsonify({"success": True, "call_sid": call.sid, "outreach_id": outreach_id, "status": "initiated", "message": "Call initiated successfully."})
 
     except Exception as e:
         error_message = f"Error making outbound call: {str(e)}"
-        print(f"❌ {error_message}")
-        import traceback
-        traceback.print_exc()
+        LOGGER.exception("❌ %s", error_message)
         return jsonify({"success": False, "error": error_message}), 500
 
 @app.route("/api/voice/recording-status", methods=['POST'])
@@ -2513,7 +3663,7 @@ def handle_recording_status():
         recording_sid_for_log = request.form.get('RecordingSid', 'N/A_RecSid')
         recording_url_twilio_for_log = request.form.get('RecordingUrl')
         recording_status_for_log = request.form.get('RecordingStatus', 'N/A_RecStatus') # Twilio might send RecordingStatus
-        print(f"🎉 SPECIFIC LOG: handle_recording_status called with source=record_verb. CallSid: {call_sid_for_log}, RecordingSid: {recording_sid_for_log}, URL Present: {recording_url_twilio_for_log is not None}, RecordingStatus: {recording_status_for_log}")
+        LOGGER.info("🎉 SPECIFIC LOG: handle_recording_status called with source=record_verb. CallSid: %s, RecordingSid: %s, URL Present: %s, RecordingStatus: %s", call_sid_for_log, recording_sid_for_log, recording_url_twilio_for_log is not None, recording_status_for_log)
     # --- END SPECIFIC LOGGING ---
 
     # Log all incoming data for debugging
@@ -2531,9 +3681,9 @@ def handle_recording_status():
             f"Request Form Data: {{{form_data_str}}}\n"
             f"----------------------------------------------"
         )
-        print(log_message)
+        LOGGER.info("%s", log_message)
     except Exception as e:
-        print(f"Error logging request details in handle_recording_status: {e}")
+        LOGGER.error("Error logging request details in handle_recording_status: %s", e)
 
     # --- Crucial: Retrieve Supabase outreach_id from query parameters ---
     outreach_id_from_query = request.args.get('outreach_id')
@@ -2546,12 +3696,12 @@ def handle_recording_status():
     actual_call_status = request.form.get('CallStatus')
 
     if not call_sid:
-        print(f"🔴 CRITICAL ERROR: 'CallSid' MISSING from form data in /api/voice/recording-status. Callback source: {callback_source}. Cannot process this recording status update.")
+        LOGGER.error("🔴 CRITICAL ERROR: 'CallSid' MISSING from form data in /api/voice/recording-status. Callback source: %s. Cannot process this recording status update.", callback_source)
         return jsonify({"success": False, "error": "Critical: CallSid missing from request form data."}), 400
 
     if not outreach_id_from_query:
         # Attempt to fetch outreach_id from active_call_sessions if missing from query, using call_sid
-        print(f"⚠️ 'outreach_id' MISSING from query parameters in /api/voice/recording-status. Callback source: {callback_source}, CallSid: {call_sid}. Attempting to find it via CallSid in DB.")
+        LOGGER.warning("⚠️ 'outreach_id' MISSING from query parameters in /api/voice/recording-status. Callback source: %s, CallSid: %s. Attempting to find it via CallSid in DB.", callback_source, call_sid)
         temp_call_session = None
         if supabase_admin_client:
             try:
@@ -2560,19 +3710,19 @@ def handle_recording_status():
                 if temp_fetch_response.data:
                     outreach_id_from_query = temp_fetch_response.data.get('outreach_id')
                     if outreach_id_from_query:
-                        print(f"✅ Found outreach_id '{outreach_id_from_query}' for CallSid {call_sid} from DB.")
+                        LOGGER.info("✅ Found outreach_id '%s' for CallSid %s from DB.", outreach_id_from_query, call_sid)
                     else:
-                        print(f"❌ CallSid {call_sid} found in DB, but no outreach_id associated. Cannot proceed.")
+                        LOGGER.error("❌ CallSid %s found in DB, but no outreach_id associated. Cannot proceed.", call_sid)
                 else:
-                    print(f"❌ CallSid {call_sid} not found in active_call_sessions. Cannot determine outreach_id.")
+                    LOGGER.error("❌ CallSid %s not found in active_call_sessions. Cannot determine outreach_id.", call_sid)
             except Exception as e_fetch_oid:
-                print(f"❌ Error fetching outreach_id for CallSid {call_sid} from DB: {e_fetch_oid}")
+                LOGGER.error("❌ Error fetching outreach_id for CallSid %s from DB: %s", call_sid, e_fetch_oid)
         
         if not outreach_id_from_query:
-            print(f"🔴 CRITICAL ERROR: Could not determine 'outreach_id' for CallSid {call_sid} (query & DB). Callback source: {callback_source}. Cannot reliably process this recording status update.")
+            LOGGER.error("🔴 CRITICAL ERROR: Could not determine 'outreach_id' for CallSid %s (query & DB). Callback source: %s. Cannot reliably process this recording status update.", call_sid, callback_source)
             return jsonify({"success": False, "error": "Critical: outreach_id missing and could not be determined."}), 400
 
-    print(f"🎙️ REC STATUS PARSED: Supabase Outreach ID: {outreach_id_from_query}, CallSid: {call_sid}, RecSid: {recording_sid}, ActualCallStatus: '{actual_call_status}', RecURL Present: {recording_url_twilio is not None}, Source: {callback_source}")
+    LOGGER.info("🎙️ REC STATUS PARSED: Supabase Outreach ID: %s, CallSid: %s, RecSid: %s, ActualCallStatus: '%s', RecURL Present: %s, Source: %s", outreach_id_from_query, call_sid, recording_sid, actual_call_status, recording_url_twilio is not None, callback_source)
 
     call_session_data = None
     recording_processed_successfully = False
@@ -2584,15 +3734,15 @@ def handle_recording_status():
                 if isinstance(call_session_data.get('metadata'), dict):
                     recording_processed_successfully = call_session_data['metadata'].get("twilio_recording_processed_successfully", False)
             else:
-                print(f"⚠️ No active_call_session found for CallSid {call_sid} when trying to process recording. OutreachID was {outreach_id_from_query}")
+                LOGGER.warning("⚠️ No active_call_session found for CallSid %s when trying to process recording. OutreachID was %s", call_sid, outreach_id_from_query)
         except Exception as e_fetch_session:
-            print(f"❌ Error fetching active_call_session for CallSid {call_sid}: {e_fetch_session}")
+            LOGGER.error("❌ Error fetching active_call_session for CallSid %s: %s", call_sid, e_fetch_session)
             # Proceed cautiously, or return error, depending on desired robustness
 
     if recording_processed_successfully:
-        print(f"☑️ Recording for CallSid {call_sid} (Outreach: {outreach_id_from_query}) already marked as processed. Skipping in handle_recording_status (Source: {callback_source}).")
+        LOGGER.info("☑️ Recording for CallSid %s (Outreach: %s) already marked as processed. Skipping in handle_recording_status (Source: %s).", call_sid, outreach_id_from_query, callback_source)
     elif actual_call_status == 'completed' and recording_sid and recording_url_twilio:
-        print(f"✅ Call {call_sid} (Supabase Outreach: {outreach_id_from_query}) reported completed with recording details by Twilio webhook (Source: {callback_source}). Handing off to _process_and_store_twilio_recording.")
+        LOGGER.info("✅ Call %s (Supabase Outreach: %s) reported completed with recording details by Twilio webhook (Source: %s). Handing off to _process_and_store_twilio_recording.", call_sid, outreach_id_from_query, callback_source)
         # _process_and_store_twilio_recording will need to update the active_call_sessions record upon success
         _process_and_store_twilio_recording(
             call_sid=call_sid,
@@ -2602,11 +3752,11 @@ def handle_recording_status():
             recording_duration_str=recording_duration
         )
     elif actual_call_status != 'completed':
-        print(f"ℹ️ CallSid {call_sid} (Supabase Outreach: {outreach_id_from_query}): Call status '{actual_call_status}', not 'completed'. Recording not processed for Supabase upload yet.")
+        LOGGER.info("ℹ️ CallSid %s (Supabase Outreach: %s): Call status '%s', not 'completed'. Recording not processed for Supabase upload yet.", call_sid, outreach_id_from_query, actual_call_status)
     elif not (recording_sid and recording_url_twilio):
-        print(f"ℹ️ CallSid {call_sid} (Supabase Outreach: {outreach_id_from_query}): Call completed, but no RecordingSid/RecordingUrl. No recording to process for Supabase.")
+        LOGGER.info("ℹ️ CallSid %s (Supabase Outreach: %s): Call completed, but no RecordingSid/RecordingUrl. No recording to process for Supabase.", call_sid, outreach_id_from_query)
     else:
-        print(f"🤷 CallSid {call_sid} (Supabase Outreach: {outreach_id_from_query}): Conditions for Supabase upload not fully met. Status: '{actual_call_status}', RecSid: {recording_sid is not None}, RecUrl: {recording_url_twilio is not None}, Clients OK: {supabase_admin_client is not None and twilio_client is not None}")
+        LOGGER.info("🤷 CallSid %s (Supabase Outreach: %s): Conditions for Supabase upload not fully met. Status: '%s', RecSid: %s, RecUrl: %s, Clients OK: %s", call_sid, outreach_id_from_query, actual_call_status, recording_sid is not None, recording_url_twilio is not None, supabase_admin_client is not None and twilio_client is not None)
 
     # Update the active_call_sessions record with the latest call status from this callback
     if supabase_admin_client and call_sid: # Ensure client and call_sid are available
@@ -2617,7 +3767,7 @@ def handle_recording_status():
         if call_session_data and isinstance(call_session_data.get('metadata'), dict):
             current_metadata = call_session_data['metadata']
         elif call_session_data: # if metadata is not a dict, log warning but start fresh
-            print(f"⚠️ Metadata for CallSid {call_sid} was not a dict or was missing. Initializing fresh metadata for this update.")
+            LOGGER.warning("⚠️ Metadata for CallSid %s was not a dict or was missing. Initializing fresh metadata for this update.", call_sid)
         
         current_metadata['latest_twilio_call_status'] = actual_call_status # Use a distinct key
         current_metadata['last_twilio_callback_source'] = callback_source
@@ -2627,19 +3777,19 @@ def handle_recording_status():
         update_payload['status'] = actual_call_status # Also update the main status field if appropriate
 
         try:
-            print(f"💾 Attempting to update active_call_session for SID {call_sid} with recording callback info.")
+            LOGGER.info("💾 Attempting to update active_call_session for SID %s with recording callback info.", call_sid)
             update_response = supabase_admin_client.table("active_call_sessions").update(update_payload).eq("call_sid", call_sid).execute()
             if not (hasattr(update_response, 'data') and update_response.data):
                 if hasattr(update_response, 'error') and update_response.error:
-                    print(f"⚠️ Supabase DB Error updating call session (recording status) for SID {call_sid}: {update_response.error.message if hasattr(update_response.error, 'message') else update_response.error}")
+                    LOGGER.warning("⚠️ Supabase DB Error updating call session (recording status) for SID %s: %s", call_sid, update_response.error.message if hasattr(update_response.error, 'message') else update_response.error)
                 else:
-                    print(f"✅ Call session for SID {call_sid} (recording status) updated in Supabase (possibly minimal return).")
+                    LOGGER.info("✅ Call session for SID %s (recording status) updated in Supabase (possibly minimal return).", call_sid)
             else:
-                 print(f"✅ Call session for SID {call_sid} (recording status) updated successfully in Supabase.")
+                 LOGGER.info("✅ Call session for SID %s (recording status) updated successfully in Supabase.", call_sid)
         except Exception as e_update_rec_status:
-            print(f"❌ General DB Error updating call session (recording status) for SID {call_sid}: {str(e_update_rec_status)}")
+            LOGGER.error("❌ General DB Error updating call session (recording status) for SID %s: %s", call_sid, str(e_update_rec_status))
     else:
-        print(f"⚠️ Cannot update active_call_session for SID {call_sid}: Supabase client or CallSid missing for final update block.")
+        LOGGER.warning("⚠️ Cannot update active_call_session for SID %s: Supabase client or CallSid missing for final update block.", call_sid)
 
     return jsonify({"success": True, "message": "Recording status received."}), 200
 
@@ -2653,10 +3803,10 @@ def handle_transcription_status():
     transcription_url = request.form.get('TranscriptionUrl')
     
     log_display_id = outreach_id_from_query if outreach_id_from_query else call_sid
-    print(f"📝 TRANSCRIPT STATUS RECEIVED: LogDisplayID: {log_display_id}, CallSid: {call_sid}, TranSid: {transcription_sid}, Status: {transcription_status_from_twilio}")
+    LOGGER.info("📝 TRANSCRIPT STATUS RECEIVED: LogDisplayID: %s, CallSid: %s, TranSid: %s, Status: %s", log_display_id, call_sid, transcription_sid, transcription_status_from_twilio)
 
     if not call_sid or not supabase_admin_client:
-        print(f"🔴 CRITICAL: CallSid ('{call_sid}') missing or Supabase client not available. Cannot process transcript.")
+        LOGGER.error("🔴 CRITICAL: CallSid ('%s') missing or Supabase client not available. Cannot process transcript.", call_sid)
         return "", 200
 
     call_session_data = None
@@ -2674,28 +3824,29 @@ def handle_transcription_status():
             current_metadata = call_session_data.get('metadata') if isinstance(call_session_data.get('metadata'), dict) else {}
             current_conversation_history = call_session_data.get('conversation_history') if isinstance(call_session_data.get('conversation_history'), list) else []
             current_db_status = call_session_data.get('status')
-            print(f"✅ Fetched active_call_session for SID {call_sid} to process transcript. OutreachID: {final_outreach_id}")
+            LOGGER.info("✅ Fetched active_call_session for SID %s to process transcript. OutreachID: %s", call_sid, final_outreach_id)
         else:
-            print(f"⚠️ No active_call_session found for SID {call_sid}. Cannot associate transcript. OutreachID from query was: {outreach_id_from_query}")
+            LOGGER.warning("⚠️ No active_call_session found for SID %s. Cannot associate transcript. OutreachID from query was: %s", call_sid, outreach_id_from_query)
             return "", 200 # Acknowledge webhook, but can't process further
     except Exception as e_fetch:
-        print(f"❌ Error fetching active_call_session for SID {call_sid}: {e_fetch}. Cannot process transcript.")
+        LOGGER.error("❌ Error fetching active_call_session for SID %s: %s. Cannot process transcript.", call_sid, e_fetch)
         return "", 200
 
     if not final_outreach_id:
-        print(f"🔴 CRITICAL: No usable outreach_id for CallSid {call_sid} (query: {outreach_id_from_query}, DB: {call_session_data.get('outreach_id') if call_session_data else 'N/A'}). Cannot process transcript.")
+        LOGGER.error("🔴 CRITICAL: No usable outreach_id for CallSid %s (query: %s, DB: %s). Cannot process transcript.", call_sid, outreach_id_from_query, call_session_data.get('outreach_id') if call_session_data else 'N/A')
         return "", 200
 
     update_payload = {"updated_at": datetime.now(timezone.utc).isoformat()}
 
     if transcription_status_from_twilio == 'completed' and transcription_text:
-        print(f"🗣️ Transcript COMPLETED for OutreachID {final_outreach_id} (CallSid: {call_sid}):\n{transcription_text[:200]}...")
+        LOGGER.info("🗣️ Transcript COMPLETED for OutreachID %s (CallSid: %s):\n%s...", final_outreach_id, call_sid, transcription_text[:200])
         current_metadata['twilio_transcription_text'] = transcription_text
         current_metadata['twilio_transcription_sid'] = transcription_sid
         current_metadata['twilio_transcription_status'] = transcription_status_from_twilio
         current_metadata['twilio_transcription_url'] = transcription_url
         current_metadata['twilio_transcription_error_code'] = None # Clear previous errors
         current_metadata['twilio_transcription_error_message'] = None
+        push_transcript(final_outreach_id, transcription_text) # Feeds the call history section of the negotiation prompt
 
         # Optional: Append to conversation_history if desired.
         # This might be redundant if SpeechResult from handle_user_speech is considered the main history source.
@@ -2714,29 +3865,29 @@ def handle_transcription_status():
     elif transcription_status_from_twilio == 'failed':
         error_code = request.form.get('ErrorCode')
         error_message = request.form.get('ErrorMessage')
-        print(f"❌ Transcription FAILED for {final_outreach_id} (CallSid: {call_sid}). Error: {error_code} - {error_message}")
+        LOGGER.error("❌ Transcription FAILED for %s (CallSid: %s). Error: %s - %s", final_outreach_id, call_sid, error_code, error_message)
         current_metadata['twilio_transcription_status'] = transcription_status_from_twilio
         current_metadata['twilio_transcription_error_code'] = error_code
         current_metadata['twilio_transcription_error_message'] = error_message
         update_payload['status'] = f"{current_db_status or 'unknown'}_transcript_failed"
     else:
-        print(f"ℹ️ Transcription status for {final_outreach_id} (CallSid: {call_sid}) is '{transcription_status_from_twilio}'. Not processing as completed or failed.")
+        LOGGER.info("ℹ️ Transcription status for %s (CallSid: %s) is '%s'. Not processing as completed or failed.", final_outreach_id, call_sid, transcription_status_from_twilio)
         current_metadata['twilio_transcription_status'] = transcription_status_from_twilio # Log other statuses too
     
     update_payload['metadata'] = current_metadata
 
     try:
-        print(f"💾 Attempting to update active_call_session for SID {call_sid} with transcription info.")
+        LOGGER.info("💾 Attempting to update active_call_session for SID %s with transcription info.", call_sid)
         db_response = supabase_admin_client.table("active_call_sessions").update(update_payload).eq("call_sid", call_sid).execute()
         if not (hasattr(db_response, 'data') and db_response.data):
             if hasattr(db_response, 'error') and db_response.error:
-                 print(f"⚠️ Supabase DB Error updating call session (transcription) for SID {call_sid}: {db_response.error.message if hasattr(db_response.error, 'message') else db_response.error}")
+                 LOGGER.warning("⚠️ Supabase DB Error updating call session (transcription) for SID %s: %s", call_sid, db_response.error.message if hasattr(db_response.error, 'message') else db_response.error)
             else:
-                 print(f"✅ Call session for SID {call_sid} (transcription) updated in Supabase (possibly minimal return).")
+                 LOGGER.info("✅ Call session for SID %s (transcription) updated in Supabase (possibly minimal return).", call_sid)
         else:
-            print(f"✅ Call session for SID {call_sid} (transcription) updated successfully in Supabase.")
+            LOGGER.info("✅ Call session for SID %s (transcription) updated successfully in Supabase.", call_sid)
     except Exception as e_update_transcript:
-        print(f"❌ General DB Error updating call session (transcription) for SID {call_sid}: {str(e_update_transcript)}")
+        LOGGER.error("❌ General DB Error updating call session (transcription) for SID %s: %s", call_sid, str(e_update_transcript))
 
     return "", 200 # Twilio expects a 200 OK
 
@@ -2748,7 +3899,7 @@ def agent_turn_twiml():
     ai_audio_url = request.args.get('ai_audio_url')
     ai_message_text = request.args.get('ai_message_text') # Fallback if audio URL not present
 
-    print(f"📢 [AgentTurn] For OutreachID {outreach_id}. AudioURL: {ai_audio_url}, MessageText: {ai_message_text[:50] if ai_message_text else 'N/A'}")
+    LOGGER.info("📢 [AgentTurn] For OutreachID %s. AudioURL: %s, MessageText: %s", outreach_id, ai_audio_url, ai_message_text[:50] if ai_message_text else 'N/A')
 
     if ai_audio_url:
         response.play(ai_audio_url)
@@ -2775,6 +3926,8 @@ def agent_turn_twiml():
     
     return str(response), 200, {'Content-Type': 'text/xml'}
 
+LIVE_VOICE_GROQ_MODEL = groq_model_for("live_voice", GROQ_FAST_MODEL) # One short spoken turn; latency matters most here
+
 # --- NEW Endpoint to Handle User's Speech (from Gather) ---
 @app.route("/api/voice/handle_user_speech", methods=['POST'])
 def handle_user_speech():
@@ -2786,9 +3939,9 @@ def handle_user_speech():
         speech_confidence = float(speech_confidence_str)
     except ValueError:
         speech_confidence = 0.0
-        print(f"⚠️ Could not parse speech_confidence: '{speech_confidence_str}'. Defaulting to 0.0 for SID {call_sid}")
+        LOGGER.warning("⚠️ Could not parse speech_confidence: '%s'. Defaulting to 0.0 for SID %s", speech_confidence_str, call_sid)
 
-    print(f"🎤 User Speech on SID {call_sid}: '{user_speech_text}', Confidence: {speech_confidence}")
+    LOGGER.info("🎤 User Speech on SID %s: '%s', Confidence: %s", call_sid, user_speech_text, speech_confidence)
 
     backend_public_url = os.getenv("BACKEND_PUBLIC_URL", f"http://localhost:{os.getenv('PORT', 5001)}").rstrip('/')
     action_url_for_gather = f"{backend_public_url}/api/voice/handle_user_speech"
@@ -2796,36 +3949,36 @@ def handle_user_speech():
     call_session_data = None
     if call_sid and supabase_admin_client:
         try:
-            print(f"🔍 Fetching call session from Supabase for SID {call_sid}...")
+            LOGGER.info("🔍 Fetching call session from Supabase for SID %s...", call_sid)
             fetch_response = supabase_admin_client.table("active_call_sessions").select("*").eq("call_sid", call_sid).maybe_single().execute()
             if fetch_response.data:
                 call_session_data = fetch_response.data
-                print(f"✅ Fetched call session for SID {call_sid}: {call_session_data}")
+                LOGGER.info("✅ Fetched call session for SID %s: %s", call_sid, call_session_data)
             else:
-                print(f"⚠️ No call session found in Supabase for SID {call_sid}. Response: {fetch_response}")
+                LOGGER.warning("⚠️ No call session found in Supabase for SID %s. Response: %s", call_sid, fetch_response)
         except APIError as e_db_fetch:
-            print(f"❌ Supabase DB Error fetching call session for SID {call_sid}: {e_db_fetch.message}. Details: {e_db_fetch.details}")
+            LOGGER.error("❌ Supabase DB Error fetching call session for SID %s: %s. Details: %s", call_sid, e_db_fetch.message, e_db_fetch.details)
         except Exception as e_db_general_fetch:
-            print(f"❌ General DB Error fetching call session for SID {call_sid}: {str(e_db_general_fetch)}")
+            LOGGER.error("❌ General DB Error fetching call session for SID %s: %s", call_sid, str(e_db_general_fetch))
     else:
-        if not call_sid: print("❌ handle_user_speech: CallSid missing from request.")
-        if not supabase_admin_client: print("❌ handle_user_speech: Supabase admin client not available.")
+        if not call_sid: LOGGER.error("❌ handle_user_speech: CallSid missing from request.")
+        if not supabase_admin_client: LOGGER.error("❌ handle_user_speech: Supabase admin client not available.")
 
     if not call_session_data:
-        print(f"❌ handle_user_speech: No call_session_data found for SID {call_sid} from Supabase. Cannot continue conversation.")
+        LOGGER.error("❌ handle_user_speech: No call_session_data found for SID %s from Supabase. Cannot continue conversation.", call_sid)
         response = VoiceResponse()
         response.say("I'm sorry, there was an issue retrieving our conversation context. Please try calling back later.", voice='alice')
         response.hangup()
         # ... (timing and return as before)
         function_end_time = datetime.now()
         total_function_time = (function_end_time - request_received_time).total_seconds()
-        print(f"⏱️ Total time for handle_user_speech (no call_session_data path): {total_function_time:.2f}s")
+        LOGGER.info("⏱️ Total time for handle_user_speech (no call_session_data path): %.2fs", total_function_time)
         return str(response), 200, {'Content-Type': 'application/xml'}
 
     outreach_id_for_callbacks = call_session_data.get('outreach_id', 'unknown_outreach_id')
     current_conversation_history = call_session_data.get('conversation_history', [])
     if not isinstance(current_conversation_history, list):
-        print(f"⚠️ Conversation history for SID {call_sid} is not a list: {current_conversation_history}. Resetting to empty list.")
+        LOGGER.warning("⚠️ Conversation history for SID %s is not a list: %s. Resetting to empty list.", call_sid, current_conversation_history)
         current_conversation_history = []
 
     transcription_callback_url_with_oid = f"{backend_public_url}/api/voice/transcription-status?outreach_id={outreach_id_for_callbacks}"
@@ -2833,35 +3986,35 @@ def handle_user_speech():
     # Helper function to update call session in Supabase
     def update_call_session_in_db(updated_history, status_text=None):
         if not supabase_admin_client or not call_sid:
-            print("❌ Cannot update call session in DB: Supabase client or CallSid missing.")
+            LOGGER.error("❌ Cannot update call session in DB: Supabase client or CallSid missing.")
             return False
         update_payload = {"conversation_history": updated_history, "updated_at": datetime.now(timezone.utc).isoformat()}
         if status_text:
             update_payload["status"] = status_text
         try:
-            print(f"💾 Attempting to update call session for SID {call_sid} with status '{status_text}' and new history.")
+            LOGGER.info("💾 Attempting to update call session for SID %s with status '%s' and new history.", call_sid, status_text)
             update_response = supabase_admin_client.table("active_call_sessions").update(update_payload).eq("call_sid", call_sid).execute()
             if not (hasattr(update_response, 'data') and update_response.data): # Check if data is present and not empty
                  # Supabase v2 might return an empty list in data on successful update if return="minimal"
                  # A more robust check might involve seeing if an error is present.
                 if hasattr(update_response, 'error') and update_response.error:
-                    print(f"⚠️ Supabase DB Error updating call session for SID {call_sid}: {update_response.error.message if hasattr(update_response.error, 'message') else update_response.error}")
+                    LOGGER.warning("⚠️ Supabase DB Error updating call session for SID %s: %s", call_sid, update_response.error.message if hasattr(update_response.error, 'message') else update_response.error)
                     return False
                 else:
-                    print(f"✅ Call session for SID {call_sid} updated in Supabase (possibly minimal return).")
+                    LOGGER.info("✅ Call session for SID %s updated in Supabase (possibly minimal return).", call_sid)
                     return True # Assume success if no error
-            print(f"✅ Call session for SID {call_sid} updated successfully in Supabase.")
+            LOGGER.info("✅ Call session for SID %s updated successfully in Supabase.", call_sid)
             return True
         except APIError as e_db_update:
-            print(f"❌ Supabase DB Error updating call session for SID {call_sid}: {e_db_update.message}")
+            LOGGER.error("❌ Supabase DB Error updating call session for SID %s: %s", call_sid, e_db_update.message)
             return False
         except Exception as e_db_general_update:
-            print(f"❌ General DB Error updating call session for SID {call_sid}: {str(e_db_general_update)}")
+            LOGGER.error("❌ General DB Error updating call session for SID %s: %s", call_sid, str(e_db_general_update))
             return False
 
     # Handle low speech confidence
     if speech_confidence < 0.4:
-        print(f"👂 handle_user_speech: Low confidence ({speech_confidence}) for SID {call_sid}. Asking user to repeat.")
+        LOGGER.info("👂 handle_user_speech: Low confidence (%s) for SID %s. Asking user to repeat.", speech_confidence, call_sid)
         ai_response_text = "I'm sorry, I didn't catch that clearly. Could you please say that again?"
         current_conversation_history.append({"speaker": "ai", "text": ai_response_text, "timestamp": datetime.now(timezone.utc).isoformat()})
         update_call_session_in_db(current_conversation_history, status_text="waiting_for_user_speech_low_conf")
@@ -2873,7 +4026,7 @@ def handle_user_speech():
                 generated_url, _ = generate_audio_with_elevenlabs(ai_response_text, call_sid_for_filename=audio_filename_stem)
                 elevenlabs_audio_url = generated_url
             except Exception as e_elevenlabs:
-                print(f"❌ ElevenLabs TTS for low confidence repeat request failed: {e_elevenlabs}")
+                LOGGER.error("❌ ElevenLabs TTS for low confidence repeat request failed: %s", e_elevenlabs)
         response = VoiceResponse()
         if elevenlabs_audio_url:
             response.play(elevenlabs_audio_url)
@@ -2885,12 +4038,12 @@ def handle_user_speech():
         response.hangup()
         function_end_time = datetime.now()
         total_function_time = (function_end_time - request_received_time).total_seconds()
-        print(f"⏱️ Total time for handle_user_speech (low confidence path): {total_function_time:.2f}s")
+        LOGGER.info("⏱️ Total time for handle_user_speech (low confidence path): %.2fs", total_function_time)
         return str(response), 200, {'Content-Type': 'application/xml'}
 
     # Handle empty speech
     if not user_speech_text:
-        print(f"👂 handle_user_speech: User speech was empty for SID {call_sid}. Prompting to repeat.")
+        LOGGER.info("👂 handle_user_speech: User speech was empty for SID %s. Prompting to repeat.", call_sid)
         ai_response_text = "Sorry, I didn't hear anything. Could you please say that again?"
         current_conversation_history.append({"speaker": "ai", "text": ai_response_text, "timestamp": datetime.now(timezone.utc).isoformat()})
         update_call_session_in_db(current_conversation_history, status_text="waiting_for_user_speech_empty")
@@ -2902,7 +4055,7 @@ def handle_user_speech():
                 generated_url, _ = generate_audio_with_elevenlabs(ai_response_text, call_sid_for_filename=audio_filename_stem)
                 elevenlabs_audio_url = generated_url
             except Exception as e_elevenlabs:
-                print(f"❌ ElevenLabs TTS for empty speech repeat request failed: {e_elevenlabs}")
+                LOGGER.error("❌ ElevenLabs TTS for empty speech repeat request failed: %s", e_elevenlabs)
         response = VoiceResponse()
         if elevenlabs_audio_url:
             response.play(elevenlabs_audio_url)
@@ -2914,14 +4067,14 @@ def handle_user_speech():
         response.hangup()
         function_end_time = datetime.now()
         total_function_time = (function_end_time - request_received_time).total_seconds()
-        print(f"⏱️ Total time for handle_user_speech (empty speech path): {total_function_time:.2f}s")
+        LOGGER.info("⏱️ Total time for handle_user_speech (empty speech path): %.2fs", total_function_time)
         return str(response), 200, {'Content-Type': 'application/xml'}
 
     # If speech is valid, append to history
     current_conversation_history.append({"speaker": "user", "text": user_speech_text, "timestamp": datetime.now(timezone.utc).isoformat()})
     # Status could be 'processing_user_speech' before LLM call
     update_call_session_in_db(current_conversation_history, status_text="processing_user_speech") 
-    print(f"💬 Appended user speech to history for SID {call_sid}: '{user_speech_text}'")
+    LOGGER.info("💬 Appended user speech to history for SID %s: '%s'", call_sid, user_speech_text)
 
     user_id_for_supabase_log = call_session_data.get('user_id')
     if outreach_id_for_callbacks and outreach_id_for_callbacks != 'unknown_outreach_id':
@@ -2934,9 +4087,9 @@ def handle_user_speech():
             user_id=user_id_for_supabase_log
         )
     else:
-        print(f"⚠️ Cannot log user speech to Supabase messages table: outreach_id is '{outreach_id_for_callbacks}'")
+        LOGGER.warning("⚠️ Cannot log user speech to Supabase messages table: outreach_id is '%s'", outreach_id_for_callbacks)
 
-    print(f"🧠 Attempting LLM call for SID {call_sid}. User speech: '{user_speech_text}'.")
+    LOGGER.info("🧠 Attempting LLM call for SID %s. User speech: '%s'.", call_sid, user_speech_text)
     # Pass necessary parts of call_session_data to build_live_voice_negotiation_prompt
     llm_prompt = build_live_voice_negotiation_prompt(call_session_data) # MODIFIED to pass full session data
     ai_response_text_from_llm = "I'm having a little trouble formulating a response right now. Could you try again in a moment?"
@@ -2944,35 +4097,34 @@ def handle_user_speech():
     # ... (Groq LLM call logic as before) ...
     if llm_prompt and groq_api_key:
         try:
-            print(f"🤖 Sending prompt to Groq for SID {call_sid}")
-            request_headers = {"Authorization": f"Bearer {groq_api_key}", "Content-Type": "application/json"}
+            LOGGER.info("🤖 Sending prompt to Groq for SID %s", call_sid)
             request_payload = {
-                "model": "llama3-8b-8192",
+                "model": LIVE_VOICE_GROQ_MODEL,
                 "messages": [{"role": "user", "content": llm_prompt}],
                 "temperature": 0.7, "max_tokens": 150, "top_p": 1, "stream": False
             }
             start_time_groq = datetime.now()
-            groq_response = requests.post("https://api.groq.com/openai/v1/chat/completions", headers=request_headers, json=request_payload)
+            groq_response = call_groq_chat(request_payload)
             end_time_groq = datetime.now()
             time_taken_groq = (end_time_groq - start_time_groq).total_seconds()
-            print(f"⏱️ Groq API call took: {time_taken_groq:.2f}s")
+            LOGGER.info("⏱️ Groq API call took: %.2fs", time_taken_groq)
             groq_response.raise_for_status()
-            groq_data = groq_response.json()
+            groq_data = orjson.loads(groq_response.content)
             if groq_data.get('choices') and len(groq_data['choices']) > 0:
                 extracted_text = groq_data['choices'][0].get('message', {}).get('content', '').strip()
                 if extracted_text:
                     ai_response_text_from_llm = extracted_text
-                    print(f"🤖 LLM Response for SID {call_sid}: '{ai_response_text_from_llm}'")
-                else: print(f"⚠️ LLM response was empty for SID {call_sid}.")
-            else: print(f"⚠️ LLM response structure unexpected for SID {call_sid}: {groq_data}")
-        except requests.exceptions.RequestException as e_groq: print(f"❌ Groq API call failed for SID {call_sid}: {e_groq}")
-        except Exception as e_json: print(f"❌ Error processing Groq response for SID {call_sid}: {e_json}")
-    elif not groq_api_key: print("🔴 Groq API key not configured. Using fallback response.")
-    else: print(f"🔴 Failed to build LLM prompt for SID {call_sid}. Using fallback response.")
+                    LOGGER.info("🤖 LLM Response for SID %s: '%s'", call_sid, ai_response_text_from_llm)
+                else: LOGGER.warning("⚠️ LLM response was empty for SID %s.", call_sid)
+            else: LOGGER.warning("⚠️ LLM response structure unexpected for SID %s: %s", call_sid, groq_data)
+        except GROQ_TRANSPORT_ERRORS as e_groq: LOGGER.error("❌ Groq API call failed for SID %s: %s", call_sid, e_groq)
+        except Exception as e_json: LOGGER.error("❌ Error processing Groq response for SID %s: %s", call_sid, e_json)
+    elif not groq_api_key: LOGGER.error("🔴 Groq API key not configured. Using fallback response.")
+    else: LOGGER.error("🔴 Failed to build LLM prompt for SID %s. Using fallback response.", call_sid)
 
     current_conversation_history.append({"speaker": "ai", "text": ai_response_text_from_llm, "timestamp": datetime.now(timezone.utc).isoformat()})
     update_call_session_in_db(current_conversation_history, status_text="waiting_for_user_speech") # AI has responded, waiting for user again
-    print(f"💬 Appended AI response to history for SID {call_sid}: '{ai_response_text_from_llm[:100]}...'")
+    LOGGER.info("💬 Appended AI response to history for SID %s: '%s...'", call_sid, ai_response_text_from_llm[:100])
 
     if outreach_id_for_callbacks and outreach_id_for_callbacks != 'unknown_outreach_id':
         add_supabase_conversation_message(
@@ -2984,9 +4136,9 @@ def handle_user_speech():
             user_id=user_id_for_supabase_log
         )
     else:
-        print(f"⚠️ Cannot log AI response to Supabase messages table: outreach_id is '{outreach_id_for_callbacks}'")
+        LOGGER.warning("⚠️ Cannot log AI response to Supabase messages table: outreach_id is '%s'", outreach_id_for_callbacks)
 
-    print(f"🔊 Attempting ElevenLabs TTS for SID {call_sid}. AI Text: '{ai_response_text_from_llm[:100]}...'.")
+    LOGGER.info("🔊 Attempting ElevenLabs TTS for SID %s. AI Text: '%s...'.", call_sid, ai_response_text_from_llm[:100])
     elevenlabs_audio_url = None
     if elevenlabs_client and elevenlabs_api_key:
         try:
@@ -2997,13 +4149,13 @@ def handle_user_speech():
             )
             if generated_url:
                 elevenlabs_audio_url = generated_url
-                print(f"🔊 ElevenLabs audio generated for SID {call_sid}: {elevenlabs_audio_url}")
+                LOGGER.info("🔊 ElevenLabs audio generated for SID %s: %s", call_sid, elevenlabs_audio_url)
             else:
-                print(f"⚠️ ElevenLabs TTS did not return a URL for SID {call_sid}. Will use Twilio TTS fallback.")
+                LOGGER.warning("⚠️ ElevenLabs TTS did not return a URL for SID %s. Will use Twilio TTS fallback.", call_sid)
         except Exception as e_elevenlabs:
-            print(f"❌ ElevenLabs TTS generation failed for SID {call_sid}: {e_elevenlabs}. Will use Twilio TTS fallback.")
+            LOGGER.error("❌ ElevenLabs TTS generation failed for SID %s: %s. Will use Twilio TTS fallback.", call_sid, e_elevenlabs)
     else:
-        print(f"🔊 ElevenLabs client/key not available. Using Twilio basic TTS for SID {call_sid}.")
+        LOGGER.info("🔊 ElevenLabs client/key not available. Using Twilio basic TTS for SID %s.", call_sid)
 
     # --- Construct Final TwiML Response ---
     final_response_twiml = VoiceResponse()
@@ -3031,40 +4183,40 @@ def handle_user_speech():
     final_response_twiml.append(next_gather)
     final_response_twiml.hangup() # Hangup if gather times out and falls through
     
-    print(f"🎬 Final TwiML (Play & Gather) for SID {call_sid} : {str(final_response_twiml)}")
+    LOGGER.info("🎬 Final TwiML (Play & Gather) for SID %s : %s", call_sid, str(final_response_twiml))
     function_end_time = datetime.now()
     total_function_time = (function_end_time - request_received_time).total_seconds()
-    print(f"⏱️ Total time for handle_user_speech (main conversation turn): {total_function_time:.2f}s")
+    LOGGER.info("⏱️ Total time for handle_user_speech (main conversation turn): %.2fs", total_function_time)
     return str(final_response_twiml), 200, {'Content-Type': 'application/xml'}
 
 @app.route('/temp_audio/<filename>', methods=['GET'])
 def serve_temp_audio(filename):
     try:
-        print(f"Attempting to serve {filename} from {TEMP_AUDIO_DIR}.")
+        LOGGER.info("Attempting to serve %s from %s.", filename, TEMP_AUDIO_DIR)
         # Ensure the directory path is absolute for send_from_directory
         abs_temp_audio_dir = os.path.abspath(TEMP_AUDIO_DIR)
-        print(f"Absolute path for temp_audio_dir: {abs_temp_audio_dir}")
+        LOGGER.info("Absolute path for temp_audio_dir: %s", abs_temp_audio_dir)
 
         # Check if file exists right before sending
         file_path = os.path.join(abs_temp_audio_dir, filename)
         if not os.path.exists(file_path):
-            print(f"Error: File {filename} does not exist at {file_path} immediately before sending.")
+            LOGGER.error("Error: File %s does not exist at %s immediately before sending.", filename, file_path)
             return jsonify({"error": "File not found at final check"}), 404
         if os.path.getsize(file_path) == 0:
-            print(f"Error: File {filename} is empty at {file_path} immediately before sending.")
+            LOGGER.error("Error: File %s is empty at %s immediately before sending.", filename, file_path)
             return jsonify({"error": "File is empty at final check"}), 404
 
         response = send_from_directory(abs_temp_audio_dir, filename, as_attachment=False) # Try with as_attachment=False
         response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
         response.headers["Pragma"] = "no-cache"
         response.headers["Expires"] = "0"
-        print(f"Serving {filename} from {abs_temp_audio_dir} with no-cache headers. Content-Type will be {response.mimetype}")
+        LOGGER.info("Serving %s from %s with no-cache headers. Content-Type will be %s", filename, abs_temp_audio_dir, response.mimetype)
         return response
     except FileNotFoundError:
-        print(f"Error: FileNotFoundError for {filename} in {TEMP_AUDIO_DIR}.")
+        LOGGER.error("Error: FileNotFoundError for %s in %s.", filename, TEMP_AUDIO_DIR)
         return jsonify({"error": "File not found exception"}), 404
     except Exception as e:
-        print(f"Error serving file {filename}: {type(e).__name__} - {e}")
+        LOGGER.error("Error serving file %s: %s - %s", filename, type(e).__name__, e)
         return jsonify({"error": "Error serving file"}), 500
 
 # --- NEW Endpoint to fetch call artifacts ---
@@ -3076,15 +4228,15 @@ def get_call_details():
         return jsonify({"success": False, "error": "Missing 'call_sid' in request parameters."}), 400
 
     if not supabase_admin_client:
-        print("❌ get_call_details: Supabase admin client not available.")
+        LOGGER.error("❌ get_call_details: Supabase admin client not available.")
         return jsonify({"success": False, "error": "Database client not configured."}), 500
 
     try:
-        print(f"🔍 get_call_details: Fetching call session from Supabase for SID {call_sid}...")
+        LOGGER.info("🔍 get_call_details: Fetching call session from Supabase for SID %s...", call_sid)
         fetch_response = supabase_admin_client.table("active_call_sessions").select("*").eq("call_sid", call_sid).maybe_single().execute()
 
         if not fetch_response.data:
-            print(f"⚠️ get_call_details: Call session not found in Supabase for call_sid: {call_sid}")
+            LOGGER.warning("⚠️ get_call_details: Call session not found in Supabase for call_sid: %s", call_sid)
             return jsonify({"success": False, "error": f"Call details not found for call_sid: {call_sid}"}), 404
 
         call_session = fetch_response.data
@@ -3104,35 +4256,35 @@ def get_call_details():
             "updated_at": call_session.get('updated_at')
         }
         
-        print(f"✅ get_call_details: Returning details for SID {call_sid}: {details_payload}")
+        LOGGER.info("✅ get_call_details: Returning details for SID %s: %s", call_sid, details_payload)
         return jsonify({
             "success": True,
             "details": details_payload
         })
 
     except APIError as e_db_fetch:
-        print(f"Error get_call_details: Supabase DB Error for SID {call_sid}. Message: {e_db_fetch.message}. Details: {e_db_fetch.details if hasattr(e_db_fetch, 'details') else 'N/A'}")
+        LOGGER.error("Error get_call_details: Supabase DB Error for SID %s. Message: %s. Details: %s", call_sid, e_db_fetch.message, e_db_fetch.details if hasattr(e_db_fetch, 'details') else 'N/A')
         return jsonify({"success": False, "error": "Database error fetching call details."}), 500
     except Exception as e_general_fetch:
-        print(f"Error get_call_details: General DB Error for SID {call_sid}. Error: {str(e_general_fetch)}")
+        LOGGER.error("Error get_call_details: General DB Error for SID %s. Error: %s", call_sid, str(e_general_fetch))
         return jsonify({"success": False, "error": "Server error fetching call details."}), 500
 
 # --- NEW Endpoint to check call processing status ---
 @app.route('/api/voice/call-progress-status', methods=['GET', 'OPTIONS']) # Add OPTIONS for CORS preflight
 @token_required
 def get_call_progress_status():
-    # OPTIONS preflight is handled by @token_required and Flask-CORS
+    # OPTIONS preflight is answered by short_circuit_preflight and Flask-CORS
 
     call_sid = request.args.get('call_sid')
     if not call_sid:
         return jsonify({"success": False, "error": "Missing 'call_sid' in request parameters."}), 400
 
     if not supabase_admin_client:
-        print("Error get_call_progress_status: Supabase admin client not available.")
+        LOGGER.error("Error get_call_progress_status: Supabase admin client not available.")
         return jsonify({"success": False, "error": "Database client not configured."}), 500
 
     try:
-        print(f"Info get_call_progress_status: Fetching call session for SID {call_sid}...")
+        LOGGER.info("Info get_call_progress_status: Fetching call session for SID %s...", call_sid)
         # Select only the fields needed for status determination
         fetch_response = supabase_admin_client.table("active_call_sessions") \
             .select("outreach_id, status, metadata") \
@@ -3141,7 +4293,7 @@ def get_call_progress_status():
             .execute()
 
         if not fetch_response.data:
-            print(f"Info get_call_progress_status: Call session not found for SID {call_sid}. Returning status 'not_found'.")
+            LOGGER.info("Info get_call_progress_status: Call session not found for SID %s. Returning status 'not_found'.", call_sid)
             return jsonify({"success": True, "status": "not_found", "call_sid": call_sid}), 200
 
         call_session = fetch_response.data
@@ -3167,7 +4319,7 @@ def get_call_progress_status():
         # If db_status is something like 'initiated', 'ringing', 'in-progress', 'waiting_for_user_speech', 
         # and recording is not yet processed, it remains 'processing'.
 
-        print(f"Info get_call_progress_status: SID {call_sid}, DB Status: '{db_status}', Recording Processed: {is_recording_processed}, URL Present: {has_recording_url}. Determined progress: '{current_progress_status}'")
+        LOGGER.info("Info get_call_progress_status: SID %s, DB Status: '%s', Recording Processed: %s, URL Present: %s. Determined progress: '%s'", call_sid, db_status, is_recording_processed, has_recording_url, current_progress_status)
         
         return jsonify({
             "success": True, 
@@ -3177,37 +4329,37 @@ def get_call_progress_status():
         }), 200
 
     except APIError as e_db:
-        print(f"Error get_call_progress_status: Supabase DB Error for SID {call_sid}. Message: {e_db.message}")
+        LOGGER.error("Error get_call_progress_status: Supabase DB Error for SID %s. Message: %s", call_sid, e_db.message)
         return jsonify({"success": False, "error": "Database error checking call progress.", "call_sid": call_sid}), 500
     except Exception as e_general:
-        print(f"Error get_call_progress_status: General Error for SID {call_sid}. Error: {str(e_general)}")
+        LOGGER.error("Error get_call_progress_status: General Error for SID %s. Error: %s", call_sid, str(e_general))
         return jsonify({"success": False, "error": "Server error checking call progress.", "call_sid": call_sid}), 500
 
 # NEW ENDPOINT FOR DOCUMENT EXTRACTION
 @app.route('/api/campaign/extract_from_document', methods=['POST'])
 @token_required
 def extract_campaign_from_document(): # REMOVED current_user parameter
-    print(f"📄 Entering /api/campaign/extract_from_document endpoint for user: {request.current_user.id if hasattr(request.current_user, 'id') else 'unknown'}") # MODIFIED to use request.current_user
+    LOGGER.info("📄 Entering /api/campaign/extract_from_document endpoint for user: %s", request.current_user.id if hasattr(request.current_user, 'id') else 'unknown') # MODIFIED to use request.current_user
     if 'file' not in request.files:
-        print("❌ No file part in request")
+        LOGGER.error("❌ No file part in request")
         return jsonify({"success": False, "error": "No file part in the request"}), 400
     
     file = request.files['file']
     
     if file.filename == '':
-        print("❌ No file selected")
+        LOGGER.error("❌ No file selected")
         return jsonify({"success": False, "error": "No file selected for uploading"}), 400
 
     if file:
         # Use secure_filename to prevent directory traversal attacks
         filename = secure_filename(file.filename)
-        print(f"📄 Received file: {filename}")
+        LOGGER.info("📄 Received file: %s", filename)
         
         allowed_extensions = {'.pdf', '.docx'}
         file_ext = os.path.splitext(filename)[1].lower()
 
         if file_ext not in allowed_extensions:
-            print(f"❌ Unsupported file type: {file_ext}")
+            LOGGER.error("❌ Unsupported file type: %s", file_ext)
             return jsonify({"success": False, "error": f"Unsupported file type: {file_ext}. Please upload a PDF or DOCX file."}), 400
 
         extracted_text = ""
@@ -3218,29 +4370,29 @@ def extract_campaign_from_document(): # REMOVED current_user parameter
                         page_text = page.extract_text()
                         if page_text: # Check if text was extracted
                            extracted_text += page_text + "\n"
-                print(f"📄 Successfully extracted text from PDF: {filename}")
+                LOGGER.info("📄 Successfully extracted text from PDF: %s", filename)
             
             elif file_ext == '.docx':
                 document = docx.Document(file.stream) # Use file.stream for in-memory processing
                 for para in document.paragraphs:
                     extracted_text += para.text + "\n"
-                print(f"📄 Successfully extracted text from DOCX: {filename}")
+                LOGGER.info("📄 Successfully extracted text from DOCX: %s", filename)
 
             if not extracted_text.strip():
-                 print(f"⚠️ No text could be extracted from {filename}")
+                 LOGGER.warning("⚠️ No text could be extracted from %s", filename)
                  return jsonify({"success": False, "error": f"No text content could be extracted from the file: {filename}."}), 400
 
             # TODO: Send extracted_text to LLM for requirement extraction
             # For now, return the extracted text (or a snippet)
-            print(f"Extracted text length: {len(extracted_text)}")
+            LOGGER.info("Extracted text length: %s", len(extracted_text))
             
             # Placeholder for LLM call and structured data response
             # llm_extracted_requirements = call_llm_to_extract_requirements(extracted_text)
             if not extracted_text.strip():
-                 print(f"⚠️ No text could be extracted from {filename}")
+                 LOGGER.warning("⚠️ No text could be extracted from %s", filename)
                  return jsonify({"success": False, "error": f"No text content could be extracted from the file: {filename}. Please ensure the document contains selectable text."}), 400
             
-            print(f"Extracted text length: {len(extracted_text)}. Sending to LLM...")
+            LOGGER.info("Extracted text length: %s. Sending to LLM...", len(extracted_text))
 
             # Call LLM to extract requirements
             llm_result = extract_campaign_details_with_llm(extracted_text)
@@ -3264,9 +4416,7 @@ def extract_campaign_from_document(): # REMOVED current_user parameter
             
 
         except Exception as e:
-            print(f"❌ Error processing file {filename}: {e}")
-            import traceback
-            traceback.print_exc()
+            LOGGER.exception("❌ Error processing file %s: %s", filename, e)
             return jsonify({"success": False, "error": f"Error processing file: {str(e)}"}), 500
     
     return jsonify({"success": False, "error": "An unknown error occurred with the file upload"}), 500
@@ -3276,26 +4426,27 @@ def extract_campaign_from_document(): # REMOVED current_user parameter
 @token_required
 def list_campaigns():
     if not supabase_client or not hasattr(supabase_client, 'postgrest'):
-        print("🔴 Supabase client or postgrest interface not available for list_campaigns.")
+        LOGGER.error("🔴 Supabase client or postgrest interface not available for list_campaigns.")
         return jsonify({"success": False, "error": "Supabase client not configured."}), 500
 
     if not hasattr(request, 'current_user') or not request.current_user or not hasattr(request.current_user, 'id') or not hasattr(request, 'raw_jwt'):
-        print("🔴 Current user or raw_jwt not found in request for list_campaigns.")
+        LOGGER.error("🔴 Current user or raw_jwt not found in request for list_campaigns.")
         return jsonify({"success": False, "error": "User context or token not available."}), 401
         
     current_user_id = request.current_user.id
     raw_jwt_token = request.raw_jwt
     
-    print(f"ℹ️ Fetching campaigns for user_id: {current_user_id}. JWT is {'present' if raw_jwt_token else 'MISSING'}.")
+    LOGGER.info("ℹ️ Fetching campaigns for user_id: %s. JWT is %s.", current_user_id, 'present' if raw_jwt_token else 'MISSING')
 
+    SUPABASE_POSTGREST_AUTH_LOCK.acquire()
     original_postgrest_headers = supabase_client.postgrest.session.headers.copy()
 
     try:
         if raw_jwt_token:
-            print(f"💾 DEBUG: list_campaigns - Temporarily setting PostgREST auth to user's JWT. Snippet: {raw_jwt_token[:20]}...")
+            LOGGER.debug("💾 DEBUG: list_campaigns - Temporarily setting PostgREST auth to user's JWT. Snippet: %s...", raw_jwt_token[:20])
             supabase_client.postgrest.auth(raw_jwt_token)
         else:
-            print("⚠️ WARNING: list_campaigns - No raw_jwt_token available. RLS policies using auth.uid() may not work as expected.")
+            LOGGER.warning("⚠️ WARNING: list_campaigns - No raw_jwt_token available. RLS policies using auth.uid() may not work as expected.")
 
         campaigns_response = (supabase_client.table('campaigns')
                                 .select('*')  # MODIFIED to select all fields
@@ -3303,18 +4454,18 @@ def list_campaigns():
                                 .order('created_at', desc=True)
                                 .execute())
 
-        print(f"💾 DEBUG: Raw Supabase response in list_campaigns: {campaigns_response}")
+        LOGGER.debug("💾 DEBUG: Raw Supabase response in list_campaigns: %s", campaigns_response)
         if hasattr(campaigns_response, 'data'):
-            print(f"💾 DEBUG: campaigns_response.data in list_campaigns: {campaigns_response.data}")
+            LOGGER.debug("💾 DEBUG: campaigns_response.data in list_campaigns: %s", campaigns_response.data)
         if hasattr(campaigns_response, 'error') and campaigns_response.error:
-            print(f"💾 DEBUG: campaigns_response.error in list_campaigns: {campaigns_response.error}")
+            LOGGER.debug("💾 DEBUG: campaigns_response.error in list_campaigns: %s", campaigns_response.error)
 
         fetched_campaigns = []
         if hasattr(campaigns_response, 'data') and campaigns_response.data:
             fetched_campaigns = campaigns_response.data
         
         if not fetched_campaigns:
-            print(f"ℹ️ No campaigns found for user {current_user_id} or campaigns_response.data was empty/None.")
+            LOGGER.info("ℹ️ No campaigns found for user %s or campaigns_response.data was empty/None.", current_user_id)
             return jsonify({"success": True, "campaigns": []})
 
         # MODIFIED: Use transform_campaign_for_frontend for each campaign
@@ -3323,43 +4474,43 @@ def list_campaigns():
         # Filter out None results if transform_campaign_for_frontend can return None (e.g., for invalid data)
         transformed_campaigns = [c for c in transformed_campaigns if c is not None]
 
-        print(f"✅ Fetched and transformed {len(transformed_campaigns)} campaigns for user {current_user_id}.")
+        LOGGER.info("✅ Fetched and transformed %s campaigns for user %s.", len(transformed_campaigns), current_user_id)
         return jsonify({"success": True, "campaigns": transformed_campaigns})
 
     except Exception as e:
         error_message = f"Error fetching campaigns from Supabase: {type(e).__name__} - {str(e)}"
-        print(f"❌ {error_message}")
-        import traceback
-        traceback.print_exc()
+        LOGGER.exception("❌ %s", error_message)
         return jsonify({"success": False, "error": error_message}), 500
     finally:
-        print("💾 DEBUG: list_campaigns - Restoring original PostgREST client session headers.")
+        LOGGER.debug("💾 DEBUG: list_campaigns - Restoring original PostgREST client session headers.")
         supabase_client.postgrest.session.headers = original_postgrest_headers
+        SUPABASE_POSTGREST_AUTH_LOCK.release()
 
 # NEW ENDPOINT TO GET A SINGLE CAMPAIGN BY ID
 @app.route('/api/campaigns/<campaign_id>', methods=['GET'])
 @token_required
 def get_campaign_by_id(campaign_id):
     if not supabase_client or not hasattr(supabase_client, 'postgrest'):
-        print("🔴 Supabase client or postgrest interface not available for get_campaign_by_id.")
+        LOGGER.error("🔴 Supabase client or postgrest interface not available for get_campaign_by_id.")
         return jsonify({"success": False, "error": "Supabase client not configured."}), 500
 
     if not hasattr(request, 'current_user') or not request.current_user or not hasattr(request.current_user, 'id') or not hasattr(request, 'raw_jwt'):
-        print("🔴 Current user or raw_jwt not found in request for get_campaign_by_id.")
+        LOGGER.error("🔴 Current user or raw_jwt not found in request for get_campaign_by_id.")
         return jsonify({"success": False, "error": "User context or token not available."}), 401
         
     current_user_id = request.current_user.id
     raw_jwt_token = request.raw_jwt
+    SUPABASE_POSTGREST_AUTH_LOCK.acquire()
     original_postgrest_headers = supabase_client.postgrest.session.headers.copy()
 
-    print(f"ℹ️ Fetching campaign with id: {campaign_id} for user_id: {current_user_id}. JWT is {'present' if raw_jwt_token else 'MISSING'}.")
+    LOGGER.info("ℹ️ Fetching campaign with id: %s for user_id: %s. JWT is %s.", campaign_id, current_user_id, 'present' if raw_jwt_token else 'MISSING')
 
     try:
         if raw_jwt_token:
-            print(f"💾 DEBUG: get_campaign_by_id - Temporarily setting PostgREST auth to user's JWT. Snippet: {raw_jwt_token[:20]}...")
+            LOGGER.debug("💾 DEBUG: get_campaign_by_id - Temporarily setting PostgREST auth to user's JWT. Snippet: %s...", raw_jwt_token[:20])
             supabase_client.postgrest.auth(raw_jwt_token)
         else:
-            print("⚠️ WARNING: get_campaign_by_id - No raw_jwt_token available. RLS policies using auth.uid() may not work as expected.")
+            LOGGER.warning("⚠️ WARNING: get_campaign_by_id - No raw_jwt_token available. RLS policies using auth.uid() may not work as expected.")
 
         # Select all fields needed by transform_campaign_for_frontend
         campaign_response = (supabase_client.table('campaigns')
@@ -3369,7 +4520,7 @@ def get_campaign_by_id(campaign_id):
                                 .maybe_single()
                                 .execute())
 
-        print(f"💾 DEBUG: Raw Supabase response in get_campaign_by_id: {campaign_response}")
+        LOGGER.debug("💾 DEBUG: Raw Supabase response in get_campaign_by_id: %s", campaign_response)
         # ... (other debug logs if needed) ...
 
         campaign_row = None
@@ -3377,24 +4528,23 @@ def get_campaign_by_id(campaign_id):
             campaign_row = campaign_response.data
         
         if not campaign_row:
-            print(f"ℹ️ Campaign with id {campaign_id} not found for user {current_user_id} or response data was empty.")
+            LOGGER.info("ℹ️ Campaign with id %s not found for user %s or response data was empty.", campaign_id, current_user_id)
             return jsonify({"success": False, "error": "Campaign not found or not authorized."}), 404
 
         # Use transform_campaign_for_frontend for consistent output structure
         transformed_campaign = transform_campaign_for_frontend(campaign_row)
         
-        print(f"✅ Fetched and transformed campaign with id {campaign_id} for user {current_user_id}.")
+        LOGGER.info("✅ Fetched and transformed campaign with id %s for user %s.", campaign_id, current_user_id)
         return jsonify({"success": True, "campaign": transformed_campaign})
 
     except Exception as e:
         error_message = f"Error fetching campaign {campaign_id} from Supabase: {type(e).__name__} - {str(e)}"
-        print(f"❌ {error_message}")
-        import traceback
-        traceback.print_exc()
+        LOGGER.exception("❌ %s", error_message)
         return jsonify({"success": False, "error": error_message}), 500
     finally:
-        print(f"💾 DEBUG: get_campaign_by_id - Restoring original PostgREST client session headers for campaign_id: {campaign_id}.")
+        LOGGER.debug("💾 DEBUG: get_campaign_by_id - Restoring original PostgREST client session headers for campaign_id: %s.", campaign_id)
         supabase_client.postgrest.session.headers = original_postgrest_headers
+        SUPABASE_POSTGREST_AUTH_LOCK.release()
 
 # NEW ENDPOINT TO UPDATE A CAMPAIGN
 @app.route('/api/campaigns/<campaign_id>', methods=['PUT'])
@@ -3410,6 +4560,7 @@ def update_campaign_by_id(campaign_id):
         return jsonify({"success": False, "error": "No data provided for update."}), 400
 
     allowed_ai_statuses = ['active', 'completed', 'cancelled']
+    SUPABASE_POSTGREST_AUTH_LOCK.acquire()
     original_postgrest_headers = supabase_client.postgrest.session.headers.copy()
 
     try:
@@ -3427,7 +4578,7 @@ def update_campaign_by_id(campaign_id):
         existing_campaign = existing_campaign_response.data
 
         if str(existing_campaign.get('user_id')) != str(current_user_id):
-            print(f"⚠️ Authorization mismatch: User {current_user_id} tried to update campaign {campaign_id} owned by {existing_campaign.get('user_id')}.")
+            LOGGER.warning("⚠️ Authorization mismatch: User %s tried to update campaign %s owned by %s.", current_user_id, campaign_id, existing_campaign.get('user_id'))
             return jsonify({"success": False, "error": "You are not authorized to update this campaign."}), 403
 
         update_payload = {}
@@ -3482,7 +4633,7 @@ def update_campaign_by_id(campaign_id):
 
         update_payload["updated_at"] = datetime.now(timezone.utc).isoformat()
         
-        print(f"💾 Updating campaign ID {campaign_id} for user {current_user_id} with payload: {json.dumps(update_payload, indent=2, default=str)}")
+        LOGGER.info("💾 Updating campaign ID %s for user %s with payload: %s", campaign_id, current_user_id, json.dumps(update_payload, indent=2, default=str))
 
         supabase_client.postgrest.auth(raw_jwt_token) 
         update_response = (supabase_client.table('campaigns')
@@ -3505,7 +4656,7 @@ def update_campaign_by_id(campaign_id):
                 transformed_data = transform_campaign_for_frontend(updated_campaign_response.data)
                 return jsonify({"success": True, "campaign": transformed_data, "message": "Campaign updated successfully."})
             else:
-                print(f"⚠️ Update reported success for campaign {campaign_id}, but failed to re-fetch. Update response: {update_response}")
+                LOGGER.warning("⚠️ Update reported success for campaign %s, but failed to re-fetch. Update response: %s", campaign_id, update_response)
                 temp_merged_data = {**existing_campaign, **update_payload} 
                 transformed_partial = transform_campaign_for_frontend(temp_merged_data)
                 return jsonify({"success": True, "campaign": transformed_partial, "message": "Campaign updated, but re-fetch for full data failed. Displaying best available data."})
@@ -3518,17 +4669,17 @@ def update_campaign_by_id(campaign_id):
                 error_message += f" Supabase error (Code: {error_code}, Hint: {error_hint}): {error_details}"
             elif hasattr(update_response, 'status_code') and update_response.status_code >= 400:
                 error_message += f" HTTP Status: {update_response.status_code}. Response: {getattr(update_response, 'text', str(update_response))[:200]}"
-            print(f"❌ Update error for campaign {campaign_id}: {error_message}. Raw response: {update_response}")
+            LOGGER.error("❌ Update error for campaign %s: %s. Raw response: %s", campaign_id, error_message, update_response)
             return jsonify({"success": False, "error": error_message}), 500
 
     except Exception as e:
         error_message = f"An unexpected error occurred: {type(e).__name__} - {str(e)}"
-        print(f"❌ Unexpected error in update_campaign_by_id for campaign {campaign_id}: {error_message}")
-        import traceback
-        traceback.print_exc()
+        LOGGER.exception("❌ Unexpected error in update_campaign_by_id for campaign %s: %s", campaign_id, error_message)
         if hasattr(supabase_client, 'postgrest'): 
              supabase_client.postgrest.session.headers = original_postgrest_headers
         return jsonify({"success": False, "error": error_message}), 500
+    finally:
+        SUPABASE_POSTGREST_AUTH_LOCK.release()
 
 def transform_campaign_for_frontend(campaign_data):
     """Transforms a single campaign record from Supabase to a frontend-friendly format."""
@@ -3607,19 +4758,20 @@ Ensure your output is ONLY the JSON list of strings and nothing else.
 """
     return prompt
 
+NICHE_REINTERPRETATION_GROQ_MODEL = groq_model_for("niche_reinterpretation", GROQ_FAST_MODEL) # Small categorization task
+
 def get_broader_creator_niches_with_llm(specific_niches: list[str]):
     global groq_api_key
     if not groq_api_key or not specific_niches:
-        print("⚠️ LLM Niche Reinterpretation: Groq API key missing or no specific niches provided. Returning original niches.")
+        LOGGER.warning("⚠️ LLM Niche Reinterpretation: Groq API key missing or no specific niches provided. Returning original niches.")
         return [n.lower() for n in specific_niches] # Fallback to original specific niches (lowercased)
 
     common_examples = get_common_creator_niche_examples()
     prompt = build_niche_reinterpretation_prompt(specific_niches, common_examples)
     
-    print(f"🧠 LLM Niche Reinterpretation: Calling Groq with prompt for niches: {specific_niches}")
-    headers = {"Authorization": f"Bearer {groq_api_key}", "Content-Type": "application/json"}
+    LOGGER.info("🧠 LLM Niche Reinterpretation: Calling Groq with prompt for niches: %s", specific_niches)
     payload = {
-        "model": "llama3-8b-8192", # Using a smaller, faster model for this task
+        "model": NICHE_REINTERPRETATION_GROQ_MODEL,
         "messages": [{"role": "user", "content": prompt}],
         "temperature": 0.2, # Low temperature for more deterministic categorization
         "max_tokens": 500,
@@ -3627,15 +4779,15 @@ def get_broader_creator_niches_with_llm(specific_niches: list[str]):
     }
     
     try:
-        response = requests.post("https://api.groq.com/openai/v1/chat/completions", headers=headers, json=payload)
+        response = call_groq_chat(payload)
         response.raise_for_status()
-        ai_response_data = response.json()
+        ai_response_data = orjson.loads(response.content)
         
         response_content = ai_response_data.get('choices', [{}])[0].get('message', {}).get('content', '')
         if not response_content:
             raise ValueError("LLM response content for niche reinterpretation is empty.")
 
-        print(f"💬 LLM Niche Reinterpretation: Raw response content: {response_content}")
+        LOGGER.info("💬 LLM Niche Reinterpretation: Raw response content: %s", response_content)
         
         # LLM should return a JSON string that is a list, e.g., '["tech", "finance"]'
         # We need to parse this string into a Python list.
@@ -3643,7 +4795,7 @@ def get_broader_creator_niches_with_llm(specific_niches: list[str]):
             # The response_content itself might be a stringified JSON list.
             # Or, if the LLM wraps it in a JSON object (due to response_format: { "type": "json_object" })
             # we need to extract the list from that object.
-            parsed_outer_json = json.loads(response_content)
+            parsed_outer_json = orjson.loads(response_content)
             broader_niches_from_llm = []
             if isinstance(parsed_outer_json, list):
                 broader_niches_from_llm = [str(n).lower() for n in parsed_outer_json if isinstance(n, str)]
@@ -3657,23 +4809,23 @@ def get_broader_creator_niches_with_llm(specific_niches: list[str]):
                         broader_niches_from_llm = [str(n).lower() for n in parsed_outer_json[key] if isinstance(n, str)]
                         break # Take the first list found
                 if not broader_niches_from_llm:
-                    print(f"⚠️ LLM Niche Reinterpretation: LLM returned a JSON object, but no identifiable list of niches found. Object: {parsed_outer_json}")
+                    LOGGER.warning("⚠️ LLM Niche Reinterpretation: LLM returned a JSON object, but no identifiable list of niches found. Object: %s", parsed_outer_json)
 
             if not broader_niches_from_llm: # If parsing failed or list is empty
-                 print(f"⚠️ LLM Niche Reinterpretation: Parsed list is empty or invalid. Raw: {response_content}. Using original niches.")
+                 LOGGER.warning("⚠️ LLM Niche Reinterpretation: Parsed list is empty or invalid. Raw: %s. Using original niches.", response_content)
                  return [n.lower() for n in specific_niches]
 
-            print(f"✅ LLM Niche Reinterpretation: Successfully reinterpreted to: {broader_niches_from_llm}")
+            LOGGER.info("✅ LLM Niche Reinterpretation: Successfully reinterpreted to: %s", broader_niches_from_llm)
             return broader_niches_from_llm
         except json.JSONDecodeError as e_json_inner:
-            print(f"❌ LLM Niche Reinterpretation: Failed to decode JSON list from LLM response content. Error: {e_json_inner}. Content: {response_content}. Using original niches.")
+            LOGGER.error("❌ LLM Niche Reinterpretation: Failed to decode JSON list from LLM response content. Error: %s. Content: %s. Using original niches.", e_json_inner, response_content)
             return [n.lower() for n in specific_niches]
 
-    except requests.exceptions.RequestException as e_req:
-        print(f"❌ LLM Niche Reinterpretation: API request failed: {e_req}. Using original niches.")
+    except GROQ_TRANSPORT_ERRORS as e_req:
+        LOGGER.error("❌ LLM Niche Reinterpretation: API request failed: %s. Using original niches.", e_req)
         return [n.lower() for n in specific_niches]
     except Exception as e_gen:
-        print(f"❌ LLM Niche Reinterpretation: General error: {e_gen}. Using original niches.")
+        LOGGER.error("❌ LLM Niche Reinterpretation: General error: %s. Using original niches.", e_gen)
         return [n.lower() for n in specific_niches]
 
 @app.route('/api/creators/discover', methods=['POST'])
@@ -3686,76 +4838,78 @@ def discover_creators():
     if not criteria:
         return jsonify({"success": False, "error": "No discovery criteria provided."}), 400
 
-    print(f"ℹ️ Creator Discovery - Original criteria: {criteria}")
+    LOGGER.info("ℹ️ Creator Discovery - Original criteria: %s", criteria)
 
     active_client_for_query = supabase_admin_client if supabase_admin_client else supabase_client
     original_postgrest_headers = None
-    if not supabase_admin_client:
-        original_postgrest_headers = active_client_for_query.postgrest.session.headers.copy()
-        active_client_for_query.postgrest.auth(request.raw_jwt)
     
     query_builder = active_client_for_query.table('creators').select('*')
 
     # Location Filter
     location_criteria = criteria.get('location')
     if location_criteria and isinstance(location_criteria, str):
-        print(f"ℹ️ Applying DB location filter: ilike '%{location_criteria}%'")
+        LOGGER.info("ℹ️ Applying DB location filter: ilike '%%%s%%'", location_criteria)
         query_builder = query_builder.ilike('location', f"%{location_criteria}%")
     else:
-        print(f"ℹ️ No location criteria provided or not a string: {location_criteria}")
+        LOGGER.info("ℹ️ No location criteria provided or not a string: %s", location_criteria)
 
     # Niche Filter
     specific_campaign_niches = criteria.get('niches')
     if specific_campaign_niches and isinstance(specific_campaign_niches, list) and len(specific_campaign_niches) > 0:
-        print(f"ℹ️ Original campaign niches for discovery: {specific_campaign_niches}")
+        LOGGER.info("ℹ️ Original campaign niches for discovery: %s", specific_campaign_niches)
         
         # Use LLM or map to get broader/mapped creator niches.
         # get_broader_creator_niches_with_llm has a fallback to use specific_campaign_niches (lowercased) if LLM/API key is not available.
         expanded_creator_niches = get_broader_creator_niches_with_llm(specific_campaign_niches)
         
         if expanded_creator_niches and len(expanded_creator_niches) > 0:
-            print(f"ℹ️ Applying DB niche filter (overlaps) with: {expanded_creator_niches} on 'niche' column.")
+            LOGGER.info("ℹ️ Applying DB niche filter (overlaps) with: %s on 'niche' column.", expanded_creator_niches)
             # Assumes 'niche' column in 'creators' table is of array type (e.g., text[])
             query_builder = query_builder.overlaps('niche', expanded_creator_niches) 
         else:
-            print(f"ℹ️ No expanded/valid niches to filter by after processing: {expanded_creator_niches}")
+            LOGGER.info("ℹ️ No expanded/valid niches to filter by after processing: %s", expanded_creator_niches)
     else:
-        print(f"ℹ️ No niche criteria provided, not a list, or empty list: {specific_campaign_niches}")
+        LOGGER.info("ℹ️ No niche criteria provided, not a list, or empty list: %s", specific_campaign_niches)
 
     # Verified Filter
     if 'verified' in criteria and criteria['verified'] is not None:
         if isinstance(criteria['verified'], bool):
-            print(f"ℹ️ Applying DB verified filter: {criteria['verified']}")
+            LOGGER.info("ℹ️ Applying DB verified filter: %s", criteria['verified'])
             query_builder = query_builder.eq('verified', criteria['verified'])
 
     fetched_creators = []
+    # Headers are read when the query executes, so the JWT swap (and its lock) only needs to cover the execute,
+    # not the LLM niche expansion above.
+    if not supabase_admin_client:
+        SUPABASE_POSTGREST_AUTH_LOCK.acquire()
+        original_postgrest_headers = active_client_for_query.postgrest.session.headers.copy()
+        active_client_for_query.postgrest.auth(request.raw_jwt)
     try:
-        print(f"Executing Supabase query (before Python platform/follower filters) - Query Object: {query_builder}")
+        LOGGER.info("Executing Supabase query (before Python platform/follower filters) - Query Object: %s", query_builder)
         # Fetch more candidates initially, filter in Python
         response = query_builder.limit(500).execute() 
-        print(f"Supabase response (before Python filters): {response}")
+        LOGGER.info("Supabase response (before Python filters): %s", response)
 
         if response.data:
             fetched_creators = response.data
-            print(f"ℹ️ Supabase query (before Python filters) returned {len(fetched_creators)} creators.")
+            LOGGER.info("ℹ️ Supabase query (before Python filters) returned %s creators.", len(fetched_creators))
         else:
             # This handles cases where response.data is None or an empty list from a successful query
-            print(f"ℹ️ Supabase query (before Python filters) returned 0 creators (response.data is empty/None).")
+            LOGGER.info("ℹ️ Supabase query (before Python filters) returned 0 creators (response.data is empty/None).")
             # If there's a specific error object in response (though data check is primary)
             if hasattr(response, 'error') and response.error:
-                 print(f"⚠️ Supabase query error details: {response.error}")
+                 LOGGER.warning("⚠️ Supabase query error details: %s", response.error)
 
     except APIError as e_api:
-        print(f"❌ Supabase API Error during creator discovery: {e_api}")
+        LOGGER.error("❌ Supabase API Error during creator discovery: %s", e_api)
         return jsonify({"success": False, "error": f"Database API error: {e_api.message}"}), 500
     except Exception as e:
-        print(f"❌ Unexpected error during Supabase query execution: {e}")
-        import traceback
-        traceback.print_exc()
+        LOGGER.exception("❌ Unexpected error during Supabase query execution: %s", e)
         return jsonify({"success": False, "error": f"Unexpected error fetching creators: {str(e)}"}), 500
     finally:
         if not supabase_admin_client and original_postgrest_headers is not None:
             active_client_for_query.postgrest.session.headers = original_postgrest_headers
+            SUPABASE_POSTGREST_AUTH_LOCK.release()
             # print("Restored original PostgREST client session headers for user-context client.")
 
     # --- Python-based Filtering (Platforms and Followers) ---
@@ -3776,11 +4930,11 @@ def discover_creators():
         elif isinstance(criteria['platforms'], str):
             target_platforms_lower = [criteria['platforms'].lower()]
     
-    print(f"ℹ️ Python Filter: Target platforms (lowercase): {target_platforms_lower}")
+    LOGGER.info("ℹ️ Python Filter: Target platforms (lowercase): %s", target_platforms_lower)
 
     min_f = criteria.get('min_followers')
     max_f = criteria.get('max_followers')
-    print(f"ℹ️ Python Filter: Min followers={min_f}, Max followers={max_f}")
+    LOGGER.info("ℹ️ Python Filter: Min followers=%s, Max followers=%s", min_f, max_f)
 
     for creator in fetched_creators:
         passes_platform = False
@@ -3798,7 +4952,7 @@ def discover_creators():
             try:
                 current_followers = int(creator['metrics']['followers'])
             except (ValueError, TypeError):
-                print(f"⚠️ Could not parse followers for creator {creator.get('id')}: {creator['metrics']['followers']}")
+                LOGGER.warning("⚠️ Could not parse followers for creator %s: %s", creator.get('id'), creator['metrics']['followers'])
                 passes_followers = False # Or treat as not matching if unparseable
         
         if passes_followers and current_followers is not None:
@@ -3807,7 +4961,7 @@ def discover_creators():
                     if current_followers < int(min_f):
                         passes_followers = False
                 except ValueError:
-                    print(f"⚠️ Invalid min_followers criteria: {min_f}")
+                    LOGGER.warning("⚠️ Invalid min_followers criteria: %s", min_f)
                     passes_followers = False 
             
             if passes_followers and max_f is not None:
@@ -3815,7 +4969,7 @@ def discover_creators():
                     if current_followers > int(max_f):
                         passes_followers = False
                 except ValueError:
-                    print(f"⚠️ Invalid max_followers criteria: {max_f}")
+                    LOGGER.warning("⚠️ Invalid max_followers criteria: %s", max_f)
                     passes_followers = False
         elif min_f is not None or max_f is not None: # If follower criteria exist but no follower data for creator
             passes_followers = False
@@ -3824,7 +4978,7 @@ def discover_creators():
             filtered_by_python.append(creator)
 
     final_creators = filtered_by_python[:100] # Cap final results
-    print(f"ℹ️ Found {len(final_creators)} creators after ALL filters.")
+    LOGGER.info("ℹ️ Found %s creators after ALL filters.", len(final_creators))
     return jsonify({"success": True, "creators": final_creators})
 
 # --- NEW HELPER FUNCTION for Processing and Storing Twilio Recording ---
@@ -3845,7 +4999,7 @@ def _process_and_store_twilio_recording(call_sid, recording_sid, recording_url_t
                 if existing_session_resp.data and isinstance(existing_session_resp.data.get('metadata'), dict):
                     current_metadata = existing_session_resp.data['metadata']
                 elif existing_session_resp.data: # Metadata exists but not a dict
-                    print(f"⚠️ Metadata for CallSid {call_sid} was not a dict. Initializing for error update.")
+                    LOGGER.warning("⚠️ Metadata for CallSid %s was not a dict. Initializing for error update.", call_sid)
                 
                 current_metadata[error_message_key] = error_message_value
                 current_metadata['twilio_recording_processed_successfully'] = False
@@ -3856,58 +5010,62 @@ def _process_and_store_twilio_recording(call_sid, recording_sid, recording_url_t
                     "updated_at": datetime.now(timezone.utc).isoformat()
                 }
                 supabase_admin_client.table("active_call_sessions").update(update_payload).eq("call_sid", call_sid).execute()
-                print(f"💾 Call session for SID {call_sid} updated with error: {error_message_key}='{error_message_value}'")
+                LOGGER.info("💾 Call session for SID %s updated with error: %s='%s'", call_sid, error_message_key, error_message_value)
             except Exception as e_update_err:
-                print(f"❌❌ Nested error while updating call session with error state for SID {call_sid}: {e_update_err}")
+                LOGGER.error("❌❌ Nested error while updating call session with error state for SID %s: %s", call_sid, e_update_err)
         else:
-            print(f"❌ Cannot update call session with error for SID {call_sid}: Supabase client or CallSid missing.")
+            LOGGER.error("❌ Cannot update call session with error for SID %s: Supabase client or CallSid missing.", call_sid)
 
     if not supabase_admin_client or not twilio_client:
         err_msg = "Supabase or Twilio client not available."
-        print(f"❌ _process_and_store_twilio_recording: {err_msg} Cannot process CallSid {call_sid}.")
+        LOGGER.error("❌ _process_and_store_twilio_recording: %s Cannot process CallSid %s.", err_msg, call_sid)
         update_call_session_with_error("recording_processing_error", err_msg)
         return
 
-    print(f"⚙️ [_process_and_store_twilio_recording] Initiated for CallSid: {call_sid}, RecSid: {recording_sid}, OutreachID: {outreach_id}")
+    LOGGER.info("⚙️ [_process_and_store_twilio_recording] Initiated for CallSid: %s, RecSid: %s, OutreachID: %s", call_sid, recording_sid, outreach_id)
 
-    print(f"⏳ Waiting for 5 seconds for Twilio media processing before download for CallSid {call_sid}, RecSid {recording_sid}...")
+    LOGGER.info("⏳ Waiting for 5 seconds for Twilio media processing before download for CallSid %s, RecSid %s...", call_sid, recording_sid)
     time.sleep(5)
 
     try:
-        print(f"⬇️ Downloading recording for CallSid {call_sid} (RecSid: {recording_sid}) from Twilio URL: {recording_url_twilio}...")
+        LOGGER.info("⬇️ Downloading recording for CallSid %s (RecSid: %s) from Twilio URL: %s...", call_sid, recording_sid, recording_url_twilio)
         recording_url_twilio_mp3 = recording_url_twilio
         if not recording_url_twilio.lower().endswith('.mp3'):
             if ".mp3" not in recording_url_twilio.lower():
                  recording_url_twilio_mp3 = f"{recording_url_twilio}.mp3"
-                 print(f"    Adjusted Twilio Recording URL to: {recording_url_twilio_mp3} (appended .mp3)")
+                 LOGGER.info("    Adjusted Twilio Recording URL to: %s (appended .mp3)", recording_url_twilio_mp3)
 
-        recording_content_response = requests.get(
-            recording_url_twilio_mp3,
-            auth=(twilio_client.auth[0], twilio_client.auth[1])
-        )
-        recording_content_response.raise_for_status()
-        recording_data = recording_content_response.content
-        print(f"✅ Downloaded {len(recording_data)} bytes for CallSid {call_sid}, RecSid {recording_sid}.")
-
-        if not recording_data:
-            err_msg = "Downloaded recording was empty."
-            print(f"⚠️ Recording data for CallSid {call_sid}, RecSid {recording_sid} is empty. Aborting Supabase upload.")
-            update_call_session_with_error("recording_processing_error", err_msg)
-            return
-
-        storage_path = f"{outreach_id}/{call_sid}_{recording_sid}.mp3"
-        print(f"⬆️ Uploading to Supabase bucket 'call-recordings' at path '{storage_path}' for CallSid {call_sid}...")
-        
-        supabase_admin_client.storage.from_("call-recordings").upload(
-            path=storage_path,
-            file=recording_data,
-            file_options={"cache-control": "3600", "upsert": "true", "content-type": "audio/mpeg"}
-        )
-        print(f"☁️ Supabase upload initiated/completed for CallSid {call_sid}.")
+        # Scratch file in the system temp dir (mode 0600), not TEMP_AUDIO_DIR: that dir is served publicly
+        with tempfile.NamedTemporaryFile(prefix="recording_", suffix=".mp3", delete=False) as scratch_file:
+            local_recording_path = scratch_file.name
+        try:
+            recording_size = download_twilio_media(recording_url_twilio_mp3, local_recording_path)
+            LOGGER.info("✅ Downloaded %s bytes for CallSid %s, RecSid %s.", recording_size, call_sid, recording_sid)
+
+            if not recording_size:
+                err_msg = "Downloaded recording was empty."
+                LOGGER.warning("⚠️ Recording data for CallSid %s, RecSid %s is empty. Aborting Supabase upload.", call_sid, recording_sid)
+                update_call_session_with_error("recording_processing_error", err_msg)
+                return
+
+            storage_path = f"{outreach_id}/{call_sid}_{recording_sid}.mp3"
+            LOGGER.info("⬆️ Uploading to Supabase bucket 'call-recordings' at path '%s' for CallSid %s...", storage_path, call_sid)
+
+            supabase_admin_client.storage.from_("call-recordings").upload(
+                path=storage_path,
+                file=local_recording_path, # Uploaded from disk rather than from an in-memory copy
+                file_options={"cache-control": "3600", "upsert": "true", "content-type": "audio/mpeg"}
+            )
+            LOGGER.info("☁️ Supabase upload initiated/completed for CallSid %s.", call_sid)
+        finally:
+            try:
+                os.remove(local_recording_path)
+            except FileNotFoundError:
+                pass
 
         public_url_response = supabase_admin_client.storage.from_("call-recordings").get_public_url(storage_path)
         public_url_supabase = public_url_response
-        print(f"🔗 Supabase Storage Public URL for CallSid {call_sid}: {public_url_supabase}")
+        LOGGER.info("🔗 Supabase Storage Public URL for CallSid %s: %s", call_sid, public_url_supabase)
 
         # Fetch existing metadata before updating
         existing_session_resp = supabase_admin_client.table("active_call_sessions").select("metadata, status").eq("call_sid", call_sid).maybe_single().execute()
@@ -3918,11 +5076,11 @@ def _process_and_store_twilio_recording(call_sid, recording_sid, recording_url_t
             if isinstance(existing_session_resp.data.get('metadata'), dict):
                 current_metadata = existing_session_resp.data['metadata']
             else:
-                 print(f"⚠️ Metadata for CallSid {call_sid} was not a dict. Initializing for recording update.")
+                 LOGGER.warning("⚠️ Metadata for CallSid %s was not a dict. Initializing for recording update.", call_sid)
             # Preserve existing status unless we explicitly override it here
             current_status = existing_session_resp.data.get('status', current_status)
         else:
-            print(f"⚠️ Could not fetch existing session data for CallSid {call_sid} before updating with recording. Proceeding with defaults.")
+            LOGGER.warning("⚠️ Could not fetch existing session data for CallSid %s before updating with recording. Proceeding with defaults.", call_sid)
 
         current_metadata.update({
             "twilio_recording_url": public_url_supabase, # Changed from full_recording_url
@@ -3939,7 +5097,7 @@ def _process_and_store_twilio_recording(call_sid, recording_sid, recording_url_t
         }
 
         supabase_admin_client.table("active_call_sessions").update(update_payload).eq("call_sid", call_sid).execute()
-        print(f"💾 Active call session for CallSid {call_sid} updated with Supabase recording URL. Supabase Outreach ID: {outreach_id}")
+        LOGGER.info("💾 Active call session for CallSid %s updated with Supabase recording URL. Supabase Outreach ID: %s", call_sid, outreach_id)
 
         if outreach_id and public_url_supabase:
             user_id_for_message = existing_session_resp.data.get('user_id') if existing_session_resp.data else None
@@ -3959,17 +5117,15 @@ def _process_and_store_twilio_recording(call_sid, recording_sid, recording_url_t
 
     except APIError as e_supabase_outer:
         err_msg = f"Supabase APIError during recording processing for CallSid {call_sid}: {e_supabase_outer.message}"
-        print(f"❌ {err_msg}")
+        LOGGER.error("❌ %s", err_msg)
         update_call_session_with_error("recording_processing_error", err_msg)
     except requests.exceptions.RequestException as e_requests:
         err_msg = f"Network error downloading recording for CallSid {call_sid}: {e_requests}"
-        print(f"❌ {err_msg}")
+        LOGGER.error("❌ %s", err_msg)
         update_call_session_with_error("recording_processing_error", err_msg)
     except Exception as e_general:
         err_msg = f"General error in _process_and_store_twilio_recording for CallSid {call_sid}: {str(e_general)}"
-        print(f"❌ {err_msg}")
-        import traceback
-        traceback.print_exc()
+        LOGGER.exception("❌ %s", err_msg)
         update_call_session_with_error("recording_processing_error", err_msg)
 
 def add_supabase_conversation_message(outreach_id: str, content: str, sender: str, message_type: str, metadata: dict = None, user_id: str = None): # MODIFIED: Added user_id parameter
@@ -3985,7 +5141,7 @@ def add_supabase_conversation_message(outreach_id: str, content: str, sender: st
         user_id: Optional ID of the user associated with this message.
     """
     if not supabase_client:
-        print("❌ Supabase client not initialized. Cannot add conversation message.")
+        LOGGER.error("❌ Supabase client not initialized. Cannot add conversation message.")
         return None
 
     if metadata is None:
@@ -4025,23 +5181,23 @@ def add_supabase_conversation_message(outreach_id: str, content: str, sender: st
             message_payload['user_id'] = user_id
         else:
             # If no specific user, we might log it or decide if user_id is nullable in DB
-            print(f"⚠️ No specific user_id found for conversation message for outreach {outreach_id}. User ID will be null.")
+            LOGGER.warning("⚠️ No specific user_id found for conversation message for outreach %s. User ID will be null.", outreach_id)
 
-        print(f"✍️ Attempting to save conversation message to Supabase for outreach {outreach_id}: Type '{message_type}', Sender '{sender}'")
+        LOGGER.info("✍️ Attempting to save conversation message to Supabase for outreach %s: Type '%s', Sender '%s'", outreach_id, message_type, sender)
         response = supabase_client.table('conversation_messages').insert(message_payload).execute()
 
         if response.data:
-            print(f"✅ Conversation message saved to Supabase for outreach {outreach_id}. Message ID: {response.data[0]['id']}")
+            LOGGER.info("✅ Conversation message saved to Supabase for outreach %s. Message ID: %s", outreach_id, response.data[0]['id'])
             return response.data[0]
         elif response.error:
-            print(f"❌ Error saving conversation message to Supabase for outreach {outreach_id}: {response.error}")
+            LOGGER.error("❌ Error saving conversation message to Supabase for outreach %s: %s", outreach_id, response.error)
             return None
         else:
-            print(f"⚠️ Unknown response when saving conversation message for outreach {outreach_id}: {response}")
+            LOGGER.warning("⚠️ Unknown response when saving conversation message for outreach %s: %s", outreach_id, response)
             return None
 
     except Exception as e:
-        print(f"❌ Exception in add_supabase_conversation_message for outreach {outreach_id}: {e}")
+        LOGGER.error("❌ Exception in add_supabase_conversation_message for outreach %s: %s", outreach_id, e)
         return None
 
 # NEW ENDPOINT for creating an outreach record from AI assignment
@@ -4141,8 +5297,8 @@ def create_new_campaign():
 
     db_insert_payload = {
         "user_id": str(user_id),
-        "created_at": datetime.now(timezone.utc).isoformat(),
-        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "created_at": request_now_iso(),
+        "updated_at": request_now_iso(),
         "creation_method": "human" 
     }
 
@@ -4180,6 +5336,7 @@ def create_new_campaign():
     if not supabase_client or not hasattr(supabase_client, 'postgrest'):
         return jsonify({"success": False, "error": "Supabase client not configured"}), 500
 
+    SUPABASE_POSTGREST_AUTH_LOCK.acquire()
     original_postgrest_headers = supabase_client.postgrest.session.headers.copy()
     try:
         if raw_jwt_token:
@@ -4198,16 +5355,16 @@ def create_new_campaign():
                  error_msg += f" Details: {error_details}"
             elif hasattr(insert_response, 'status_code'): 
                 error_msg += f" Status: {insert_response.status_code}. Response: {str(insert_response)[:200]}"
-            print(f"❌ Supabase insert error: {error_msg}. Raw Response: {insert_response}")
+            LOGGER.error("❌ Supabase insert error: %s. Raw Response: %s", error_msg, insert_response)
             return jsonify({"success": False, "error": error_msg}), 500
             
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        LOGGER.exception("❌ Unexpected error creating campaign: %s", e)
         return jsonify({"success": False, "error": f"An unexpected error occurred: {str(e)}"}), 500
     finally:
         if supabase_client and hasattr(supabase_client, 'postgrest'):
              supabase_client.postgrest.session.headers = original_postgrest_headers
+        SUPABASE_POSTGREST_AUTH_LOCK.release()
 
 # --- Google OAuth Routes --- START ---
 @app.route('/api/auth/google/login')
@@ -4555,18 +5712,18 @@ def handle_send_outreach_via_gmail():
 def get_google_auth_status():
     # REPLACED app.logger with print(..., flush=True)
     user_id = request.current_user.id
-    print(f"--- get_google_auth_status: Checking Google Auth status for user_id: {user_id} ---", flush=True)
+    LOGGER.info("--- get_google_auth_status: Checking Google Auth status for user_id: %s ---", user_id)
     
     credentials = get_google_user_credentials(user_id)
     
     if credentials and credentials.valid:
-        print(f"User {user_id}: IS connected to Google and credentials are valid.", flush=True)
+        LOGGER.info("User %s: IS connected to Google and credentials are valid.", user_id)
         return jsonify({"success": True, "is_connected": True})
     elif credentials and not credentials.valid:
-        print(f"User {user_id}: WARNING - Has Google token record, but credentials NOT valid.", flush=True)
+        LOGGER.warning("User %s: WARNING - Has Google token record, but credentials NOT valid.", user_id)
         return jsonify({"success": True, "is_connected": False, "message": "Google connection found but requires re-authentication."})
     else:
-        print(f"User {user_id}: IS NOT connected to Google (no valid tokens or error retrieving).", flush=True)
+        LOGGER.info("User %s: IS NOT connected to Google (no valid tokens or error retrieving).", user_id)
         return jsonify({"success": True, "is_connected": False, "message": "User not connected to Google."})
 
 # --- Helper function to send email via Gmail API ---
@@ -4587,9 +5744,9 @@ def send_gmail_email(credentials: GoogleCredentials, to_email: str, subject: str
     """
     if not credentials or not credentials.valid:
         error_msg = f"Attempted to send Gmail with invalid or missing credentials. Valid: {credentials.valid if credentials else 'N/A'}"
-        print(f"Error: {error_msg}", flush=True)
+        LOGGER.error("Error: %s", error_msg)
         if credentials and not credentials.token:
-             print("Error: Access token is missing from Google credentials.", flush=True)
+             LOGGER.error("Error: Access token is missing from Google credentials.")
         return {"success": False, "error": error_msg}
     
     try:
@@ -4607,21 +5764,21 @@ def send_gmail_email(credentials: GoogleCredentials, to_email: str, subject: str
         gmail_message_id = sent_message.get('id')
         
         if gmail_message_id:
-            print(f"Email sent successfully. Message ID: {gmail_message_id}", flush=True)
+            LOGGER.info("Email sent successfully. Message ID: %s", gmail_message_id)
             return {"success": True, "message_id": gmail_message_id}
         else:
             # This case should ideally not happen if execute() doesn't raise an error and returns a response
             error_msg = "Gmail API executed send but returned no message ID."
-            print(f"Error: {error_msg}", flush=True)
+            LOGGER.error("Error: %s", error_msg)
             return {"success": False, "error": error_msg}
 
     except HttpError as error:
         error_details = f"Gmail API HttpError: {error.status_code} - {error.reason}. Content: {error.content.decode() if error.content else 'N/A'}"
-        print(f"Error sending email via Gmail: {error_details}", flush=True)
+        LOGGER.error("Error sending email via Gmail: %s", error_details)
         return {"success": False, "error": error_details}
     except Exception as e:
         error_details = f"Unexpected error in send_gmail_email: {str(e)}"
-        print(f"Error: {error_details}", flush=True)
+        LOGGER.error("Error: %s", error_details)
         return {"success": False, "error": error_details}
 
 # NEW Helper function to update metadata in conversation_messages
@@ -4631,7 +5788,7 @@ def update_conversation_message_metadata(conversation_message_id: str, metadata_
     It fetches existing metadata, merges it with updates, and saves it back.
     """
     if not supabase_admin_client: # Use admin client for system-level updates
-        print("❌ Supabase ADMIN client not initialized. Cannot update conversation_message metadata.", flush=True)
+        LOGGER.error("❌ Supabase ADMIN client not initialized. Cannot update conversation_message metadata.")
         return False
 
     try:
@@ -4639,12 +5796,12 @@ def update_conversation_message_metadata(conversation_message_id: str, metadata_
         msg_response = supabase_admin_client.table('conversation_messages').select('metadata').eq('id', conversation_message_id).maybe_single().execute()
 
         if not msg_response.data:
-            print(f"❌ Conversation message with ID {conversation_message_id} not found for metadata update.", flush=True)
+            LOGGER.error("❌ Conversation message with ID %s not found for metadata update.", conversation_message_id)
             return False
 
         existing_metadata = msg_response.data.get('metadata', {})
         if not isinstance(existing_metadata, dict): # Ensure it's a dict
-             print(f"⚠️ Metadata for message {conversation_message_id} was not a dict, re-initializing. Original: {existing_metadata}", flush=True)
+             LOGGER.warning("⚠️ Metadata for message %s was not a dict, re-initializing. Original: %s", conversation_message_id, existing_metadata)
              existing_metadata = {}
         
         # Merge new updates into existing metadata
@@ -4654,24 +5811,26 @@ def update_conversation_message_metadata(conversation_message_id: str, metadata_
         update_response = supabase_admin_client.table('conversation_messages').update({'metadata': updated_metadata}).eq('id', conversation_message_id).execute()
 
         if hasattr(update_response, 'data') and update_response.data: # In v2, data is a list
-            print(f"✅ Metadata updated for conversation_message {conversation_message_id}.", flush=True)
+            LOGGER.info("✅ Metadata updated for conversation_message %s.", conversation_message_id)
             return True
         elif hasattr(update_response, 'error') and update_response.error:
-            print(f"❌ Error updating metadata for conversation_message {conversation_message_id}: {update_response.error}", flush=True)
+            LOGGER.error("❌ Error updating metadata for conversation_message %s: %s", conversation_message_id, update_response.error)
             return False
         else: # Should not happen if data or error is always present
-            print(f"⚠️ Unknown response from Supabase during metadata update for {conversation_message_id}. Data: {getattr(update_response, 'data', 'N/A')}", flush=True)
+            LOGGER.warning("⚠️ Unknown response from Supabase during metadata update for %s. Data: %s", conversation_message_id, getattr(update_response, 'data', 'N/A'))
             return False
             
     except APIError as e_api:
-        print(f"❌ Supabase APIError updating metadata for {conversation_message_id}: {e_api.message}", flush=True)
+        LOGGER.error("❌ Supabase APIError updating metadata for %s: %s", conversation_message_id, e_api.message)
         return False
     except Exception as e:
-        print(f"❌ Unexpected error in update_conversation_message_metadata for {conversation_message_id}: {str(e)}", flush=True)
+        LOGGER.error("❌ Unexpected error in update_conversation_message_metadata for %s: %s", conversation_message_id, str(e))
         return False
 
 # Ensure this function is defined before its first use in handle_send_outreach_via_gmail
 # ... existing code ...
 
 if __name__ == '__main__':
-    app.run(debug=True, port=int(os.getenv('PORT', 5001)))
\ No newline at end of file
+    # Local development only; production runs under gunicorn (see Procfile / gunicorn.conf.py).
+    # threaded=True so one slow Groq call doesn't hold up every other request on the dev server.
+    app.run(debug=os.getenv('FLASK_DEBUG', '1') == '1', port=int(os.getenv('PORT', 5001)), threaded=True)
\ No newline at end of file
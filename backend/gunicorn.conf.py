@@ -0,0 +1,31 @@
+# Gunicorn configuration for the InfluencerFlowAI backend.
+# Usage: gunicorn -c gunicorn.conf.py app:app (see Procfile)
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+
+# gthread workers keep serving other requests while a thread waits on Groq / Supabase I/O.
+# GUNICORN_WORKERS / GUNICORN_THREADS / GUNICORN_WORKER_CLASS let a deployment dial these back without a code change.
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+
+# Import app.py once in the master so the compiled prompt templates and other module-level state are
+# shared copy-on-write. Per-process resources (the Groq asyncio loop) are started after the fork, in post_fork below.
+preload_app = True
+
+keepalive = 30
+# Under gthread this is a heartbeat: the master restarts a worker whose main loop goes `timeout` seconds without checking in.
+# Request threads blocked on I/O don't stop that check-in, so it does not bound how long a request runs. Groq waits are
+# bounded in app.py instead: 35s per call (GROQ_FUTURE_TIMEOUT_SECONDS) and 90s per batch fan-out (GROQ_BATCH_MAX_WAIT_SECONDS).
+# With GUNICORN_WORKER_CLASS=sync it does bound each request, so keep it above the 90s batch limit.
+timeout = 120
+graceful_timeout = 30
+
+def post_fork(server, worker):
+    # With preload_app the app module is already imported; start this worker's Groq loop and warm its connection
+    # right after the fork so the first request doesn't pay for it. The log listener thread is restarted the same way.
+    import app as backend_app
+    backend_app.start_log_listener() # The master's log listener thread didn't survive the fork
+    backend_app.warm_up_groq_async_client()